@@ -0,0 +1,171 @@
+"""Date-sorted index over a listing, for cursor pagination and year/month archives.
+
+Built once per version of a listing (see `memo_latest` in app.main). Posts are kept newest
+first next to their sort keys, so the start of a page, whether given by a cursor
+or a date range, is found by bisection: a page costs its own size, however many
+posts the archive holds.
+
+A cursor names the post a page continues from as `<date>.<slug>`. It still works
+after that post is deleted, since it is only a position in the date order. Pages
+are linked by path (`/blog/after/<cursor>`), so a static export can write them.
+
+Recently requested pages are kept, so a page's post list is the same object on
+every request and its version is memoised (see app.conditional.version_of).
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import MAXYEAR, MINYEAR, date
+from itertools import groupby
+from typing import Any, NamedTuple
+
+from app.content import ContentNotFoundError
+
+PAGE_SIZE = 20
+# Pages kept per archive
+PAGE_CACHE_SIZE = 128
+
+SortKey = tuple[int, str]
+
+
+class Page(NamedTuple):
+    posts: list[Any]
+    # Cursors for the neighbouring pages, None at either end
+    newer: str | None
+    older: str | None
+
+
+class ArchiveMonth(NamedTuple):
+    year: int
+    month: int
+    count: int
+
+    @property
+    def url(self) -> str:
+        return f"{self.year}/{self.month:02d}"
+
+    @property
+    def label(self) -> str:
+        return date(self.year, self.month, 1).strftime("%b %Y")
+
+
+def sort_key(post: Any) -> SortKey:
+    # Ascending keys for a newest-first order; slug breaks ties between same-day posts
+    return (-post.date.toordinal(), post.slug)
+
+
+def cursor_for(post: Any) -> str:
+    return f"{post.date.isoformat()}.{post.slug}"
+
+
+def parse_cursor(cursor: str) -> SortKey:
+    day, _, slug = cursor.partition(".")
+    try:
+        return (-date.fromisoformat(day).toordinal(), slug)
+    except ValueError:
+        raise ContentNotFoundError(f"Invalid page cursor: {cursor}") from None
+
+
+def month_bounds(year: int, month: int | None = None) -> tuple[date, date]:
+    """First day of the year or month, and first day after it."""
+    # The day after the last year's end isn't a date
+    if not MINYEAR <= year < MAXYEAR:
+        raise ContentNotFoundError(f"No such year: {year}")
+    if month is None:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    if not 1 <= month <= 12:
+        raise ContentNotFoundError(f"No such month: {year}-{month}")
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return date(year, month, 1), end
+
+
+class Archive:
+    def __init__(self, posts: list[Any]):
+        self.posts = sorted(posts, key=sort_key)
+        self._keys = [sort_key(post) for post in self.posts]
+        self.months = [
+            ArchiveMonth(year, month, sum(1 for _ in group))
+            for (year, month), group in groupby(
+                self.posts, key=lambda p: (p.date.year, p.date.month)
+            )
+        ]
+        self.years = sorted({m.year for m in self.months}, reverse=True)
+        self._pages: OrderedDict[tuple, Page] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def _bounds(self, start: date | None, end: date | None) -> tuple[int, int]:
+        """Positions of the posts dated from `start` up to, not including, `end`."""
+        lo = 0 if end is None else bisect_left(self._keys, (-end.toordinal() + 1,))
+        hi = (
+            len(self._keys) if start is None else bisect_left(self._keys, (-start.toordinal() + 1,))
+        )
+        return lo, hi
+
+    def page(
+        self,
+        after: str | None = None,
+        before: str | None = None,
+        size: int = PAGE_SIZE,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> Page:
+        """Up to `size` posts older than `after`, or else newer than `before`, newest first.
+
+        `start` and `end` limit the page to posts in that date range, for archive views.
+        """
+        key = (after, before, size, start, end)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                return page
+        page = self._page(after, before, size, start, end)
+        with self._lock:
+            page = self._pages.setdefault(key, page)
+            while len(self._pages) > PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        return page
+
+    def page_cursors(
+        self, size: int = PAGE_SIZE, start: date | None = None, end: date | None = None
+    ) -> list[tuple[str, str]]:
+        """Direction and cursor of every page linked to when paging from the first.
+
+        Those pages start at multiples of `size`, so these are all the pages a
+        static export needs to write.
+        """
+        lo, hi = self._bounds(start, end)
+        cursors = []
+        for first in range(lo + size, hi, size):
+            # The page starting here, and the newer page it links back to
+            cursors.append(("after", cursor_for(self.posts[first - 1])))
+            cursors.append(("before", cursor_for(self.posts[first])))
+        return cursors
+
+    def _page(
+        self,
+        after: str | None,
+        before: str | None,
+        size: int,
+        start: date | None,
+        end: date | None,
+    ) -> Page:
+        lo, hi = self._bounds(start, end)
+        if after is not None:
+            first = max(lo, bisect_right(self._keys, parse_cursor(after), lo, hi))
+            last = min(hi, first + size)
+        elif before is not None:
+            last = min(hi, bisect_left(self._keys, parse_cursor(before), lo, hi))
+            first = max(lo, last - size)
+        else:
+            first, last = lo, min(hi, lo + size)
+        posts = self.posts[first:last]
+        return Page(
+            posts,
+            newer=cursor_for(posts[0]) if posts and first > lo else None,
+            older=cursor_for(posts[-1]) if posts and last < hi else None,
+        )
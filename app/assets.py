@@ -0,0 +1,163 @@
+"""Static assets under content-hashed names, so browsers can cache them for good.
+
+Every file in app/static is copied to the assets directory as `name.<hash>.ext`
+and templates link to it through `asset()`. A URL then never changes meaning: an
+edited file gets a new name, so the old one can be cached as immutable and a
+repeat visit makes no static requests at all, not even revalidations.
+
+`url()` references in stylesheets are rewritten to the hashed names too, before
+the stylesheet itself is hashed, so a changed image also renames the CSS that
+uses it. Copies are precompressed like the originals (see app.compression).
+
+The copies and a manifest of their names are built ahead of time by
+scripts/build_assets.py; the app only loads the manifest.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+from starlette.responses import Response
+
+from app.compression import (
+    COMPRESSIBLE_SUFFIXES,
+    MIN_SIZE,
+    SUFFIXES,
+    PrecompressedStaticFiles,
+    precompress_file,
+)
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+ASSETS_DIR = Path(os.getenv("ASSETS_DIR", str(BASE_DIR / ".cache" / "assets")))
+ASSETS_URL = "/assets"
+MANIFEST_NAME = "manifest.json"
+
+HASH_LENGTH = 10
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")\s]+)\1\s*\)""")
+# References that aren't files next to the stylesheet
+EXTERNAL_URL = re.compile(r"^([a-z][a-z0-9+.-]*:|/|#)", re.IGNORECASE)
+
+
+def hashed_name(path: str, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    stem, dot, suffix = path.rpartition(".")
+    if not dot or "/" in suffix:
+        return f"{path}.{digest}"
+    return f"{stem}.{digest}.{suffix}"
+
+
+def rewrite_css(css: str, css_path: str, names: dict[str, str]) -> str:
+    """Point the stylesheet's relative url()s at the hashed copies of their files."""
+    directory = os.path.dirname(css_path)
+
+    def replace(match: re.Match) -> str:
+        quote, url = match.groups()
+        if EXTERNAL_URL.match(url):
+            return match.group(0)
+        target = os.path.normpath(os.path.join(directory, url)).replace(os.sep, "/")
+        if target not in names:
+            return match.group(0)
+        hashed = os.path.relpath(names[target], directory or ".").replace(os.sep, "/")
+        return f"url({quote}{hashed}{quote})"
+
+    return CSS_URL.sub(replace, css)
+
+
+def _write_atomic(target: Path, data: bytes) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(target)
+
+
+class AssetManifest:
+    """Hashed names of the files in `source`, written out to `output` with a manifest."""
+
+    def __init__(self, source: Path, output: Path):
+        self.source = source
+        self.output = output
+        self.names: dict[str, str] = {}
+        self.version = ""
+
+    def build(self) -> "AssetManifest":
+        """Hash every file and write the copies that don't exist yet.
+
+        Stylesheets go last, so the files they reference already have their names.
+        Copies left over from earlier builds are removed.
+        """
+        files = sorted(
+            path.relative_to(self.source).as_posix()
+            for path in self.source.rglob("*")
+            if path.is_file()
+            and not any(part.startswith(".") for part in path.relative_to(self.source).parts)
+            and path.suffix not in SUFFIXES.values()
+        )
+        names: dict[str, str] = {}
+        contents: dict[str, bytes] = {}
+        for path in sorted(files, key=lambda p: p.endswith(".css")):
+            data = (self.source / path).read_bytes()
+            if path.endswith(".css"):
+                data = rewrite_css(data.decode(), path, names).encode()
+            names[path] = hashed_name(path, data)
+            contents[path] = data
+
+        for path, name in names.items():
+            target = self.output / name
+            if not target.exists():
+                _write_atomic(target, contents[path])
+            if target.suffix.lower() in COMPRESSIBLE_SUFFIXES and len(contents[path]) >= MIN_SIZE:
+                precompress_file(target)
+        self._prune(set(names.values()))
+
+        self.names = names
+        self.version = hashlib.sha1(
+            "".join(sorted(names.values())).encode(), usedforsecurity=False
+        ).hexdigest()[:16]
+        manifest = {"version": self.version, "names": names}
+        _write_atomic(self.output / MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+        logger.info(f"Built {len(names)} static assets in {self.output}")
+        return self
+
+    def load(self) -> "AssetManifest":
+        """Read the names written by the last build, if there was one."""
+        try:
+            manifest = json.loads((self.output / MANIFEST_NAME).read_text())
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logger.warning(f"No asset manifest in {self.output} ({e}), linking unhashed files")
+            return self
+        self.names = manifest["names"]
+        self.version = manifest["version"]
+        return self
+
+    def _prune(self, current: set[str]) -> None:
+        keep = current | {f"{name}{suffix}" for name in current for suffix in SUFFIXES.values()}
+        keep.add(MANIFEST_NAME)
+        for path in self.output.rglob("*"):
+            if path.is_file() and path.relative_to(self.output).as_posix() not in keep:
+                path.unlink(missing_ok=True)
+
+    def url(self, path: str) -> str:
+        """URL of the hashed copy of a file in app/static, for templates."""
+        name = self.names.get(path.lstrip("/"))
+        if name is None:
+            # Still works, just without the long-lived caching
+            if self.names:
+                logger.warning(f"No static asset {path}, linking the unhashed file")
+            return f"/static/{path.lstrip('/')}"
+        return f"{ASSETS_URL}/{name}"
+
+
+class ImmutableStaticFiles(PrecompressedStaticFiles):
+    """Serves hashed assets, which never change, with a year-long immutable Cache-Control."""
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE
+        return response
@@ -0,0 +1,86 @@
+"""Load many posts at once: overlapping fetches, rendering spread over processes.
+
+Cold loads of whole listings otherwise fetch, parse and render one post at a
+time, so they grow linearly with the size of the corpus. Here fetches run
+concurrently and markdown rendering, which is CPU-bound, goes to a process
+pool once there's enough of it to be worth shipping across.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from time import perf_counter
+from typing import Any
+
+from app.content import ContentFile, ContentNotFoundError, ContentType, afetch_content_file
+from app.metrics import RENDER_SECONDS
+from app.render import get_parsed, load_rendered, remember_parsed, store_rendered
+
+logger = logging.getLogger(__name__)
+
+# Concurrent content reads in flight per bulk load
+FETCH_CONCURRENCY = int(os.getenv("CONTENT_FETCH_CONCURRENCY", "16"))
+# Processes used to render markdown; 1 renders in a thread instead
+RENDER_WORKERS = int(os.getenv("CONTENT_RENDER_WORKERS", str(os.cpu_count() or 1)))
+# Below this many posts to render, process startup and pickling cost more than they save
+PARALLEL_RENDER_MIN = 32
+
+
+@cache
+def _render_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn rather than fork: the app process has live threads (uvicorn, cache refreshes)
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _timed(parse: Callable[[str, str], Any], slug: str, body: str) -> tuple[Any, float]:
+    # Timed where it runs, so queueing for a worker doesn't count as render time
+    started = perf_counter()
+    return parse(slug, body), perf_counter() - started
+
+
+async def load_many(
+    content_type: ContentType,
+    slugs: list[str],
+    parse: Callable[[str, str], Any],
+    fetch: Callable[[ContentType, str], Awaitable[ContentFile]] = afetch_content_file,
+    concurrency: int = FETCH_CONCURRENCY,
+    workers: int = RENDER_WORKERS,
+) -> dict[str, Any]:
+    """Fetch and parse `slugs`, skipping any that disappeared in the meantime.
+
+    `parse` must be a module-level function so it can be sent to worker processes.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    pool = _render_pool(workers) if workers > 1 and len(slugs) >= PARALLEL_RENDER_MIN else None
+
+    async def load(slug: str) -> Any:
+        async with semaphore:
+            try:
+                file = await fetch(content_type, slug)
+            except ContentNotFoundError:
+                return None
+        key = (content_type, slug, parse.__name__)
+        value = get_parsed(key, file.etag)
+        if value is None:
+            value = load_rendered(key, file.body)
+            if value is None:
+                if pool is not None:
+                    render = loop.run_in_executor(pool, _timed, parse, slug, file.body)
+                else:
+                    render = asyncio.to_thread(_timed, parse, slug, file.body)
+                value, seconds = await render
+                RENDER_SECONDS.labels(parse.__name__).observe(seconds)
+                store_rendered(key, file.body, value)
+            remember_parsed(key, file.etag, value)
+        return value
+
+    values = await asyncio.gather(*(load(slug) for slug in slugs))
+    logger.info(
+        f"Loaded {len(slugs)} {content_type.value} posts ({'processes' if pool else 'threads'})"
+    )
+    return {slug: value for slug, value in zip(slugs, values) if value is not None}
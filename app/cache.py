@@ -0,0 +1,191 @@
+"""Stale-while-revalidate cache for content loaders.
+
+Every entry gets its own expiry (TTL plus random jitter) so keys don't all
+expire at once. Expired entries keep being served while a single background
+refresh per key reloads them, and concurrent misses on the same key share one
+load instead of each hitting the content source.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any
+
+from app.content import ContentNotFoundError
+from app.metrics import CACHE_EVICTIONS, CACHE_REQUESTS, report_size
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = float(os.getenv("CACHE_TTL", "300"))  # 5 minutes
+CACHE_JITTER = 0.1  # +/- 10% of the TTL
+CACHE_MAXSIZE = 1024
+
+
+def _loader_name(key: Hashable) -> str:
+    # Keys made by `cached` start with the loader's name
+    return key[0] if isinstance(key, tuple) and key else str(key)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    ttl: float
+    refreshing: bool = False
+
+
+class ContentCache:
+    def __init__(
+        self,
+        ttl: float = CACHE_TTL,
+        jitter: float = CACHE_JITTER,
+        maxsize: int = CACHE_MAXSIZE,
+        max_workers: int = 2,
+    ):
+        self.ttl = ttl
+        self.jitter = jitter
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._loading: dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="cache-refresh")
+
+    def _expires_at(self, ttl: float) -> float:
+        return time.monotonic() + ttl * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = _Entry(value, self._expires_at(ttl), ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                CACHE_EVICTIONS.labels("content", _loader_name(evicted)).inc()
+                logger.debug(f"Evicted {evicted} from content cache")
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any], ttl: float) -> None:
+        try:
+            value = loader()
+        except ContentNotFoundError:
+            logger.info(f"{key} no longer exists, dropping it from the cache")
+            self.invalidate(key)
+            return
+        except Exception as e:
+            # Keep serving the stale value; the next request will retry the refresh
+            logger.warning(f"Refreshing {key} failed: {e}")
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+            return
+        self._store(key, value, ttl)
+
+    def get(self, key: Hashable, loader: Callable[[], Any], ttl: float | None = None) -> Any:
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                stale = entry.expires_at <= time.monotonic()
+                if stale and not entry.refreshing:
+                    entry.refreshing = True
+                    self._executor.submit(self._refresh, key, loader, entry.ttl)
+                CACHE_REQUESTS.labels(
+                    "content", _loader_name(key), "stale" if stale else "hit"
+                ).inc()
+                return entry.value
+            CACHE_REQUESTS.labels("content", _loader_name(key), "miss").inc()
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        # Single-flight: the first caller loads, everyone else waits for its result
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return entry.value
+            try:
+                value = loader()
+                self._store(key, value, ttl)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return value
+
+    def set_ttl(self, ttl: float) -> None:
+        """Use `ttl` from now on, for entries already cached as well."""
+        with self._lock:
+            self.ttl = ttl
+            for entry in self._entries.values():
+                entry.ttl = ttl
+                entry.expires_at = self._expires_at(ttl)
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        self._store(key, value, self.ttl if ttl is None else ttl)
+
+    def contains(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def cached(self, func: Callable | None = None, *, ttl: float | None = None) -> Callable:
+        """Decorator caching a loader by its name and positional arguments."""
+
+        def decorator(func: Callable) -> Callable:
+            def key(*args) -> tuple:
+                return (func.__name__, *args)
+
+            @wraps(func)
+            def wrapper(*args):
+                return self.get(key(*args), lambda: func(*args), ttl)
+
+            wrapper.invalidate = lambda *args: self.invalidate(key(*args))
+            wrapper.contains = lambda *args: self.contains(key(*args))
+            wrapper.prime = lambda *args, value: self.set(key(*args), value, ttl)
+            return wrapper
+
+        return decorator(func) if func is not None else decorator
+
+
+content_cache = ContentCache()
+report_size("content", "entries", lambda: len(content_cache._entries))
+
+
+def memo_latest(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Cache `func(*sources)` until it is called with different source objects.
+
+    Listings keep their identity while their content is unchanged, so anything
+    derived from them is rebuilt only when the content actually changes.
+    """
+    latest: tuple[tuple, Any] | None = None
+    lock = threading.Lock()
+
+    def same(sources: tuple, previous: tuple) -> bool:
+        return len(sources) == len(previous) and all(
+            a is b for a, b in zip(sources, previous, strict=True)
+        )
+
+    @wraps(func)
+    def wrapper(*sources):
+        nonlocal latest
+        current = latest
+        if current is not None and same(sources, current[0]):
+            return current[1]
+        with lock:
+            if latest is None or not same(sources, latest[0]):
+                latest = (sources, func(*sources))
+            return latest[1]
+
+    return wrapper
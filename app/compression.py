@@ -0,0 +1,170 @@
+"""Compressed responses that are never compressed per request.
+
+Rendered pages are compressed once per content version and kept next to the
+page bytes in the page cache. Static text assets get .br/.gz siblings built
+ahead of time (scripts/compress_static.py) and `PrecompressedStaticFiles`
+serves whichever one the client accepts. Images are already compressed, so
+they are served as they are.
+
+Each encoding of a resource has its own bytes, so it gets its own strong ETag
+(`encoded_etag`); a client that has any of them gets a 304 carrying that one.
+"""
+
+import gzip
+import os
+from pathlib import Path
+
+import brotli
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+# Preferred first when the client accepts several equally
+ENCODINGS = ("br", "gzip")
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".html", ".txt", ".xml", ".json"}
+# Below this, headers cost more than compression saves
+MIN_SIZE = 512
+# Pages are compressed on first request of each version, so don't use the slowest levels
+PAGE_LEVELS = {"br": 9, "gzip": 6}
+STATIC_LEVELS = {"br": 11, "gzip": 9}
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    if encoding == "gzip":
+        # mtime=0 so the same input always produces the same bytes
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def negotiate_encoding(accept_encoding: str, available=ENCODINGS) -> str | None:
+    """Pick the content-coding to send for an Accept-Encoding header, or None."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            weights[coding.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def encoded_etag(etag: str, encoding: str | None) -> str:
+    """ETag of one content-coding of the representation tagged `etag`."""
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def matching_etag(if_none_match: str, etag: str) -> str | None:
+    """The variant of `etag`, in any encoding, that an If-None-Match header lists."""
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    if "*" in tags:
+        return etag
+    for encoding in (None, *ENCODINGS):
+        variant = encoded_etag(etag, encoding)
+        if variant in tags:
+            return variant
+    return None
+
+
+def precompress_file(path: Path, encodings=ENCODINGS) -> list[Path]:
+    """Write compressed siblings of `path` that are missing or older than it.
+
+    Variants that wouldn't be smaller than the original are removed instead, so
+    `PrecompressedStaticFiles` falls back to the original file.
+    """
+    written = []
+    data = None
+    stat = path.stat()
+    for encoding in encodings:
+        target = path.with_name(path.name + SUFFIXES[encoding])
+        if target.exists() and target.stat().st_mtime_ns >= stat.st_mtime_ns:
+            continue
+        data = path.read_bytes() if data is None else data
+        compressed = compress(data, encoding, STATIC_LEVELS[encoding])
+        if len(compressed) >= len(data):
+            target.unlink(missing_ok=True)
+            continue
+        target.write_bytes(compressed)
+        written.append(target)
+    return written
+
+
+def precompress_directory(directory: Path) -> list[Path]:
+    written = []
+    for path in sorted(directory.rglob("*")):
+        if path.name.startswith("."):
+            continue
+        if path.is_file() and path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            if path.stat().st_size >= MIN_SIZE:
+                written.extend(precompress_file(path))
+    return written
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves prebuilt .br/.gz variants when the client accepts them."""
+
+    def file_response(
+        self,
+        full_path: os.PathLike,
+        stat_result: os.stat_result,
+        scope,
+        status_code: int = 200,
+    ) -> Response:
+        if Path(full_path).suffix.lower() not in COMPRESSIBLE_SUFFIXES or status_code != 200:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        request_headers = Headers(scope=scope)
+        response = FileResponse(full_path, stat_result=stat_result)
+        response.headers["Vary"] = "Accept-Encoding"
+
+        variants = {}
+        for encoding in ENCODINGS:
+            try:
+                variant_stat = os.stat(f"{full_path}{SUFFIXES[encoding]}")
+            except FileNotFoundError:
+                continue
+            # A variant older than its source is stale until the next build
+            if variant_stat.st_mtime_ns >= stat_result.st_mtime_ns:
+                variants[encoding] = variant_stat
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), tuple(variants))
+        etag = response.headers["etag"]
+
+        # Any encoding the client has is as good as the one it would get now
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            matched = matching_etag(if_none_match, etag)
+        elif self.is_not_modified(response.headers, request_headers):
+            matched = encoded_etag(etag, encoding)
+        else:
+            matched = None
+        if matched is not None:
+            response.headers["ETag"] = matched
+            return NotModifiedResponse(response.headers)
+
+        if encoding is None:
+            return response
+        return FileResponse(
+            f"{full_path}{SUFFIXES[encoding]}",
+            stat_result=variants[encoding],
+            media_type=response.media_type,
+            headers={
+                "ETag": encoded_etag(etag, encoding),
+                "Last-Modified": response.headers["last-modified"],
+                "Content-Encoding": encoding,
+                "Vary": "Accept-Encoding",
+            },
+        )
@@ -0,0 +1,128 @@
+"""ETag / Last-Modified validators and 304 handling for rendered pages.
+
+A page's validator is derived from the data it is rendered from plus the
+templates, so it can be checked against If-None-Match before any template is
+rendered. Last-Modified is only when this process first saw that version, which
+differs between workers and restarts, so If-Modified-Since isn't trusted: every
+page has an ETag, and a client without one gets the page.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import UTC, datetime
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.compression import matching_etag
+
+# Versions of recently seen objects by identity. The object is kept alongside its
+# version so its id() can't be reused while the entry exists. Models and lists are
+# kept apart, so lists built per request can't push out the long-lived models.
+_versions: OrderedDict[int, tuple[Any, str]] = OrderedDict()
+_list_versions: OrderedDict[int, tuple[Any, str]] = OrderedDict()
+_versions_lock = threading.Lock()
+VERSIONS_MAXSIZE = 4096
+LIST_VERSIONS_MAXSIZE = 64
+MEMO_MIN_LENGTH = 16
+
+# When each validator was first seen, which is what Last-Modified reports
+_first_seen: OrderedDict[str, datetime] = OrderedDict()
+FIRST_SEEN_MAXSIZE = 16384
+
+
+class Validator(NamedTuple):
+    etag: str
+    last_modified: datetime
+
+
+def template_version(directory: Path) -> str:
+    digest = hashlib.sha1(usedforsecurity=False)
+    for path in sorted(directory.rglob("*.html")):
+        digest.update(str(path.relative_to(directory)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _compute_version(value: Any) -> str:
+    if isinstance(value, BaseModel):
+        data = value.model_dump_json().encode()
+    elif isinstance(value, dict):
+        data = "".join(f"{k}={version_of(v)};" for k, v in value.items()).encode()
+    elif isinstance(value, list | tuple):
+        data = "".join(version_of(v) for v in value).encode()
+    else:
+        data = repr(value).encode()
+    return hashlib.sha1(data, usedforsecurity=False).hexdigest()
+
+
+def version_of(value: Any) -> str:
+    """Content hash of a model, listing or plain value.
+
+    Models and long lists are memoised by identity, which is cheap because loaders
+    hand back the same objects until their content changes. Short lists and other
+    values are usually built per request, so they are hashed without memoising.
+    A list's version is made from its items' versions, so hashing a new list of
+    known models costs a lookup per item.
+    """
+    if isinstance(value, BaseModel):
+        memo, maxsize = _versions, VERSIONS_MAXSIZE
+    elif isinstance(value, list) and len(value) >= MEMO_MIN_LENGTH:
+        memo, maxsize = _list_versions, LIST_VERSIONS_MAXSIZE
+    else:
+        return _compute_version(value)
+    with _versions_lock:
+        cached = memo.get(id(value))
+        if cached is not None and cached[0] is value:
+            memo.move_to_end(id(value))
+            return cached[1]
+    version = _compute_version(value)
+    with _versions_lock:
+        memo[id(value)] = (value, version)
+        while len(memo) > maxsize:
+            memo.popitem(last=False)
+    return version
+
+
+def validator_for(*parts: Any) -> Validator:
+    digest = hashlib.sha1(
+        "".join(version_of(p) for p in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    etag = f'"{digest[:20]}"'
+    last_modified = _first_seen.get(etag)
+    if last_modified is None:
+        last_modified = _first_seen[etag] = datetime.now(UTC).replace(microsecond=0)
+        while len(_first_seen) > FIRST_SEEN_MAXSIZE:
+            _first_seen.popitem(last=False)
+    return Validator(etag, last_modified)
+
+
+def validator_headers(validator: Validator) -> dict[str, str]:
+    return {
+        "ETag": validator.etag,
+        "Last-Modified": format_datetime(validator.last_modified, usegmt=True),
+        # Cacheable, but always check back; the answer is usually a cheap 304
+        "Cache-Control": "no-cache",
+    }
+
+
+def is_not_modified(request: Request, validator: Validator) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    return matching_etag(if_none_match, validator.etag) is not None
+
+
+def not_modified_response(
+    request: Request, validator: Validator, headers: dict[str, str] | None = None
+) -> Response:
+    """304 with the ETag of whichever encoding of the page the client has."""
+    etag = matching_etag(request.headers.get("if-none-match", ""), validator.etag)
+    headers = validator_headers(validator) | (headers or {})
+    if etag is not None:
+        headers["ETag"] = etag
+    return Response(status_code=304, headers=headers)
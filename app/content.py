@@ -1,18 +1,27 @@
 """Content loader for blog posts and projects from local filesystem or S3."""
 
+import asyncio
 import glob
 import logging
 import os
+from datetime import UTC, datetime
 from enum import Enum
+from functools import cache
 from pathlib import Path
+from typing import NamedTuple
 
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from app.metrics import instrument_s3_client
 
 logger = logging.getLogger(__name__)
 
 CONTENT_SOURCE = os.getenv("CONTENT_SOURCE", "local")
 S3_CONTENT_BUCKET = os.getenv("S3_CONTENT_BUCKET", "smr-webdev-content")
 AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
 
 BASE_DIR = Path(__file__).parent.parent
 
@@ -21,6 +30,11 @@ class ContentNotFoundError(Exception):
     pass
 
 
+class ContentFile(NamedTuple):
+    body: str
+    etag: str
+
+
 class ContentType(Enum):
     BLOG = "blog"
     PROJECT = "project"
@@ -42,13 +56,39 @@ CONTENT_CONFIG = {
     },
 }
 
+# Precompiled content index, stored alongside the content it was built from
+INDEX_KEY = "index.json"
+INDEX_PATH = BASE_DIR / "content" / INDEX_KEY
+
+# Bytes read from the start of a post when only its frontmatter is needed
+HEAD_BYTES = 4096
 
+# Last copy of every file read, keyed by path or S3 key, for conditional re-reads
+_file_cache: dict[str, ContentFile] = {}
+
+
+@cache
 def get_s3_client():
+    """Return the shared S3 client; boto3 clients are thread-safe and pool their connections."""
     try:
-        return boto3.client("s3", region_name=AWS_REGION)
+        client = boto3.client(
+            "s3",
+            region_name=AWS_REGION,
+            config=Config(
+                max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                retries={"mode": "adaptive"},
+            ),
+        )
     except Exception as e:
         logger.error(f"Failed to create S3 client: {e}")
         raise
+    instrument_s3_client(client)
+    return client
+
+
+# Modification time of every post as of the last listing of its type, which S3
+# returns for free with the listing; see content_modified
+_modified: dict[ContentType, dict[str, datetime]] = {}
 
 
 def list_content_files(content_type: ContentType) -> list[str]:
@@ -56,42 +96,149 @@ def list_content_files(content_type: ContentType) -> list[str]:
     if CONTENT_SOURCE == "local":
         local_dir = config["local_dir"]
         logger.debug(f"Listing local {content_type.value} files in {local_dir}")
-        files = [Path(f).stem for f in glob.glob(f"{local_dir}/*.md")]
-        logger.info(f"Found {len(files)} local {content_type.value} files")
-        return files
+        modified = {}
+        for f in glob.glob(f"{local_dir}/*.md"):
+            try:
+                mtime = os.stat(f).st_mtime
+            except FileNotFoundError:
+                continue
+            modified[Path(f).stem] = datetime.fromtimestamp(mtime, UTC)
+        logger.info(f"Found {len(modified)} local {content_type.value} files")
     else:
         s3_prefix = config["s3_prefix"]
         logger.debug(f"Listing S3 objects in {S3_CONTENT_BUCKET}/{s3_prefix}")
-        s3_client = get_s3_client()
-        response = s3_client.list_objects_v2(Bucket=S3_CONTENT_BUCKET, Prefix=s3_prefix)
-        files = [
-            Path(item["Key"]).stem
-            for item in response.get("Contents", [])
+        paginator = get_s3_client().get_paginator("list_objects_v2")
+        modified = {
+            Path(item["Key"]).stem: item["LastModified"]
+            for page in paginator.paginate(Bucket=S3_CONTENT_BUCKET, Prefix=s3_prefix)
+            for item in page.get("Contents", [])
             if item["Key"].endswith(".md")
-        ]
-        logger.info(f"Found {len(files)} {content_type.value} files in S3")
-        return files
+        }
+        logger.info(f"Found {len(modified)} {content_type.value} files in S3")
+    if _modified.get(content_type) != modified:
+        # Kept as the same object while unchanged, so what's derived from it (see
+        # memo_latest in app.main) is only rebuilt when a time changes
+        _modified[content_type] = modified
+    return list(modified)
 
 
-def read_content_file(content_type: ContentType, slug: str) -> str:
+def content_modified(content_type: ContentType, slug: str) -> datetime | None:
+    """When a post last changed, if its type has been listed since the app started."""
+    return _modified.get(content_type, {}).get(slug)
+
+
+def modified_times(content_type: ContentType) -> dict[str, datetime]:
+    """Modification time of every post of a type, as of its last listing."""
+    return _modified.setdefault(content_type, {})
+
+
+def _decode_head(data: bytes, max_bytes: int) -> str:
+    """Decode the first bytes of a file, dropping a trailing line that may be cut off."""
+    if len(data) >= max_bytes:
+        data = data[: data.rfind(b"\n") + 1]
+    return data.decode("utf-8", errors="ignore")
+
+
+def _read_local_file(path: Path, name: str, max_bytes: int | None = None) -> ContentFile:
+    cache_key = str(path) if max_bytes is None else f"{path}#head"
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        _file_cache.pop(cache_key, None)
+        raise ContentNotFoundError(name)
+    etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    cached = _file_cache.get(cache_key)
+    if cached is not None and cached.etag == etag:
+        logger.debug(f"Local file unchanged: {path}")
+        return cached
+
+    logger.debug(f"Reading local file: {path}")
+    try:
+        if max_bytes is None:
+            with open(path, encoding="utf-8") as f:
+                file = ContentFile(f.read(), etag)
+        else:
+            with open(path, "rb") as f:
+                file = ContentFile(_decode_head(f.read(max_bytes), max_bytes), etag)
+    except FileNotFoundError:
+        raise ContentNotFoundError(name)
+    _file_cache[cache_key] = file
+    return file
+
+
+def _read_s3_object(key: str, name: str, max_bytes: int | None = None) -> ContentFile:
+    s3_client = get_s3_client()
+    cache_key = key if max_bytes is None else f"{key}#head"
+    cached = _file_cache.get(cache_key)
+    kwargs = {"IfNoneMatch": cached.etag} if cached is not None else {}
+    if max_bytes is not None:
+        kwargs["Range"] = f"bytes=0-{max_bytes - 1}"
+    logger.debug(f"Reading S3 object: s3://{S3_CONTENT_BUCKET}/{key}")
+    try:
+        response = s3_client.get_object(Bucket=S3_CONTENT_BUCKET, Key=key, **kwargs)
+    except s3_client.exceptions.NoSuchKey:
+        _file_cache.pop(cache_key, None)
+        raise ContentNotFoundError(name)
+    except ClientError as e:
+        if cached is not None and e.response["Error"]["Code"] in ("304", "NotModified"):
+            logger.debug(f"S3 object unchanged: {key}")
+            return cached
+        raise
+
+    data = response["Body"].read()
+    body = data.decode("utf-8") if max_bytes is None else _decode_head(data, max_bytes)
+    file = ContentFile(body, response["ETag"])
+    _file_cache[cache_key] = file
+    return file
+
+
+def fetch_content_file(content_type: ContentType, slug: str) -> ContentFile:
+    """Read a content file, revalidating against the last copy instead of re-downloading it."""
     config = CONTENT_CONFIG[content_type]
+    name = f"{content_type.value}/{slug}"
     if CONTENT_SOURCE == "local":
-        file_path = config["local_dir"] / f"{slug}.md"
-        logger.debug(f"Reading local file: {file_path}")
-        try:
-            with open(file_path, encoding="utf-8") as f:
-                return f.read()
-        except FileNotFoundError:
-            raise ContentNotFoundError(f"{content_type.value}/{slug}")
+        return _read_local_file(config["local_dir"] / f"{slug}.md", name)
     else:
-        key = f"{config['s3_prefix']}{slug}.md"
-        logger.debug(f"Reading S3 object: s3://{S3_CONTENT_BUCKET}/{key}")
-        s3_client = get_s3_client()
-        try:
-            response = s3_client.get_object(Bucket=S3_CONTENT_BUCKET, Key=key)
-        except s3_client.exceptions.NoSuchKey:
-            raise ContentNotFoundError(f"{content_type.value}/{slug}")
-        return response["Body"].read().decode("utf-8")
+        return _read_s3_object(f"{config['s3_prefix']}{slug}.md", name)
+
+
+def fetch_content_head(content_type: ContentType, slug: str) -> ContentFile:
+    """Read only the start of a content file: enough for its frontmatter and first paragraph.
+
+    Falls back to the whole file when the frontmatter doesn't end within HEAD_BYTES.
+    """
+    config = CONTENT_CONFIG[content_type]
+    name = f"{content_type.value}/{slug}"
+    if CONTENT_SOURCE == "local":
+        head = _read_local_file(config["local_dir"] / f"{slug}.md", name, HEAD_BYTES)
+    else:
+        head = _read_s3_object(f"{config['s3_prefix']}{slug}.md", name, HEAD_BYTES)
+    if head.body.startswith("---") and "\n---" not in head.body[3:]:
+        return fetch_content_file(content_type, slug)
+    return head
+
+
+def read_content_file(content_type: ContentType, slug: str) -> str:
+    return fetch_content_file(content_type, slug).body
+
+
+# Async interface: the same calls run in a worker thread so S3 I/O never blocks the event loop
+
+
+async def alist_content_files(content_type: ContentType) -> list[str]:
+    return await asyncio.to_thread(list_content_files, content_type)
+
+
+async def afetch_content_file(content_type: ContentType, slug: str) -> ContentFile:
+    return await asyncio.to_thread(fetch_content_file, content_type, slug)
+
+
+async def afetch_content_head(content_type: ContentType, slug: str) -> ContentFile:
+    return await asyncio.to_thread(fetch_content_head, content_type, slug)
+
+
+async def aread_content_file(content_type: ContentType, slug: str) -> str:
+    return (await afetch_content_file(content_type, slug)).body
 
 
 def list_blog_files() -> list[str]:
@@ -116,3 +263,31 @@ def list_digest_files() -> list[str]:
 
 def read_digest_file(slug: str) -> str:
     return read_content_file(ContentType.DIGEST, slug)
+
+
+def fetch_index_file() -> ContentFile:
+    if CONTENT_SOURCE == "local":
+        return _read_local_file(INDEX_PATH, INDEX_KEY)
+    else:
+        return _read_s3_object(INDEX_KEY, INDEX_KEY)
+
+
+def read_index_file() -> str:
+    return fetch_index_file().body
+
+
+def write_index_file(data: str) -> str:
+    """Write the content index next to the content and return where it went."""
+    if CONTENT_SOURCE == "local":
+        INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        INDEX_PATH.write_text(data, encoding="utf-8")
+        return str(INDEX_PATH)
+    else:
+        s3_client = get_s3_client()
+        s3_client.put_object(
+            Bucket=S3_CONTENT_BUCKET,
+            Key=INDEX_KEY,
+            Body=data.encode("utf-8"),
+            ContentType="application/json",
+        )
+        return f"s3://{S3_CONTENT_BUCKET}/{INDEX_KEY}"
@@ -0,0 +1,219 @@
+"""Prerender the whole site into a directory any static file server can serve.
+
+Pages are requested from the app in-process, so they come out exactly as the
+app would serve them. Each page's ETag is recorded in a manifest, and the next
+export sends it back as If-None-Match: pages whose inputs haven't changed answer
+304 without rendering and are left alone on disk.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.archive import month_bounds
+from app.compression import SUFFIXES, precompress_directory
+from app.content import ContentType, list_content_files
+from app.main import (
+    ASSETS_DIR,
+    BLOG_PAGE_SIZE,
+    DIGEST_PAGE_SIZE,
+    STATIC_DIR,
+    app,
+    digest_listing_url,
+    load_blog_archive,
+    load_digest_archive,
+    load_sitemap,
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".export-manifest.json"
+EXPORT_CONCURRENCY = int(os.getenv("EXPORT_CONCURRENCY", "16"))
+
+# Pages that don't depend on which posts exist
+FIXED_PATHS = [
+    "/",
+    "/blog",
+    "/digest",
+    "/projects",
+    "/about",
+    # Linked from the navigation; the form is there, results need the app
+    "/search",
+    "/partials/sidebar-blogs",
+]
+# Served as files with their own extension instead of a directory index
+FILE_PATHS = ["/sitemap.xml", "/robots.txt", "/feed.xml", "/digest/feed.xml"]
+# A path no route serves, rendered to 404.html for the static server's error page
+MISSING_PATH = "/404"
+
+DETAIL_PREFIXES = {
+    ContentType.BLOG: "/blog",
+    ContentType.PROJECT: "/projects",
+    ContentType.DIGEST: "/digest",
+}
+
+
+@dataclass
+class ExportResult:
+    written: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+
+def site_paths() -> list[str]:
+    paths = FIXED_PATHS + FILE_PATHS
+    for content_type, prefix in DETAIL_PREFIXES.items():
+        paths.extend(f"{prefix}/{slug}" for slug in list_content_files(content_type))
+    paths.extend(f"/sitemaps/{name}.xml" for name in load_sitemap().parts)
+    # Further pages of each listing, as linked from its first page
+    blogs = load_blog_archive()
+    paths.extend(f"/blog/{way}/{cursor}" for way, cursor in blogs.page_cursors(BLOG_PAGE_SIZE))
+    archive = load_digest_archive()
+    periods = [
+        (None, None),
+        *((year, None) for year in archive.years),
+        *((month.year, month.month) for month in archive.months),
+    ]
+    for year, month in periods:
+        url = digest_listing_url(year, month)
+        start, end = (None, None) if year is None else month_bounds(year, month)
+        if year is not None:
+            paths.append(url)
+        cursors = archive.page_cursors(DIGEST_PAGE_SIZE, start, end)
+        paths.extend(f"{url}/{way}/{cursor}" for way, cursor in cursors)
+    return paths
+
+
+def output_file(path: str) -> str:
+    """Where a URL path is written, relative to the output directory."""
+    if path == MISSING_PATH:
+        return "404.html"
+    if path in FILE_PATHS or path.startswith("/sitemaps/"):
+        return path.lstrip("/")
+    return f"{path.strip('/')}/index.html".lstrip("/")
+
+
+async def _get(path: str, etag: str | None) -> tuple[int, dict[str, str], bytes]:
+    """Minimal in-process ASGI GET, without the lifespan (no content watcher)."""
+    headers = [(b"host", b"localhost"), (b"accept-encoding", b"identity")]
+    if etag is not None:
+        headers.append((b"if-none-match", etag.encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    status = 500
+    response_headers: dict[str, str] = {}
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers.update((k.decode(), v.decode()) for k, v in message["headers"])
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, response_headers, bytes(body)
+
+
+def _write_if_changed(target: Path, body: bytes) -> bool:
+    if target.exists() and target.read_bytes() == body:
+        return False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(body)
+    tmp.replace(target)
+    return True
+
+
+def _copy_static(source: Path, output: Path) -> None:
+    for path in source.rglob("*"):
+        if not path.is_file():
+            continue
+        target = output / path.relative_to(source)
+        stat = path.stat()
+        if target.exists():
+            target_stat = target.stat()
+            if target_stat.st_size == stat.st_size and target_stat.st_mtime >= stat.st_mtime:
+                continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, target)
+
+
+async def _export(output: Path, concurrency: int) -> ExportResult:
+    manifest_path = output / MANIFEST_NAME
+    try:
+        manifest: dict[str, str] = json.loads(manifest_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+
+    paths = await asyncio.to_thread(site_paths)
+    result = ExportResult()
+    semaphore = asyncio.Semaphore(concurrency)
+    new_manifest: dict[str, str] = {}
+
+    async def export_page(path: str) -> None:
+        target = output / output_file(path)
+        etag = manifest.get(path) if target.exists() else None
+        async with semaphore:
+            status, headers, body = await _get(path, etag)
+        if status == 304:
+            new_manifest[path] = etag
+            result.unchanged.append(path)
+        elif status == 200 or (path == MISSING_PATH and status == 404):
+            if await asyncio.to_thread(_write_if_changed, target, body):
+                result.written.append(path)
+            else:
+                result.unchanged.append(path)
+            if "etag" in headers:
+                new_manifest[path] = headers["etag"]
+        else:
+            logger.warning(f"Skipping {path}: HTTP {status}")
+            result.failed.append(path)
+
+    await asyncio.gather(*(export_page(p) for p in [*paths, MISSING_PATH]))
+
+    # Pages of posts that were deleted since the last export
+    for path in manifest.keys() - set(paths):
+        target = output / output_file(path)
+        for suffix in ("", *SUFFIXES.values()):
+            target.with_name(target.name + suffix).unlink(missing_ok=True)
+        result.removed.append(path)
+
+    manifest_path.write_text(json.dumps(new_manifest, indent=2, sort_keys=True))
+    return result
+
+
+def export_site(output: Path, concurrency: int = EXPORT_CONCURRENCY) -> ExportResult:
+    """Render every page into `output`, rewriting only the pages whose inputs changed."""
+    output.mkdir(parents=True, exist_ok=True)
+    result = asyncio.run(_export(output, concurrency))
+    _copy_static(STATIC_DIR, output / "static")
+    _copy_static(ASSETS_DIR, output / "assets")
+    # .br/.gz siblings for servers that can serve them directly (e.g. nginx gzip_static)
+    precompress_directory(output)
+    logger.info(
+        f"Exported to {output}: {len(result.written)} written, "
+        f"{len(result.unchanged)} unchanged, {len(result.removed)} removed"
+    )
+    return result
@@ -0,0 +1,90 @@
+"""Atom feeds of the newest blog posts and digests, with their full content.
+
+Feeds are rendered from the cached post models, once per version of their
+entries (see `memo_latest` in app.main), and served through the page cache with
+validators. Aggregators polling them get a 304 or the cached bytes and never
+cause content reads.
+"""
+
+import os
+from collections.abc import Iterable, Mapping
+from datetime import UTC, datetime, time
+from hashlib import sha1
+from typing import NamedTuple
+from xml.sax.saxutils import escape, quoteattr
+
+from app.sitemap import XML_HEADER, last_modified
+
+# Newest posts included in each feed
+FEED_ENTRIES = int(os.getenv("FEED_ENTRIES", "20"))
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+FEED_AUTHOR = "Sean-Michael"
+
+
+class FeedEntry(NamedTuple):
+    title: str
+    url: str
+    published: datetime
+    updated: datetime
+    content: str  # rendered HTML
+    author: str | None = None
+    categories: tuple[str, ...] = ()
+
+
+def feed_entries(base: str, posts: Iterable, modified: Mapping[str, datetime]) -> list[FeedEntry]:
+    return [
+        FeedEntry(
+            post.title,
+            f"{base}/{post.slug}",
+            datetime.combine(post.date, time(), UTC),
+            last_modified(post.date, modified.get(post.slug)),
+            post.content,
+            getattr(post, "author", None),
+            tuple(getattr(post, "tags", ())),
+        )
+        for post in posts
+    ]
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _render_entry(entry: FeedEntry) -> str:
+    parts = [
+        f"<title>{escape(entry.title)}</title>",
+        f"<link href={quoteattr(entry.url)}/>",
+        f"<id>{escape(entry.url)}</id>",
+        f"<published>{_timestamp(entry.published)}</published>",
+        f"<updated>{_timestamp(entry.updated)}</updated>",
+    ]
+    if entry.author:
+        parts.append(f"<author><name>{escape(entry.author)}</name></author>")
+    parts.extend(f"<category term={quoteattr(c)}/>" for c in entry.categories)
+    parts.append(f'<content type="html">{escape(entry.content)}</content>')
+    return "  <entry>\n    " + "\n    ".join(parts) + "\n  </entry>"
+
+
+def render_atom(title: str, site: str, path: str, entries: list[FeedEntry]) -> str:
+    feed_url = f"{site}{path}"
+    updated = max((e.updated for e in entries), default=datetime(2000, 1, 1, tzinfo=UTC))
+    head = [
+        f"<title>{escape(title)}</title>",
+        f'<link rel="self" href={quoteattr(feed_url)}/>',
+        f"<link href={quoteattr(site)}/>",
+        f"<id>{escape(feed_url)}</id>",
+        f"<updated>{_timestamp(updated)}</updated>",
+        f"<author><name>{escape(FEED_AUTHOR)}</name></author>",
+    ]
+    body = "\n".join(["  " + line for line in head] + [_render_entry(e) for e in entries])
+    return f'{XML_HEADER}<feed xmlns="{ATOM_NS}">\n{body}\n</feed>'
+
+
+class Feed:
+    """The Atom XML for one feed and a version to validate it by."""
+
+    def __init__(self, title: str, site: str, path: str, entries: list[FeedEntry]):
+        self.entries = entries
+        self.xml = render_atom(title, site, path, entries)
+        self.version = sha1(self.xml.encode(), usedforsecurity=False).hexdigest()
@@ -0,0 +1,116 @@
+"""Precompiled content index: every post parsed and rendered ahead of time.
+
+The index is built once (see scripts/build_index.py) and stored next to the
+content as a single JSON file or S3 object, so the app can serve its first
+request without listing, fetching or rendering individual posts.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import UTC, datetime
+
+from pydantic import BaseModel, PrivateAttr
+
+from app.bulk import load_many
+from app.content import (
+    ContentNotFoundError,
+    ContentType,
+    alist_content_files,
+    read_index_file,
+    write_index_file,
+)
+from app.models import Blog, Digest, DigestSummary, Project
+from app.render import parse_blog, parse_digest, parse_digest_slug, parse_project
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the models or rendering change in a way old indexes can't satisfy
+INDEX_VERSION = 1
+
+
+class IndexVersionError(Exception):
+    pass
+
+
+class ContentIndex(BaseModel):
+    version: int = INDEX_VERSION
+    built_at: datetime
+    blogs: list[Blog] = []
+    projects: list[Project] = []
+    digests: list[Digest] = []
+    digest_summaries: list[DigestSummary] = []
+
+    _blogs: dict[str, Blog] = PrivateAttr(default_factory=dict)
+    _projects: dict[str, Project] = PrivateAttr(default_factory=dict)
+    _digests: dict[str, Digest] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context) -> None:
+        self._blogs = {b.slug: b for b in self.blogs}
+        self._projects = {p.slug: p for p in self.projects}
+        self._digests = {d.slug: d for d in self.digests}
+
+    def get_blog(self, slug: str) -> Blog:
+        try:
+            return self._blogs[slug]
+        except KeyError:
+            raise ContentNotFoundError(f"blog/{slug}")
+
+    def get_project(self, slug: str) -> Project:
+        try:
+            return self._projects[slug]
+        except KeyError:
+            raise ContentNotFoundError(f"project/{slug}")
+
+    def get_digest(self, slug: str) -> Digest:
+        try:
+            return self._digests[slug]
+        except KeyError:
+            raise ContentNotFoundError(f"digest/{slug}")
+
+
+async def _load_all(content_type: ContentType, parse) -> list:
+    slugs = await alist_content_files(content_type)
+    return list((await load_many(content_type, slugs, parse)).values())
+
+
+async def _build_index() -> ContentIndex:
+    blogs, projects, digests = await asyncio.gather(
+        _load_all(ContentType.BLOG, parse_blog),
+        _load_all(ContentType.PROJECT, parse_project),
+        _load_all(ContentType.DIGEST, parse_digest),
+    )
+    summaries = [parse_digest_slug(d.slug) for d in digests]
+
+    return ContentIndex(
+        built_at=datetime.now(UTC),
+        blogs=sorted(blogs, key=lambda b: b.date, reverse=True),
+        projects=sorted(projects, key=lambda p: p.date, reverse=True),
+        digests=sorted(digests, key=lambda d: d.date, reverse=True),
+        digest_summaries=sorted(summaries, key=lambda d: d.date, reverse=True),
+    )
+
+
+def build_index() -> ContentIndex:
+    return asyncio.run(_build_index())
+
+
+def save_index(index: ContentIndex) -> str:
+    location = write_index_file(index.model_dump_json())
+    logger.info(
+        f"Wrote index v{index.version} to {location}: {len(index.blogs)} blogs, "
+        f"{len(index.projects)} projects, {len(index.digests)} digests"
+    )
+    return location
+
+
+def load_index() -> ContentIndex:
+    return parse_index(read_index_file())
+
+
+def parse_index(raw: str) -> ContentIndex:
+    data = json.loads(raw)
+    version = data.get("version")
+    if version != INDEX_VERSION:
+        raise IndexVersionError(f"index is v{version}, app expects v{INDEX_VERSION}")
+    return ContentIndex.model_validate(data)
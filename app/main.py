@@ -1,35 +1,94 @@
-import re
-import time
-from datetime import date
-from functools import lru_cache
-from io import StringIO
+import asyncio
+import logging
+import os
+import threading
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
+from time import perf_counter
+from typing import Any
 
-import frontmatter
-import markdown
 from fastapi import FastAPI, Request
 from fastapi.exceptions import HTTPException
 from fastapi.responses import HTMLResponse, PlainTextResponse, Response
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
-
+from markupsafe import Markup
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app.archive import Archive, Page, month_bounds
+from app.assets import ASSETS_DIR, ASSETS_URL, AssetManifest, ImmutableStaticFiles
+from app.bulk import load_many
+from app.cache import CACHE_TTL, content_cache, memo_latest
+from app.compression import (
+    MIN_SIZE,
+    PrecompressedStaticFiles,
+    encoded_etag,
+    negotiate_encoding,
+)
+from app.conditional import (
+    Validator,
+    is_not_modified,
+    not_modified_response,
+    template_version,
+    validator_for,
+    validator_headers,
+)
 from app.content import (
+    CONTENT_SOURCE,
+    ContentFile,
     ContentNotFoundError,
-    list_blog_files,
+    ContentType,
+    afetch_content_file,
+    afetch_content_head,
+    fetch_content_file,
+    fetch_content_head,
+    fetch_index_file,
+    list_content_files,
     list_digest_files,
-    list_project_files,
-    read_blog_file,
-    read_digest_file,
-    read_project_file,
+    modified_times,
+)
+from app.feeds import FEED_ENTRIES, Feed, feed_entries
+from app.index import ContentIndex, IndexVersionError, parse_index
+from app.metrics import (
+    MULTIPROCESS,
+    REQUEST_SECONDS,
+    WARMUP_SECONDS,
+    keep_sizes_recorded,
+    latest_metrics,
 )
+from app.models import Blog, BlogSummary, Digest, DigestSummary, Project, ProjectSummary
+from app.page_cache import page_cache
+from app.render import (
+    forget_parsed,
+    get_parsed,
+    parse_blog,
+    parse_blog_summary,
+    parse_digest,
+    parse_digest_slug,
+    parse_if_changed,
+    parse_project,
+    parse_project_summary,
+)
+from app.search import PackedSearchIndex, SearchIndex
+from app.sitemap import Sitemap, SitemapUrl, post_urls
+from app.snapshot import SNAPSHOT_REFRESH, Snapshot, build_snapshot, shared_snapshot, write_snapshot
+from app.taxonomy import get_tag_index
+from app.watcher import ChangedContent, watch_content
+
+logger = logging.getLogger(__name__)
 
-CACHE_TTL = 300  # 5 minutes
+# Serve everything from the precompiled index built by scripts/build_index.py
+CONTENT_INDEX = os.getenv("CONTENT_INDEX", "false").lower() in ("1", "true", "yes")
 
+# Re-render local content as soon as it is edited instead of polling on a TTL
+CONTENT_WATCH = os.getenv("CONTENT_WATCH", "true").lower() in ("1", "true", "yes")
 
-def _ttl_bucket(ttl: int = CACHE_TTL) -> int:
-    """Return a value that changes every `ttl` seconds, for lru_cache expiry."""
-    return int(time.monotonic() // ttl)
+# Load and render every post at startup; /readyz answers 503 until that's done
+CONTENT_WARMUP = os.getenv("CONTENT_WARMUP", "false").lower() in ("1", "true", "yes")
+
+# Longest a worker's warm-up waits for another worker to write the shared snapshot
+SNAPSHOT_WAIT = float(os.getenv("SNAPSHOT_WAIT", "120"))
 
 
 BASE_DIR = Path(__file__).parent.parent
@@ -42,42 +101,312 @@ TODO:
 """
 
 
-class Blog(BaseModel):
-    title: str
-    date: date
-    author: str
-    content: str
-    slug: str
-    tags: list[str] = []
+def _load_content(
+    content_type: ContentType,
+    slug: str,
+    parse: Callable[[str, str], Any],
+    fetch: Callable[[ContentType, str], ContentFile] = fetch_content_file,
+) -> Any:
+    key = (content_type, slug, parse.__name__)
+    try:
+        file = fetch(content_type, slug)
+    except ContentNotFoundError:
+        forget_parsed(key)
+        raise
+    return parse_if_changed(key, file, lambda body: parse(slug, body))
+
+
+# Last listing built per loader; see _stable_listing
+_listings: dict[str, list] = {}
+
+
+def _stable_listing(name: str, posts: list) -> list:
+    """Return the previous listing object when a refresh produced the same posts.
+
+    Listings then keep their identity until content changes, so anything derived
+    from them with memo_latest (tag index, feeds, ...) is only rebuilt on change.
+    """
+    previous = _listings.get(name)
+    if previous is not None and previous == posts:
+        return previous
+    _listings[name] = posts
+    return posts
+
+
+def _load_all_content(
+    content_type: ContentType,
+    post_loader: Callable,
+    parse: Callable[[str, str], Any],
+    fetch: Callable[[ContentType, str], Awaitable[ContentFile]],
+    prime: bool = True,
+) -> list:
+    """Load every post of a type, fetching each one again.
+
+    Cached posts aren't reused: one can be up to a TTL old itself, so building
+    the listing from it could leave an edit out of listings for two TTLs instead
+    of one. Refetching is cheap, as render keeps the parsed result of each file
+    version and only changed posts are parsed again. Posts already in the content
+    cache under `post_loader` are refreshed with what was loaded.
+
+    With `prime`, every loaded post is put in that cache. Whole-corpus loads turn
+    it off: the cache is bounded, and filling it with every post would evict the
+    listings and the posts being read.
+
+    Runs its own event loop, so call it from a worker thread like the routes do.
+    """
+    slugs = list_content_files(content_type)
+    loaded = asyncio.run(load_many(content_type, slugs, parse, fetch)) if slugs else {}
+    for slug, post in loaded.items():
+        if prime or post_loader.contains(slug):
+            post_loader.prime(slug, value=post)
+    return [loaded[slug] for slug in slugs if slug in loaded]
+
+
+def load_content_index() -> ContentIndex | Snapshot | None:
+    """Return the shared snapshot or precompiled index, or None to load posts individually."""
+    if shared_snapshot.current is not None:
+        return shared_snapshot.current
+    return _load_index_file()
+
+
+@content_cache.cached
+def _load_index_file() -> ContentIndex | None:
+    if not CONTENT_INDEX:
+        return None
+    try:
+        file = fetch_index_file()
+        unchanged = get_parsed("index", file.etag)
+        index = parse_if_changed("index", file, parse_index)
+    except (ContentNotFoundError, IndexVersionError) as e:
+        logger.warning(f"Content index unavailable, loading posts individually: {e}")
+        return None
+    if unchanged is None:
+        logger.info(f"Loaded content index built at {index.built_at.isoformat()}")
+    return index
+
+
+def load_modified_times(content_type: ContentType) -> dict[str, datetime]:
+    """When each post's file last changed, from the shared snapshot if there is one.
+
+    Only the worker writing the snapshot lists content, so the others would
+    otherwise have no times, and serve different lastmods and ETags.
+    """
+    index = load_content_index()
+    if isinstance(index, Snapshot):
+        return index.modified[content_type]
+    return modified_times(content_type)
+
+
+# Set once the app can serve requests without cold loads
+_ready = threading.Event()
+
+
+async def warm_up() -> None:
+    """Load and render every post, listing, the search index and sitemap into the caches.
+
+    Listings load concurrently, each bulk-loading its posts. A failure only means
+    those requests load cold, so the app is marked ready either way.
+    """
+    started = perf_counter()
+    if shared_snapshot.enabled:
+        # Another worker may be writing the snapshot; wait for it rather than load everything
+        while shared_snapshot.current is None and perf_counter() - started < SNAPSHOT_WAIT:
+            await asyncio.sleep(0.2)
+    loaders = [load_all_blogs, load_all_projects, list_all_digests]
+    if await asyncio.to_thread(load_content_index) is None:
+        # Full posts, for search; a snapshot or index already has them
+        loaders += [_load_all_blog_posts, _load_all_project_posts, _load_all_digest_posts]
+    results = await asyncio.gather(
+        *(asyncio.to_thread(loader) for loader in loaders), return_exceptions=True
+    )
+    for loader, result in zip(loaders, results):
+        if isinstance(result, Exception):
+            logger.error(f"Warm-up of {loader.__name__} failed: {result}")
+    for loader in (load_search_index, load_sitemap):
+        try:
+            await asyncio.to_thread(loader)
+        except Exception as e:
+            logger.error(f"Warm-up of {loader.__name__} failed: {e}")
+    seconds = perf_counter() - started
+    WARMUP_SECONDS.set(seconds)
+    logger.info(f"Warmed up in {seconds:.2f}s")
+    _ready.set()
+
+
+def _watching_started() -> None:
+    # The watcher invalidates whatever changes, so entries never need to expire
+    content_cache.set_ttl(float("inf"))
+
+
+def _watching_stopped(task: asyncio.Task, stopping: asyncio.Event) -> None:
+    # Without the watcher nothing invalidates changed content, so let it expire again
+    error = None if task.cancelled() else task.exception()
+    expiring = content_cache.ttl == CACHE_TTL
+    if not expiring:
+        content_cache.set_ttl(CACHE_TTL)
+    if stopping.is_set():
+        return
+    if error is not None:
+        logger.error(f"Content watcher failed: {error}")
+    if not expiring:
+        logger.warning(
+            f"Content watcher stopped, cached content expires after {CACHE_TTL:g}s again"
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    watcher = None
+    stopping = asyncio.Event()
+    if CONTENT_WATCH and CONTENT_SOURCE == "local":
+        watcher = asyncio.create_task(
+            watch_content(refresh_changed_content, stopping, on_start=_watching_started)
+        )
+        watcher.add_done_callback(lambda task: _watching_stopped(task, stopping))
+    await asyncio.to_thread(_load_index_file)
+    snapshots = None
+    if shared_snapshot.enabled:
+        snapshots = asyncio.create_task(keep_snapshot_synced(stopping))
+    sizes = asyncio.create_task(keep_sizes_recorded(stopping)) if MULTIPROCESS else None
+    # In the background, so the server is up (and /readyz answers) while it runs
+    warming = asyncio.create_task(warm_up()) if CONTENT_WARMUP else None
+    if warming is None:
+        _ready.set()
+    yield
+    _ready.clear()
+    if warming is not None:
+        warming.cancel()
+    stopping.set()
+    if watcher is not None and not watcher.done():
+        await watcher
+    if snapshots is not None:
+        await snapshots
+        shared_snapshot.release()
+    if sizes is not None:
+        await sizes
+
+
+app = FastAPI(lifespan=lifespan)
+# Built ahead of time by scripts/build_assets.py; without it pages link /static/
+assets = AssetManifest(STATIC_DIR, ASSETS_DIR).load()
+app.mount("/static", PrecompressedStaticFiles(directory=STATIC_DIR), name="static")
+if assets.names:
+    app.mount(ASSETS_URL, ImmutableStaticFiles(directory=ASSETS_DIR), name="assets")
+templates = Jinja2Templates(directory=TEMPLATES_DIR)
+templates.env.globals["asset"] = assets.url
+# Pages link to hashed asset names, so a changed asset is a changed page
+TEMPLATE_VERSION = template_version(TEMPLATES_DIR) + assets.version
+
+
+def render_page(request: Request, name: str, context: dict | None = None) -> Response:
+    """Render a template, or answer 304 if the client already has this version of it.
+
+    The validator covers the template set and everything passed to the template, so
+    it is known before rendering, and a page rendered earlier from the same data is
+    served from the page cache without touching Jinja.
+
+    Boosted htmx navigations only get the page's content block (see `_render_fragment`),
+    cached and validated separately from the full page.
+    """
+    context = context or {}
+    fragment = is_fragment_request(request) and "content" in templates.get_template(name).blocks
+    validator = validator_for(TEMPLATE_VERSION, name, fragment, context)
+    if fragment:
+        return cached_response(
+            request, validator, lambda: _render_fragment(request, name, context), FRAGMENT_HEADERS
+        )
+    return cached_response(
+        request, validator, lambda: templates.TemplateResponse(request, name, context)
+    )
 
 
-class Project(BaseModel):
-    title: str
-    date: date
-    content: str
-    slug: str
-    author: str = "Sean-Michael"
-    github_url: str
-    demo_url: str | None = None
-    tech_stack: list[str] = []
-    status: str = "active"
-    tags: list[str] = []
-    description: str = ""
+# Swap fragments into the layout the page already has, instead of the whole body
+FRAGMENT_HEADERS = {"HX-Retarget": "#main-content", "HX-Reswap": "innerHTML show:window:top"}
 
 
-class DigestSummary(BaseModel):
-    title: str
-    date: date
-    slug: str
+def is_fragment_request(request: Request) -> bool:
+    # History restores after a cache miss replace the whole body, so they need the full page
+    return (
+        request.headers.get("HX-Request") == "true"
+        and request.headers.get("HX-History-Restore-Request") != "true"
+    )
 
 
-class Digest(DigestSummary):
-    content: str
+def _render_fragment(request: Request, name: str, context: dict) -> Response:
+    """Just the page's title and content block, plus the sidebar so it shows the new page.
 
+    htmx takes the title from the response and swaps the sidebar in out of band; the
+    navbar, head and the rest of the layout stay as they are.
+    """
+    template = templates.get_template(name)
+    page = template.new_context({**context, "request": request})
+    return templates.TemplateResponse(
+        request,
+        "partials/fragment.html",
+        {
+            # Output of the autoescaped page template itself, so already safe HTML
+            "title": Markup("".join(template.blocks["title"](page))),  # nosec B704
+            "content": Markup("".join(template.blocks["content"](page))),  # nosec B704
+            "oob": True,
+        },
+    )
 
-app = FastAPI()
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
-templates = Jinja2Templates(directory=TEMPLATES_DIR)
+
+def cached_response(
+    request: Request,
+    validator: Validator,
+    render: Callable[[], Response],
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Answer from the client's cache or the page cache, calling `render` only on a miss.
+
+    Bodies are compressed if the client accepts it, once per version of the page,
+    and each encoding has its own ETag. `headers` are added to every answer that
+    has a body.
+    """
+    if is_not_modified(request, validator):
+        return not_modified_response(request, validator, {"Vary": VARY})
+    key = _page_key(request)
+    page = page_cache.get(key, validator.etag)
+    if page is None:
+        rendered = render()
+        page = page_cache.put(key, validator.etag, rendered.body, rendered.media_type)
+
+    headers = validator_headers(validator) | {"Vary": VARY} | (headers or {})
+    body = page.body
+    encoding = None
+    if len(body) >= MIN_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is not None:
+        body = page_cache.encode(key, page, encoding)
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = encoded_etag(validator.etag, encoding)
+    return Response(body, media_type=page.media_type, headers=headers)
+
+
+# Request headers that change what a template renders, beyond the URL
+PAGE_VARY_HEADERS: tuple[str, ...] = ("HX-Request", "HX-History-Restore-Request")
+VARY = ", ".join(("Accept-Encoding", *PAGE_VARY_HEADERS))
+
+
+def _page_key(request: Request) -> tuple:
+    return (
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        tuple(request.headers.get(h) for h in PAGE_VARY_HEADERS),
+    )
+
+
+@app.middleware("http")
+async def record_request_time(request: Request, call_next):
+    started = perf_counter()
+    response = await call_next(request)
+    # The route template, not the URL, so every post shares one series
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    REQUEST_SECONDS.labels(request.method, route, response.status_code).observe(
+        perf_counter() - started
+    )
+    return response
 
 
 @app.exception_handler(404)
@@ -90,166 +419,448 @@ async def content_not_found(request: Request, exc: ContentNotFoundError):
     return templates.TemplateResponse(request, "404.html", status_code=404)
 
 
+# Routes that may hit the content source are plain `def` so FastAPI runs them in its
+# threadpool: a slow S3 call then only ties up one worker thread, never the event loop.
+
+
 @app.get("/", response_class=HTMLResponse)
-async def home(request: Request):
-    ttl = _ttl_bucket()
-    blogs = load_all_blogs(ttl)
-    all_projects = load_all_projects(ttl)
-    return templates.TemplateResponse(
+def home(request: Request):
+    blogs = load_all_blogs()
+    all_projects = load_all_projects()
+    return render_page(
         request,
         "index.html",
         {"blogs": blogs[:3], "projects": all_projects},
     )
 
 
-@lru_cache(maxsize=128)
-def load_digest(slug: str, _ttl: int = 0) -> Digest:
-    content = read_digest_file(slug)
-    post = frontmatter.load(StringIO(content))
+# Index lookups are already O(1), so only the per-post loaders below are cached.
 
-    # Strip leading H1 from markdown body since the template renders the title separately
-    body = re.sub(r"^#\s+.+\n*", "", post.content, count=1)
 
-    return Digest.model_validate(
-        {
-            **post.metadata,
-            "content": markdown.markdown(body),
-            "slug": slug,
-        }
-    )
+@content_cache.cached
+def _load_digest(slug: str) -> Digest:
+    return _load_content(ContentType.DIGEST, slug, parse_digest)
 
 
-def parse_digest_slug(slug: str) -> DigestSummary:
-    """Derive title and date from slug like 'topic-words-2026-04-04'."""
-    # Last 3 segments are YYYY-MM-DD
-    parts = slug.rsplit("-", 3)
-    d = date(int(parts[1]), int(parts[2]), int(parts[3]))
-    title_part = parts[0].replace("-", " ").title()
-    title = f"{title_part} | {d.isoformat()}"
-    return DigestSummary(title=title, date=d, slug=slug)
+def load_digest(slug: str) -> Digest:
+    index = load_content_index()
+    if index is not None:
+        return index.get_digest(slug)
+    return _load_digest(slug)
 
 
-@lru_cache(maxsize=1)
-def list_all_digests(_ttl: int = 0) -> list[DigestSummary]:
+@content_cache.cached
+def _list_all_digests() -> list[DigestSummary]:
     summaries = [parse_digest_slug(slug) for slug in list_digest_files()]
-    return sorted(summaries, key=lambda d: d.date, reverse=True)
+    return _stable_listing("digests", sorted(summaries, key=lambda d: d.date, reverse=True))
 
 
-@lru_cache(maxsize=128)
-def load_blog(slug: str, _ttl: int = 0) -> Blog:
-    content = read_blog_file(slug)
-    post = frontmatter.load(StringIO(content))
+def list_all_digests() -> list[DigestSummary]:
+    index = load_content_index()
+    if index is not None:
+        return index.digest_summaries
+    return _list_all_digests()
 
-    return Blog.model_validate(
-        {
-            **post.metadata,
-            "content": markdown.markdown(post.content),
-            "slug": slug,
-        }
+
+@content_cache.cached
+def _load_blog(slug: str) -> Blog:
+    return _load_content(ContentType.BLOG, slug, parse_blog)
+
+
+def load_blog(slug: str) -> Blog:
+    index = load_content_index()
+    if index is not None:
+        return index.get_blog(slug)
+    return _load_blog(slug)
+
+
+# Listings only need frontmatter, so they read just the head of each post and never
+# render markdown; full posts are rendered when their detail page is requested.
+
+
+@content_cache.cached
+def _load_blog_summary(slug: str) -> BlogSummary:
+    return _load_content(ContentType.BLOG, slug, parse_blog_summary, fetch_content_head)
+
+
+@content_cache.cached
+def _load_all_blogs() -> list[BlogSummary]:
+    blogs = _load_all_content(
+        ContentType.BLOG, _load_blog_summary, parse_blog_summary, afetch_content_head
     )
+    return _stable_listing("blogs", sorted(blogs, key=lambda b: b.date, reverse=True))
 
 
-@lru_cache(maxsize=1)
-def load_all_blogs(_ttl: int = 0) -> list[Blog]:
-    blogs = []
-    for slug in list_blog_files():
-        blogs.append(load_blog(slug, _ttl))
-    return sorted(blogs, key=lambda b: b.date, reverse=True)
+def load_all_blogs() -> list[BlogSummary]:
+    index = load_content_index()
+    if index is not None:
+        return index.blogs
+    return _load_all_blogs()
 
 
-def get_all_tags(blogs: list[Blog]) -> list[str]:
-    tags = set()
-    for blog in blogs:
-        tags.update(blog.tags)
-    return sorted(tags)
+@content_cache.cached
+def _load_project(slug: str) -> Project:
+    return _load_content(ContentType.PROJECT, slug, parse_project)
 
 
-def get_related_posts(current: Blog, all_blogs: list[Blog], limit: int = 5) -> list[Blog]:
-    others = [b for b in all_blogs if b.slug != current.slug]
+def load_project(slug: str) -> Project:
+    index = load_content_index()
+    if index is not None:
+        return index.get_project(slug)
+    return _load_project(slug)
 
-    def score(b: Blog) -> tuple:
-        matches = len(set(b.tags) & set(current.tags))
-        return (-matches, -b.date.toordinal())
 
-    return sorted(others, key=score)[:limit]
+@content_cache.cached
+def _load_project_summary(slug: str) -> ProjectSummary:
+    return _load_content(ContentType.PROJECT, slug, parse_project_summary, fetch_content_head)
 
 
-def extract_first_paragraph(text: str) -> str:
-    for line in text.strip().splitlines():
-        line = line.strip()
-        if line and not line.startswith(("#", "-", "```")):
-            return line
-    return ""
+@content_cache.cached
+def _load_all_projects() -> list[ProjectSummary]:
+    projects = _load_all_content(
+        ContentType.PROJECT, _load_project_summary, parse_project_summary, afetch_content_head
+    )
+    return _stable_listing("projects", sorted(projects, key=lambda p: p.date, reverse=True))
 
 
-@lru_cache(maxsize=64)
-def load_project(slug: str, _ttl: int = 0) -> Project:
-    content = read_project_file(slug)
-    post = frontmatter.load(StringIO(content))
+def load_all_projects() -> list[ProjectSummary]:
+    index = load_content_index()
+    if index is not None:
+        return index.projects
+    return _load_all_projects()
 
-    description = post.metadata.get("description", "") or extract_first_paragraph(post.content)
 
-    return Project.model_validate(
-        {
-            **post.metadata,
-            "content": markdown.markdown(post.content),
-            "slug": slug,
-            "description": description,
-        }
+# Full posts, bodies included, for search; listings only need the summaries above.
+
+
+@content_cache.cached
+def _load_all_blog_posts() -> list[Blog]:
+    posts = _load_all_content(
+        ContentType.BLOG, _load_blog, parse_blog, afetch_content_file, prime=False
+    )
+    return _stable_listing("blog_posts", posts)
+
+
+@content_cache.cached
+def _load_all_project_posts() -> list[Project]:
+    posts = _load_all_content(
+        ContentType.PROJECT, _load_project, parse_project, afetch_content_file, prime=False
+    )
+    return _stable_listing("project_posts", posts)
+
+
+@content_cache.cached
+def _load_all_digest_posts() -> list[Digest]:
+    posts = _load_all_content(
+        ContentType.DIGEST, _load_digest, parse_digest, afetch_content_file, prime=False
+    )
+    return _stable_listing("digest_posts", posts)
+
+
+_search_index = SearchIndex()
+
+
+@memo_latest
+def _synced_search_index(
+    blogs: list[Blog], projects: list[Project], digests: list[Digest]
+) -> SearchIndex:
+    reindexed = sum(
+        _search_index.sync(content_type, posts)
+        for content_type, posts in (
+            (ContentType.BLOG, blogs),
+            (ContentType.PROJECT, projects),
+            (ContentType.DIGEST, digests),
+        )
+    )
+    logger.info(f"Search index: {reindexed} of {len(_search_index)} posts (re)indexed")
+    return _search_index
+
+
+def load_search_index() -> SearchIndex | PackedSearchIndex:
+    index = load_content_index()
+    if isinstance(index, Snapshot):
+        # Indexed once by the worker writing the snapshot
+        return index.search_index
+    if index is not None:
+        return _synced_search_index(index.blogs, index.projects, index.digests)
+    return _synced_search_index(
+        _load_all_blog_posts(), _load_all_project_posts(), _load_all_digest_posts()
     )
 
 
-@lru_cache(maxsize=1)
-def load_all_projects(_ttl: int = 0) -> list[Project]:
-    projects = []
-    for slug in list_project_files():
-        projects.append(load_project(slug, _ttl))
-    return sorted(projects, key=lambda p: p.date, reverse=True)
+@memo_latest
+def _snapshot_data(
+    blogs: list[Blog], projects: list[Project], digests: list[Digest], *modified: dict
+) -> bytes:
+    return build_snapshot(
+        blogs,
+        projects,
+        digests,
+        _synced_search_index(blogs, projects, digests),
+        dict(zip(ContentType, modified, strict=True)),
+    )
+
+
+def sync_snapshot() -> None:
+    """Write the shared snapshot if this worker holds the lock, then attach to the newest one.
+
+    The writer loads content through the usual cached loaders, so only posts that
+    changed are fetched and rendered again, and the file is only rewritten when
+    something did change.
+    """
+    if shared_snapshot.lead():
+        try:
+            data = _snapshot_data(
+                _load_all_blog_posts(),
+                _load_all_project_posts(),
+                _load_all_digest_posts(),
+                *(modified_times(content_type) for content_type in ContentType),
+            )
+            if write_snapshot(shared_snapshot.path, data):
+                logger.info(f"Wrote content snapshot ({len(data)} bytes)")
+        except Exception as e:
+            # The other workers keep serving the previous snapshot
+            logger.error(f"Writing the content snapshot failed: {e}")
+    shared_snapshot.attach()
+
+
+async def keep_snapshot_synced(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        await asyncio.to_thread(sync_snapshot)
+        try:
+            await asyncio.wait_for(stop.wait(), SNAPSHOT_REFRESH)
+        except TimeoutError:
+            pass
+
+
+def _reload(loader: Callable, *args) -> None:
+    try:
+        loader(*args)
+    except ContentNotFoundError:
+        pass  # deleted, reloading its listing drops it
+    except Exception as e:
+        # Most likely a half-saved file; it is retried on the next request or save
+        logger.warning(f"Re-rendering changed content failed: {e}")
+
+
+def refresh_changed_content(changed: set[ChangedContent]) -> None:
+    """Re-render only the changed posts and rebuild the listings they appear in."""
+    post_loaders = {
+        ContentType.BLOG: (_load_blog_summary, _load_blog),
+        ContentType.PROJECT: (_load_project_summary, _load_project),
+        ContentType.DIGEST: (_load_digest,),
+    }
+    list_loaders = {
+        ContentType.BLOG: (_load_all_blogs, _load_all_blog_posts),
+        ContentType.PROJECT: (_load_all_projects, _load_all_project_posts),
+        ContentType.DIGEST: (_list_all_digests, _load_all_digest_posts),
+    }
+    changed_types = set()
+    for item in changed:
+        if item is None:
+            _load_index_file.invalidate()
+            _reload(_load_index_file)
+            continue
+        content_type, slug = item
+        changed_types.add(content_type)
+        for loader in post_loaders[content_type]:
+            # Only re-render what was cached before; the rest renders when first requested
+            if loader.contains(slug):
+                loader.invalidate(slug)
+                _reload(loader, slug)
+    for content_type in changed_types:
+        for loader in list_loaders[content_type]:
+            if loader.contains():
+                loader.invalidate()
+                _reload(loader)
 
 
 # TODO: can't these be made into one func with optional path?
 
 
+DIGEST_PAGE_SIZE = 30
+BLOG_PAGE_SIZE = 20
+
+
+@memo_latest
+def _digest_archive(digests: list[DigestSummary]) -> Archive:
+    return Archive(digests)
+
+
+@memo_latest
+def _blog_archive(blogs: list[BlogSummary]) -> Archive:
+    return Archive(blogs)
+
+
+def load_digest_archive() -> Archive:
+    return _digest_archive(list_all_digests())
+
+
+def _page_links(request: Request, base: str, page: Page) -> dict:
+    """URLs of the newer and older pages, keeping the query (such as the tag)."""
+    query = f"?{request.url.query}" if request.url.query else ""
+    return {
+        "newer_url": f"{base}/before/{page.newer}{query}" if page.newer else None,
+        "older_url": f"{base}/after/{page.older}{query}" if page.older else None,
+    }
+
+
+def digest_listing_url(year: int | None = None, month: int | None = None) -> str:
+    if year is None:
+        return "/digest"
+    return f"/digest/{year}" if month is None else f"/digest/{year}/{month:02d}"
+
+
+def _digest_page(
+    request: Request,
+    after: str | None,
+    before: str | None,
+    year: int | None = None,
+    month: int | None = None,
+) -> Response:
+    archive = load_digest_archive()
+    start, end = month_bounds(year, month) if year is not None else (None, None)
+    page = archive.page(after, before, DIGEST_PAGE_SIZE, start, end)
+    if year is not None and not page.posts:
+        raise ContentNotFoundError(f"No digests for {year}-{month or ''}")
+    return render_page(
+        request,
+        "digest_index.html",
+        {
+            "digests": page.posts,
+            "months": archive.months,
+            "period": start.strftime("%B %Y" if month else "%Y") if start else None,
+            **_page_links(request, digest_listing_url(year, month), page),
+        },
+    )
+
+
 @app.get("/digest", response_class=HTMLResponse)
-async def get_digests(request: Request):
-    digests = list_all_digests(_ttl_bucket())
-    return templates.TemplateResponse(request, "digest_index.html", {"digests": digests})
+@app.get("/digest/after/{after}", response_class=HTMLResponse)
+@app.get("/digest/before/{before}", response_class=HTMLResponse)
+def get_digests(request: Request, after: str | None = None, before: str | None = None):
+    return _digest_page(request, after, before)
+
+
+def _newest_posts(summaries: list, load: Callable[[str], Any]) -> list:
+    """Full posts for the first FEED_ENTRIES summaries, skipping any deleted since."""
+    posts = []
+    for summary in summaries[:FEED_ENTRIES]:
+        try:
+            posts.append(load(summary.slug))
+        except ContentNotFoundError:
+            continue
+    return posts
+
+
+@memo_latest
+def _blog_feed(modified: dict[str, datetime], *posts: Blog) -> Feed:
+    entries = feed_entries(f"{SITE}/blog", posts, modified)
+    return Feed("Sean-Michael's Blog", SITE, "/feed.xml", entries)
+
+
+@memo_latest
+def _digest_feed(modified: dict[str, datetime], *digests: Digest) -> Feed:
+    entries = feed_entries(f"{SITE}/digest", digests, modified)
+    return Feed("Daily Digests | Sean-Michael", SITE, "/digest/feed.xml", entries)
+
+
+def load_blog_feed() -> Feed:
+    """The feed for the newest posts, re-rendered only when one of them changes."""
+    posts = _newest_posts(load_all_blogs(), load_blog)
+    return _blog_feed(load_modified_times(ContentType.BLOG), *posts)
+
+
+def load_digest_feed() -> Feed:
+    posts = _newest_posts(list_all_digests(), load_digest)
+    return _digest_feed(load_modified_times(ContentType.DIGEST), *posts)
+
+
+def _feed_response(request: Request, feed: Feed) -> Response:
+    validator = validator_for(feed.version)
+    return cached_response(
+        request, validator, lambda: Response(feed.xml, media_type="application/atom+xml")
+    )
+
+
+@app.get("/feed.xml")
+def blog_feed(request: Request):
+    return _feed_response(request, load_blog_feed())
+
+
+# Registered before /digest/{slug}, which would otherwise take these paths
+@app.get("/digest/feed.xml")
+def digest_feed(request: Request):
+    return _feed_response(request, load_digest_feed())
+
+
+@app.get("/digest/{year:int}", response_class=HTMLResponse)
+@app.get("/digest/{year:int}/after/{after}", response_class=HTMLResponse)
+@app.get("/digest/{year:int}/before/{before}", response_class=HTMLResponse)
+def get_digest_year(
+    request: Request, year: int, after: str | None = None, before: str | None = None
+):
+    return _digest_page(request, after, before, year)
+
+
+@app.get("/digest/{year:int}/{month:int}", response_class=HTMLResponse)
+@app.get("/digest/{year:int}/{month:int}/after/{after}", response_class=HTMLResponse)
+@app.get("/digest/{year:int}/{month:int}/before/{before}", response_class=HTMLResponse)
+def get_digest_month(
+    request: Request,
+    year: int,
+    month: int,
+    after: str | None = None,
+    before: str | None = None,
+):
+    return _digest_page(request, after, before, year, month)
 
 
 @app.get("/digest/{slug}", response_class=HTMLResponse)
-async def get_digest(request: Request, slug: str):
-    digest = load_digest(slug, _ttl_bucket())
-    return templates.TemplateResponse(request, "digest_detail.html", {"digest": digest})
+def get_digest(request: Request, slug: str):
+    digest = load_digest(slug)
+    return render_page(request, "digest_detail.html", {"digest": digest})
+
+
+def load_blog_archive(tag: str | None = None) -> Archive:
+    tag_index = get_tag_index(load_all_blogs())
+    return tag_index.archive_for(tag) if tag else _blog_archive(tag_index.blogs)
 
 
 @app.get("/blog", response_class=HTMLResponse)
-async def get_blogs(request: Request, tag: str | None = None):
-    blogs = load_all_blogs(_ttl_bucket())
-    all_tags = get_all_tags(blogs)
-    if tag:
-        blogs = [b for b in blogs if tag in b.tags]
-    return templates.TemplateResponse(
+@app.get("/blog/after/{after}", response_class=HTMLResponse)
+@app.get("/blog/before/{before}", response_class=HTMLResponse)
+def get_blogs(
+    request: Request,
+    tag: str | None = None,
+    after: str | None = None,
+    before: str | None = None,
+):
+    page = load_blog_archive(tag).page(after, before, BLOG_PAGE_SIZE)
+    all_tags = get_tag_index(load_all_blogs()).tags
+    return render_page(
         request,
         "blog_index.html",
-        {"blogs": blogs, "all_tags": all_tags, "active_tag": tag},
+        {
+            "blogs": page.posts,
+            "all_tags": all_tags,
+            "active_tag": tag,
+            **_page_links(request, "/blog", page),
+        },
     )
 
 
 @app.get("/blog/{slug}", response_class=HTMLResponse)
 def get_blog(request: Request, slug: str):
-    ttl = _ttl_bucket()
-    blog = load_blog(slug, ttl)
-    all_blogs = load_all_blogs(ttl)
-    related = get_related_posts(blog, all_blogs)
-    return templates.TemplateResponse(
-        request, "blog_detail.html", {"blog": blog, "related_posts": related}
-    )
+    blog = load_blog(slug)
+    related = get_tag_index(load_all_blogs()).related(blog)
+    return render_page(request, "blog_detail.html", {"blog": blog, "related_posts": related})
 
 
 @app.get("/projects", response_class=HTMLResponse)
-async def projects(request: Request):
-    all_projects = load_all_projects(_ttl_bucket())
-    return templates.TemplateResponse(
+def projects(request: Request):
+    all_projects = load_all_projects()
+    return render_page(
         request,
         "projects_index.html",
         {"projects": all_projects},
@@ -257,9 +868,9 @@ async def projects(request: Request):
 
 
 @app.get("/projects/{slug}", response_class=HTMLResponse)
-async def get_project(request: Request, slug: str):
-    project = load_project(slug, _ttl_bucket())
-    return templates.TemplateResponse(
+def get_project(request: Request, slug: str):
+    project = load_project(slug)
+    return render_page(
         request,
         "project_detail.html",
         {"project": project},
@@ -268,39 +879,109 @@ async def get_project(request: Request, slug: str):
 
 @app.get("/about", response_class=HTMLResponse)
 async def about(request: Request):
-    return templates.TemplateResponse(request, "about.html")
+    return render_page(request, "about.html")
+
+
+@app.get("/search", response_class=HTMLResponse)
+def search(request: Request, q: str = ""):
+    results = load_search_index().search(q) if q.strip() else []
+    return render_page(request, "search.html", {"query": q, "results": results})
+
+
+@app.get("/partials/search-results", response_class=HTMLResponse)
+def search_results(request: Request, q: str = ""):
+    results = load_search_index().search(q) if q.strip() else []
+    return render_page(request, "partials/search_results.html", {"query": q, "results": results})
 
 
 @app.get("/partials/sidebar-blogs", response_class=HTMLResponse)
-async def sidebar_blogs(request: Request):
-    blogs = load_all_blogs(_ttl_bucket())
-    return templates.TemplateResponse(request, "partials/sidebar_blogs.html", {"blogs": blogs})
+def sidebar_blogs(request: Request):
+    blogs = load_all_blogs()
+    return render_page(request, "partials/sidebar_blogs.html", {"blogs": blogs})
 
 
 SITE = "https://sean-michael.dev"
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return Response(latest_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/readyz", response_class=PlainTextResponse)
+async def readyz():
+    if not _ready.is_set():
+        return PlainTextResponse("warming up", status_code=503)
+    return PlainTextResponse("ready")
+
+
 @app.get("/robots.txt", response_class=PlainTextResponse)
 async def robots_txt():
     return f"User-agent: *\nAllow: /\nSitemap: {SITE}/sitemap.xml\n"
 
 
-@app.get("/sitemap.xml")
-async def sitemap_xml():
-    urls = [
-        SITE,
-        f"{SITE}/blog",
-        f"{SITE}/digest",
-        f"{SITE}/projects",
-        f"{SITE}/about",
+@memo_latest
+def _blog_sitemap_urls(blogs: list[BlogSummary], modified: dict[str, datetime]) -> list[SitemapUrl]:
+    return post_urls(f"{SITE}/blog", blogs, modified)
+
+
+@memo_latest
+def _digest_sitemap_urls(
+    digests: list[DigestSummary], modified: dict[str, datetime]
+) -> list[SitemapUrl]:
+    return post_urls(f"{SITE}/digest", digests, modified)
+
+
+@memo_latest
+def _project_sitemap_urls(
+    projects: list[ProjectSummary], modified: dict[str, datetime]
+) -> list[SitemapUrl]:
+    return post_urls(f"{SITE}/projects", projects, modified)
+
+
+@memo_latest
+def _build_sitemap(
+    blog_urls: list[SitemapUrl], digest_urls: list[SitemapUrl], project_urls: list[SitemapUrl]
+) -> Sitemap:
+    def newest(urls: list[SitemapUrl]):
+        return max((u.lastmod for u in urls if u.lastmod), default=None)
+
+    pages = [
+        SitemapUrl(SITE, newest(blog_urls + digest_urls + project_urls)),
+        SitemapUrl(f"{SITE}/blog", newest(blog_urls)),
+        SitemapUrl(f"{SITE}/digest", newest(digest_urls)),
+        SitemapUrl(f"{SITE}/projects", newest(project_urls)),
+        SitemapUrl(f"{SITE}/about"),
     ]
-    for slug in list_blog_files():
-        urls.append(f"{SITE}/blog/{slug}")
-    for slug in list_digest_files():
-        urls.append(f"{SITE}/digest/{slug}")
-    for slug in list_project_files():
-        urls.append(f"{SITE}/projects/{slug}")
-
-    entries = "\n".join(f"  <url><loc>{u}</loc></url>" for u in urls)
-    xml = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n{entries}\n</urlset>'
-    return Response(content=xml, media_type="application/xml")
+    sections = {"pages": pages, "blog": blog_urls, "digest": digest_urls, "projects": project_urls}
+    return Sitemap(SITE, sections)
+
+
+def load_sitemap() -> Sitemap:
+    """The sitemap for the cached listings, rebuilt only for sections that changed.
+
+    A body-only edit leaves a listing as it was, so the file times are part of
+    what each section is rebuilt on.
+    """
+    return _build_sitemap(
+        _blog_sitemap_urls(load_all_blogs(), load_modified_times(ContentType.BLOG)),
+        _digest_sitemap_urls(list_all_digests(), load_modified_times(ContentType.DIGEST)),
+        _project_sitemap_urls(load_all_projects(), load_modified_times(ContentType.PROJECT)),
+    )
+
+
+@app.get("/sitemap.xml")
+def sitemap_xml(request: Request):
+    sitemap = load_sitemap()
+    validator = validator_for(sitemap.version)
+    return cached_response(
+        request, validator, lambda: Response(sitemap.root, media_type="application/xml")
+    )
+
+
+@app.get("/sitemaps/{name}.xml")
+def sitemap_part(request: Request, name: str):
+    sitemap = load_sitemap()
+    xml = sitemap.part(name)
+    validator = validator_for(sitemap.version, name)
+    return cached_response(request, validator, lambda: Response(xml, media_type="application/xml"))
@@ -0,0 +1,150 @@
+"""Prometheus metrics for requests, caches, S3 and rendering, served on /metrics.
+
+Each worker process counts its own requests. With several workers, set
+`PROMETHEUS_MULTIPROC_DIR` to an empty directory before they start: each then
+writes its metrics to files there, and /metrics adds up all of them, whichever
+worker serves it. Cache sizes are then recorded every `SIZE_REFRESH` seconds
+rather than worked out when scraped, since a scrape only runs in one worker.
+"""
+
+import asyncio
+import os
+from collections.abc import Callable
+from time import perf_counter
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Read by prometheus_client itself when it's imported
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+SIZE_REFRESH = 15
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle a request, by route template",
+    ["method", "route", "status"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by loader; stale means served while a refresh runs",
+    ["cache", "loader", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total",
+    "Entries dropped to stay within the cache's size limit",
+    ["cache", "loader"],
+)
+CACHE_SIZE = Gauge(
+    "cache_size",
+    "Current size of each cache, in entries or bytes",
+    ["cache", "unit"],
+    multiprocess_mode="liveall",
+)
+
+S3_REQUESTS = Counter(
+    "s3_requests_total",
+    "S3 API calls by operation and HTTP status",
+    ["operation", "status"],
+)
+S3_SECONDS = Histogram(
+    "s3_request_duration_seconds",
+    "S3 API call latency, up to the response headers",
+    ["operation"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+S3_BYTES = Counter(
+    "s3_bytes_total",
+    "Bytes transferred by S3 API calls",
+    ["operation", "direction"],
+)
+
+RENDER_SECONDS = Histogram(
+    "content_render_seconds",
+    "Time to parse frontmatter and render markdown for one post",
+    ["parser"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+WARMUP_SECONDS = Gauge(
+    "content_warmup_seconds",
+    "How long loading and rendering everything at startup took",
+    multiprocess_mode="liveall",
+)
+
+_sizes: list[tuple[Gauge, Callable[[], float]]] = []
+
+
+def report_size(cache: str, unit: str, size: Callable[[], float]) -> None:
+    """Report a cache's current size as `cache_size`."""
+    gauge = CACHE_SIZE.labels(cache, unit)
+    if MULTIPROCESS:
+        _sizes.append((gauge, size))
+    else:
+        gauge.set_function(size)
+
+
+def record_sizes() -> None:
+    for gauge, size in _sizes:
+        gauge.set(size())
+
+
+async def keep_sizes_recorded(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        record_sizes()
+        try:
+            await asyncio.wait_for(stop.wait(), SIZE_REFRESH)
+        except TimeoutError:
+            pass
+    # Drops this process's live gauges from /metrics
+    multiprocess.mark_process_dead(os.getpid())
+
+
+def latest_metrics() -> bytes:
+    """The metrics of this process, or of all of them in multiprocess mode."""
+    if not MULTIPROCESS:
+        return generate_latest(REGISTRY)
+    record_sizes()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def _before_s3_call(params, context, **kwargs):
+    context["metrics_started"] = perf_counter()
+    body = params.get("Body")
+    if isinstance(body, bytes | str):
+        context["metrics_sent"] = len(body)
+
+
+def _after_s3_call(http_response, model, context, **kwargs):
+    started = context.get("metrics_started")
+    if started is not None:
+        S3_SECONDS.labels(model.name).observe(perf_counter() - started)
+    S3_REQUESTS.labels(model.name, str(http_response.status_code)).inc()
+    received = http_response.headers.get("content-length")
+    if received:
+        S3_BYTES.labels(model.name, "received").inc(int(received))
+    if context.get("metrics_sent"):
+        S3_BYTES.labels(model.name, "sent").inc(context["metrics_sent"])
+
+
+def _s3_call_error(event_name, **kwargs):
+    # Connection errors and the like, which never got an HTTP response
+    S3_REQUESTS.labels(event_name.rsplit(".", 1)[-1], "error").inc()
+
+
+def instrument_s3_client(client) -> None:
+    """Record every API call `client` makes, whatever code path makes it."""
+    events = client.meta.events
+    events.register("before-parameter-build.s3", _before_s3_call)
+    events.register("after-call.s3", _after_s3_call)
+    events.register("after-call-error.s3", _s3_call_error)
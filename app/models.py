@@ -0,0 +1,44 @@
+"""Pydantic models for blog posts, projects and digests."""
+
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class BlogSummary(BaseModel):
+    title: str
+    date: date
+    author: str
+    slug: str
+    tags: list[str] = []
+
+
+class Blog(BlogSummary):
+    content: str
+
+
+class ProjectSummary(BaseModel):
+    title: str
+    date: date
+    slug: str
+    author: str = "Sean-Michael"
+    github_url: str
+    demo_url: str | None = None
+    tech_stack: list[str] = []
+    status: str = "active"
+    tags: list[str] = []
+    description: str = ""
+
+
+class Project(ProjectSummary):
+    content: str
+
+
+class DigestSummary(BaseModel):
+    title: str
+    date: date
+    slug: str
+
+
+class Digest(DigestSummary):
+    content: str
@@ -0,0 +1,105 @@
+"""Rendered page bytes, so steady-state requests skip Jinja entirely.
+
+Pages are stored under their URL and the validator of the data they were rendered
+from (see app.conditional). A page is served from here only while its validator
+is unchanged, so an edit to anything the page shows, or to the templates,
+invalidates exactly the pages that depend on it. Total size is bounded by a byte
+budget, least recently used pages going first. Compressed variants are made on
+first request and kept with the page, so each version is compressed only once.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import NamedTuple
+
+from app.compression import PAGE_LEVELS, compress
+from app.metrics import CACHE_EVICTIONS, CACHE_REQUESTS, report_size
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_BYTES = int(os.getenv("PAGE_CACHE_BYTES", str(32 * 1024 * 1024)))  # 32 MiB
+
+
+class CachedPage(NamedTuple):
+    etag: str
+    body: bytes
+    media_type: str
+    # Body compressed per content-coding, filled in as clients ask for them
+    encoded: dict[str, bytes]
+
+
+class PageCache:
+    def __init__(self, max_bytes: int = PAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._pages: OrderedDict[Hashable, CachedPage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, etag: str) -> CachedPage | None:
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                CACHE_REQUESTS.labels("page", "pages", "miss").inc()
+                return None
+            if page.etag != etag:
+                # Rendered from data that has since changed
+                self._remove(key)
+                CACHE_REQUESTS.labels("page", "pages", "miss").inc()
+                return None
+            self._pages.move_to_end(key)
+            CACHE_REQUESTS.labels("page", "pages", "hit").inc()
+            return page
+
+    def put(self, key: Hashable, etag: str, body: bytes, media_type: str) -> CachedPage:
+        page = CachedPage(etag, body, media_type, {})
+        if len(body) > self.max_bytes:
+            return page
+        with self._lock:
+            self._remove(key)
+            self._pages[key] = page
+            self.size += len(body)
+            self._evict()
+        return page
+
+    def encode(self, key: Hashable, page: CachedPage, encoding: str) -> bytes:
+        """`page`'s body compressed with `encoding`, compressing it only the first time."""
+        data = page.encoded.get(encoding)
+        if data is not None:
+            return data
+        data = compress(page.body, encoding, PAGE_LEVELS[encoding])
+        with self._lock:
+            if encoding in page.encoded:
+                return page.encoded[encoding]
+            page.encoded[encoding] = data
+            if self._pages.get(key) is page:
+                self.size += len(data)
+                self._evict()
+        return data
+
+    def _evict(self) -> None:
+        while self.size > self.max_bytes:
+            evicted = next(iter(self._pages))
+            self._remove(evicted)
+            CACHE_EVICTIONS.labels("page", "pages").inc()
+            logger.debug(f"Evicted {evicted} from page cache")
+
+    def _remove(self, key: Hashable) -> None:
+        page = self._pages.pop(key, None)
+        if page is not None:
+            self.size -= len(page.body) + sum(len(d) for d in page.encoded.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+page_cache = PageCache()
+report_size("page", "bytes", lambda: page_cache.size)
+report_size("page", "entries", lambda: len(page_cache))
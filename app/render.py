@@ -0,0 +1,201 @@
+"""Parse raw markdown files into content models."""
+
+import hashlib
+import inspect
+import json
+import re
+from collections.abc import Callable, Hashable
+from datetime import date
+from importlib.metadata import version
+from io import StringIO
+from time import perf_counter
+from typing import Any
+
+import frontmatter
+import markdown
+from pydantic import BaseModel, ValidationError
+
+from app.content import ContentFile
+from app.metrics import CACHE_REQUESTS, RENDER_SECONDS
+from app.models import Blog, BlogSummary, Digest, DigestSummary, Project, ProjectSummary
+from app.render_cache import render_cache
+
+# Bump whenever what a post renders to changes in a way the checks in
+# _renderer_config can't see, so the on-disk render cache isn't reused
+RENDER_VERSION = 1
+# Passed to every markdown.markdown call
+MARKDOWN_EXTENSIONS: list[str] = []
+
+# Parsed result of the last version of each file seen, so unchanged files aren't re-rendered
+_parsed: dict[Hashable, tuple[str, Any]] = {}
+
+
+def extract_first_paragraph(text: str) -> str:
+    for line in text.strip().splitlines():
+        line = line.strip()
+        if line and not line.startswith(("#", "-", "```")):
+            return line
+    return ""
+
+
+def parse_blog(slug: str, raw: str) -> Blog:
+    post = frontmatter.load(StringIO(raw))
+
+    return Blog.model_validate(
+        {
+            **post.metadata,
+            "content": markdown.markdown(post.content, extensions=MARKDOWN_EXTENSIONS),
+            "slug": slug,
+        }
+    )
+
+
+def parse_blog_summary(slug: str, raw: str) -> BlogSummary:
+    """Parse only the frontmatter; `raw` may be just the start of the file."""
+    post = frontmatter.load(StringIO(raw))
+
+    return BlogSummary.model_validate({**post.metadata, "slug": slug})
+
+
+def parse_project(slug: str, raw: str) -> Project:
+    post = frontmatter.load(StringIO(raw))
+
+    description = post.metadata.get("description", "") or extract_first_paragraph(post.content)
+
+    return Project.model_validate(
+        {
+            **post.metadata,
+            "content": markdown.markdown(post.content, extensions=MARKDOWN_EXTENSIONS),
+            "slug": slug,
+            "description": description,
+        }
+    )
+
+
+def parse_project_summary(slug: str, raw: str) -> ProjectSummary:
+    """Parse the frontmatter and, if needed, a description from the first paragraph."""
+    post = frontmatter.loads(raw)
+    description = post.metadata.get("description", "") or extract_first_paragraph(post.content)
+    return ProjectSummary.model_validate(
+        {**post.metadata, "slug": slug, "description": description}
+    )
+
+
+def parse_digest(slug: str, raw: str) -> Digest:
+    post = frontmatter.load(StringIO(raw))
+
+    # Strip leading H1 from markdown body since the template renders the title separately
+    body = re.sub(r"^#\s+.+\n*", "", post.content, count=1)
+
+    return Digest.model_validate(
+        {
+            **post.metadata,
+            "content": markdown.markdown(body, extensions=MARKDOWN_EXTENSIONS),
+            "slug": slug,
+        }
+    )
+
+
+def parse_digest_slug(slug: str) -> DigestSummary:
+    """Derive title and date from slug like 'topic-words-2026-04-04'."""
+    # Last 3 segments are YYYY-MM-DD
+    parts = slug.rsplit("-", 3)
+    d = date(int(parts[1]), int(parts[2]), int(parts[3]))
+    title_part = parts[0].replace("-", " ").title()
+    title = f"{title_part} | {d.isoformat()}"
+    return DigestSummary(title=title, date=d, slug=slug)
+
+
+# Parsers whose results are kept in the on-disk render cache, and the model each returns
+PERSISTED_MODELS: dict[str, type[BaseModel]] = {
+    "parse_blog": Blog,
+    "parse_blog_summary": BlogSummary,
+    "parse_project": Project,
+    "parse_project_summary": ProjectSummary,
+    "parse_digest": Digest,
+}
+
+
+def _renderer_config() -> str:
+    # Anything that changes what a file parses to: library versions, markdown options,
+    # model fields and the parsers' own code
+    schemas = {name: model.model_json_schema() for name, model in PERSISTED_MODELS.items()}
+    parsers = [globals()[name] for name in PERSISTED_MODELS] + [extract_first_paragraph]
+    return json.dumps(
+        {
+            "version": RENDER_VERSION,
+            "markdown": version("markdown"),
+            "frontmatter": version("python-frontmatter"),
+            "extensions": MARKDOWN_EXTENSIONS,
+            "models": schemas,
+            "parsers": {parse.__name__: inspect.getsource(parse) for parse in parsers},
+        },
+        sort_keys=True,
+    )
+
+
+RENDERER_CONFIG = hashlib.sha256(_renderer_config().encode()).hexdigest()
+
+
+def render_key(key: Hashable, body: str) -> str:
+    """On-disk cache key for parsing `body` under `key` with the current renderer."""
+    digest = hashlib.sha256(f"{RENDERER_CONFIG}\0{key!r}\0".encode())
+    digest.update(body.encode())
+    return digest.hexdigest()
+
+
+def load_rendered(key: Hashable, body: str) -> Any | None:
+    """What `body` parsed to last time, from the on-disk cache, if it's there."""
+    parser = _parser_name(key)
+    model = PERSISTED_MODELS.get(parser)
+    if model is None or not render_cache.enabled:
+        return None
+    data = render_cache.get(render_key(key, body))
+    if data is not None:
+        try:
+            value = model.model_validate_json(data)
+        except ValidationError:
+            value = None
+        if value is not None:
+            CACHE_REQUESTS.labels("render", parser, "hit").inc()
+            return value
+    CACHE_REQUESTS.labels("render", parser, "miss").inc()
+    return None
+
+
+def store_rendered(key: Hashable, body: str, value: Any) -> None:
+    if _parser_name(key) in PERSISTED_MODELS and render_cache.enabled:
+        render_cache.put(render_key(key, body), value.model_dump_json().encode())
+
+
+def get_parsed(key: Hashable, etag: str) -> Any | None:
+    parsed = _parsed.get(key)
+    if parsed is not None and parsed[0] == etag:
+        return parsed[1]
+    return None
+
+
+def remember_parsed(key: Hashable, etag: str, value: Any) -> None:
+    _parsed[key] = (etag, value)
+
+
+def forget_parsed(key: Hashable) -> None:
+    _parsed.pop(key, None)
+
+
+def parse_if_changed(key: Hashable, file: ContentFile, parse: Callable[[str], Any]) -> Any:
+    value = get_parsed(key, file.etag)
+    if value is None:
+        value = load_rendered(key, file.body)
+        if value is None:
+            started = perf_counter()
+            value = parse(file.body)
+            RENDER_SECONDS.labels(_parser_name(key)).observe(perf_counter() - started)
+            store_rendered(key, file.body, value)
+        remember_parsed(key, file.etag, value)
+    return value
+
+
+def _parser_name(key: Hashable) -> str:
+    # Keys are (content type, slug, parser name), or a plain name like "index"
+    return key[-1] if isinstance(key, tuple) else str(key)
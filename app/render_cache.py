@@ -0,0 +1,136 @@
+"""Rendered posts kept on disk, so a restarted app doesn't render anything twice.
+
+Entries are keyed by a hash of the raw markdown together with everything that
+decides what it renders to (see app.render.render_key), so they never go stale:
+a post whose file or renderer changed hashes to a new key, and the old entry is
+eventually evicted. SQLite in WAL mode lets every worker process share the file.
+Total size is bounded, entries used least recently going first.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from app.metrics import CACHE_EVICTIONS, report_size
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+
+# An empty path turns the cache off
+RENDER_CACHE_PATH = os.getenv("RENDER_CACHE_PATH", str(BASE_DIR / ".cache" / "render.sqlite3"))
+RENDER_CACHE_BYTES = int(os.getenv("RENDER_CACHE_BYTES", str(256 * 1024 * 1024)))  # 256 MiB
+# Evicting goes this far below the limit, so it doesn't run again on the next write
+EVICT_TO = 0.9
+# An entry's last-used time is only updated this often, so reads rarely write
+TOUCH_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS renders (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS renders_used ON renders (used);
+"""
+
+
+class RenderCache:
+    def __init__(self, path: str = RENDER_CACHE_PATH, max_bytes: int = RENDER_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        # Bytes stored, as of the last count plus this process's writes since
+        self.size = 0
+        self._counted = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads, so each gets its own
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            with self._lock:
+                if not self._counted:
+                    self.size = self._stored_bytes(conn)
+                    self._counted = True
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value, used FROM renders WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, used = row
+            now = time.time()
+            if now - used > TOUCH_SECONDS:
+                conn.execute("UPDATE renders SET used = ? WHERE key = ?", (now, key))
+            return value
+        except sqlite3.Error as e:
+            logger.warning(f"Render cache read failed, rendering instead: {e}")
+            return None
+
+    def put(self, key: str, value: bytes) -> None:
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO renders (key, value, size, used) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            with self._lock:
+                self.size += len(value)
+                over = self.size > self.max_bytes
+            if over:
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Render cache write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Other processes write to the same file, so count again before deleting anything
+        total = self._stored_bytes(conn)
+        target = int(self.max_bytes * EVICT_TO)
+        evicted = []
+        if total > self.max_bytes:
+            for key, size in conn.execute("SELECT key, size FROM renders ORDER BY used"):
+                if total <= target:
+                    break
+                evicted.append((key,))
+                total -= size
+            conn.executemany("DELETE FROM renders WHERE key = ?", evicted)
+            CACHE_EVICTIONS.labels("render", "renders").inc(len(evicted))
+            logger.info(f"Evicted {len(evicted)} entries from the render cache")
+        with self._lock:
+            self.size = total
+
+    @staticmethod
+    def _stored_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM renders").fetchone()[0]
+
+    def clear(self) -> None:
+        if not self.enabled:
+            return
+        self._connection().execute("DELETE FROM renders")
+        with self._lock:
+            self.size = 0
+
+
+render_cache = RenderCache()
+report_size("render", "bytes", lambda: render_cache.size)
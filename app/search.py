@@ -0,0 +1,359 @@
+"""Full-text search over every post, ranked with BM25.
+
+An in-memory inverted index (term -> post -> weighted term frequency) is kept
+in sync with the loaded posts: `sync` re-indexes only posts whose object
+changed since the last sync, which with the parse memo means only posts whose
+file changed. A query touches just the postings of its own terms, and their BM25
+scores are worked out once per version of the index rather than per query.
+
+`pack_search_index` writes the index out in a flat binary form, which
+`PackedSearchIndex` searches in place. Shared through the content snapshot
+(see app.snapshot), workers then search it without indexing any posts
+themselves, and decode only the documents a query returns.
+"""
+
+import heapq
+import html
+import json
+import math
+import re
+import struct
+import threading
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from datetime import date
+from operator import itemgetter
+from typing import Any, NamedTuple
+
+from app.content import ContentType
+
+# BM25 parameters, the usual defaults
+K1 = 1.2
+B = 0.75
+# Matches in these fields count as this many matches in the body
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 2
+MAX_RESULTS = 20
+SNIPPET_CHARS = 160
+# Terms whose scores a packed index keeps worked out
+PACKED_TERM_SCORES = 1024
+
+URL_PREFIXES = {
+    ContentType.BLOG: "/blog",
+    ContentType.PROJECT: "/projects",
+    ContentType.DIGEST: "/digest",
+}
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this "
+    "to was were will with".split()
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_TAG = re.compile(r"<[^>]+>")
+
+# Packed index layout: header, documents, terms, postings, term strings, document data
+_PACKED_HEADER = struct.Struct("<IIIIQ")  # documents, terms, postings, string bytes, total length
+_PACKED_DOCUMENT = struct.Struct("<QII")  # data offset, data length, document length
+_PACKED_TERM = struct.Struct("<IIII")  # string offset, string length, first posting, postings
+_PACKED_POSTING = struct.Struct("<II")  # document number, term frequency
+
+DocKey = tuple[ContentType, str]
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def plain_text(rendered: str) -> str:
+    return " ".join(html.unescape(_TAG.sub(" ", rendered)).split())
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    title: str
+    url: str
+    date: date
+    snippet: str
+    score: float
+
+
+class _Document(NamedTuple):
+    source: Any  # the post object this was indexed from
+    kind: ContentType
+    title: str
+    date: date
+    text: str
+    terms: Counter
+    length: int
+
+
+def _index_document(kind: ContentType, post: Any) -> _Document:
+    text = plain_text(post.content)
+    terms = Counter(tokenize(text))
+    for _ in range(TITLE_WEIGHT):
+        terms.update(tokenize(post.title))
+    extras = [*getattr(post, "tags", []), *getattr(post, "tech_stack", [])]
+    for _ in range(TAG_WEIGHT):
+        terms.update(tokenize(" ".join(extras)))
+    description = getattr(post, "description", "")
+    if description and description not in text:
+        text = f"{description} {text}"
+        terms.update(tokenize(description))
+    return _Document(post, kind, post.title, post.date, text, terms, sum(terms.values()))
+
+
+def _idf(count: int, matching: int) -> float:
+    return math.log(1 + (count - matching + 0.5) / (matching + 0.5))
+
+
+def _bm25(idf: float, tf: int, length: int, average_length: float) -> float:
+    return idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / average_length))
+
+
+def _best(per_term: list[dict], limit: int) -> list[tuple[Any, float]]:
+    """The `limit` highest summed scores over all the terms."""
+    per_term = [scores for scores in per_term if scores]
+    if not per_term:
+        return []
+    scores = per_term[0]
+    if len(per_term) > 1:
+        scores = dict(scores)
+        for other in per_term[1:]:
+            for key, score in other.items():
+                scores[key] = scores.get(key, 0.0) + score
+    return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+
+class SearchIndex:
+    def __init__(self):
+        self._documents: dict[DocKey, _Document] = {}
+        self._postings: dict[str, dict[DocKey, int]] = {}
+        self._total_length = 0
+        # BM25 contribution of each term to each post, worked out on first query. Any
+        # change to the index changes the average length, so it clears all of them.
+        self._term_scores: dict[str, dict[DocKey, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, kind: ContentType, post: Any) -> None:
+        document = _index_document(kind, post)
+        with self._lock:
+            self._remove((kind, post.slug))
+            self._term_scores.clear()
+            key = (kind, post.slug)
+            self._documents[key] = document
+            self._total_length += document.length
+            for term, count in document.terms.items():
+                self._postings.setdefault(term, {})[key] = count
+
+    def remove(self, kind: ContentType, slug: str) -> None:
+        with self._lock:
+            self._remove((kind, slug))
+            self._term_scores.clear()
+
+    def _remove(self, key: DocKey) -> None:
+        document = self._documents.pop(key, None)
+        if document is None:
+            return
+        self._total_length -= document.length
+        for term in document.terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+
+    def sync(self, kind: ContentType, posts: Iterable[Any]) -> int:
+        """Make the index match `posts` for one content type; returns posts re-indexed."""
+        current = {post.slug: post for post in posts}
+        with self._lock:
+            stale = [slug for k, slug in self._documents if k == kind and slug not in current]
+            changed = [
+                post
+                for slug, post in current.items()
+                if (doc := self._documents.get((kind, slug))) is None or doc.source is not post
+            ]
+        for slug in stale:
+            self.remove(kind, slug)
+        for post in changed:
+            self.add(kind, post)
+        return len(changed)
+
+    def _scores_for(self, term: str) -> dict[DocKey, float]:
+        scores = self._term_scores.get(term)
+        if scores is not None:
+            return scores
+        postings = self._postings.get(term, {})
+        count = len(self._documents)
+        average_length = self._total_length / count if count else 0
+        idf = _idf(count, len(postings))
+        scores = {
+            key: _bm25(idf, tf, self._documents[key].length, average_length)
+            for key, tf in postings.items()
+        }
+        self._term_scores[term] = scores
+        return scores
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> list[SearchHit]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            best = _best([self._scores_for(term) for term in terms], limit)
+            documents = [(self._documents[key], key, score) for key, score in best]
+        return [
+            SearchHit(
+                doc.kind.value,
+                doc.title,
+                f"{URL_PREFIXES[doc.kind]}/{slug}",
+                doc.date,
+                _snippet(doc.text, terms),
+                score,
+            )
+            for doc, (_, slug), score in documents
+        ]
+
+
+def pack_search_index(index: SearchIndex) -> bytes:
+    """Write `index` out in the flat form `PackedSearchIndex` reads."""
+    with index._lock:
+        keys = list(index._documents)
+        numbers = {key: number for number, key in enumerate(keys)}
+        documents = bytearray()
+        data = bytearray()
+        for key in keys:
+            doc = index._documents[key]
+            encoded = json.dumps(
+                [doc.kind.value, key[1], doc.title, doc.date.isoformat(), doc.text]
+            ).encode()
+            documents += _PACKED_DOCUMENT.pack(len(data), len(encoded), doc.length)
+            data += encoded
+        terms = bytearray()
+        postings = bytearray()
+        strings = bytearray()
+        posting_count = 0
+        # Sorted by their UTF-8 bytes, which is the order a lookup bisects in
+        for term in sorted(index._postings, key=str.encode):
+            encoded = term.encode()
+            term_postings = index._postings[term]
+            terms += _PACKED_TERM.pack(
+                len(strings), len(encoded), posting_count, len(term_postings)
+            )
+            strings += encoded
+            for key, tf in term_postings.items():
+                postings += _PACKED_POSTING.pack(numbers[key], tf)
+            posting_count += len(term_postings)
+        header = _PACKED_HEADER.pack(
+            len(keys), len(index._postings), posting_count, len(strings), index._total_length
+        )
+    return b"".join((header, documents, terms, postings, strings, data))
+
+
+class PackedSearchIndex:
+    """Searches a packed index where it lies, such as in a shared memory mapping.
+
+    Only the postings of a query's terms are read, and only the documents it
+    returns are decoded. Worked-out term scores are kept for the most recent
+    `PACKED_TERM_SCORES` terms.
+    """
+
+    def __init__(self, data):
+        self._data = data
+        count, term_count, posting_count, string_bytes, self._total_length = (
+            _PACKED_HEADER.unpack_from(data)
+        )
+        self._count = count
+        self._term_count = term_count
+        self._documents_at = _PACKED_HEADER.size
+        self._terms_at = self._documents_at + count * _PACKED_DOCUMENT.size
+        self._postings_at = self._terms_at + term_count * _PACKED_TERM.size
+        self._strings_at = self._postings_at + posting_count * _PACKED_POSTING.size
+        self._data_at = self._strings_at + string_bytes
+        self._term_scores: OrderedDict[str, dict[int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _term_string(self, number: int) -> bytes:
+        offset, length, _, _ = _PACKED_TERM.unpack_from(
+            self._data, self._terms_at + number * _PACKED_TERM.size
+        )
+        start = self._strings_at + offset
+        return bytes(self._data[start : start + length])
+
+    def _postings(self, term: str) -> list[tuple[int, int]]:
+        wanted = term.encode()
+        low, high = 0, self._term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term_string(middle) < wanted:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._term_count or self._term_string(low) != wanted:
+            return []
+        _, _, first, count = _PACKED_TERM.unpack_from(
+            self._data, self._terms_at + low * _PACKED_TERM.size
+        )
+        start = self._postings_at + first * _PACKED_POSTING.size
+        return list(
+            _PACKED_POSTING.iter_unpack(self._data[start : start + count * _PACKED_POSTING.size])
+        )
+
+    def _document(self, number: int) -> tuple[int, int, int]:
+        return _PACKED_DOCUMENT.unpack_from(
+            self._data, self._documents_at + number * _PACKED_DOCUMENT.size
+        )
+
+    def _scores_for(self, term: str) -> dict[int, float]:
+        with self._lock:
+            scores = self._term_scores.get(term)
+            if scores is not None:
+                self._term_scores.move_to_end(term)
+                return scores
+        postings = self._postings(term)
+        idf = _idf(self._count, len(postings))
+        average_length = self._total_length / self._count if self._count else 0
+        scores = {
+            number: _bm25(idf, tf, self._document(number)[2], average_length)
+            for number, tf in postings
+        }
+        with self._lock:
+            self._term_scores[term] = scores
+            while len(self._term_scores) > PACKED_TERM_SCORES:
+                self._term_scores.popitem(last=False)
+        return scores
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> list[SearchHit]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        hits = []
+        for number, score in _best([self._scores_for(term) for term in terms], limit):
+            offset, length, _ = self._document(number)
+            start = self._data_at + offset
+            kind, slug, title, day, text = json.loads(bytes(self._data[start : start + length]))
+            kind = ContentType(kind)
+            hits.append(
+                SearchHit(
+                    kind.value,
+                    title,
+                    f"{URL_PREFIXES[kind]}/{slug}",
+                    date.fromisoformat(day),
+                    _snippet(text, terms),
+                    score,
+                )
+            )
+        return hits
+
+
+def _snippet(text: str, terms: list[str]) -> str:
+    match = re.search(r"\b(" + "|".join(map(re.escape, terms)) + r")", text, re.IGNORECASE)
+    start = 0 if match is None else max(0, match.start() - SNIPPET_CHARS // 4)
+    snippet = text[start : start + SNIPPET_CHARS]
+    prefix = "..." if start else ""
+    suffix = "..." if start + SNIPPET_CHARS < len(text) else ""
+    return f"{prefix}{snippet}{suffix}"
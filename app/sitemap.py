@@ -0,0 +1,96 @@
+"""sitemap.xml built from the cached listings, split once it gets too big.
+
+Crawlers only ever see XML rendered from listings the app already holds, so
+they never cause content reads. Each section's URLs are derived once per
+version of its listing (see `memo_latest`), and the XML once per sitemap.
+Past the protocol's per-file URL limit, /sitemap.xml becomes a sitemap index
+pointing at numbered parts of each section.
+"""
+
+from collections.abc import Iterable, Mapping
+from datetime import UTC, date, datetime, time
+from hashlib import sha1
+from itertools import batched
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+from app.content import ContentNotFoundError
+
+# Per-file limit from the sitemaps protocol
+SITEMAP_MAX_URLS = 50_000
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+class SitemapUrl(NamedTuple):
+    loc: str
+    lastmod: datetime | None = None
+
+
+def last_modified(post_date: date, modified: datetime | None) -> datetime:
+    """The later of a post's date and when its file last changed."""
+    dated = datetime.combine(post_date, time(), UTC)
+    return dated if modified is None else max(dated, modified)
+
+
+def post_urls(base: str, posts: Iterable, modified: Mapping[str, datetime]) -> list[SitemapUrl]:
+    """URLs of `posts`, last modified as of `modified`, their files' times by slug."""
+    return [
+        SitemapUrl(f"{base}/{post.slug}", last_modified(post.date, modified.get(post.slug)))
+        for post in posts
+    ]
+
+
+def _lastmod_tag(lastmod: datetime | None) -> str:
+    if lastmod is None:
+        return ""
+    return f"<lastmod>{lastmod.astimezone(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')}</lastmod>"
+
+
+def render_urlset(urls: Iterable[SitemapUrl]) -> str:
+    entries = "\n".join(
+        f"  <url><loc>{escape(u.loc)}</loc>{_lastmod_tag(u.lastmod)}</url>" for u in urls
+    )
+    return f'{XML_HEADER}<urlset xmlns="{XMLNS}">\n{entries}\n</urlset>'
+
+
+def render_index(sitemaps: Iterable[SitemapUrl]) -> str:
+    entries = "\n".join(
+        f"  <sitemap><loc>{escape(s.loc)}</loc>{_lastmod_tag(s.lastmod)}</sitemap>"
+        for s in sitemaps
+    )
+    return f'{XML_HEADER}<sitemapindex xmlns="{XMLNS}">\n{entries}\n</sitemapindex>'
+
+
+class Sitemap:
+    """The XML for /sitemap.xml and, once it is split, each of its parts."""
+
+    def __init__(
+        self, site: str, sections: dict[str, list[SitemapUrl]], max_urls: int = SITEMAP_MAX_URLS
+    ):
+        self.parts: dict[str, str] = {}
+        if sum(len(urls) for urls in sections.values()) <= max_urls:
+            self.root = render_urlset(u for urls in sections.values() for u in urls)
+        else:
+            lastmods = {}
+            for name, urls in sections.items():
+                for i, chunk in enumerate(batched(urls, max_urls), start=1):
+                    self.parts[f"{name}-{i}"] = render_urlset(chunk)
+                    lastmods[f"{name}-{i}"] = max(
+                        (u.lastmod for u in chunk if u.lastmod), default=None
+                    )
+            self.root = render_index(
+                SitemapUrl(f"{site}/sitemaps/{name}.xml", lastmod)
+                for name, lastmod in lastmods.items()
+            )
+        digest = sha1(self.root.encode(), usedforsecurity=False)
+        for xml in self.parts.values():
+            digest.update(xml.encode())
+        self.version = digest.hexdigest()
+
+    def part(self, name: str) -> str:
+        try:
+            return self.parts[name]
+        except KeyError:
+            raise ContentNotFoundError(f"No sitemap part named {name}") from None
@@ -0,0 +1,302 @@
+"""A rendered snapshot of all content, shared by every worker process.
+
+With `uvicorn --workers N` each process would otherwise list, fetch and render
+the whole site itself, multiplying S3 traffic and memory by N. Instead, one
+worker (whichever holds the lock file) loads content as usual and writes every
+rendered post into a single snapshot file; all workers, that one included, map
+the file read-only and serve from it like from the content index (see
+app.index). The OS keeps one copy of a mapped file in memory however many
+processes map it.
+
+The file holds a JSON table of contents with the listings (summaries only) and
+where each post is, followed by the posts as JSON and the packed search index
+(see app.search). Posts are decoded when first requested, and only the most
+recent ones are kept decoded; searches read the index in place. The snapshot is
+replaced atomically, and only when content changed; workers check for a new one
+every `SNAPSHOT_REFRESH` seconds. If the lock holder exits, another worker takes
+the lock on its next check.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from datetime import UTC, datetime
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from app.content import ContentNotFoundError, ContentType
+from app.metrics import report_size
+from app.models import (
+    Blog,
+    BlogSummary,
+    Digest,
+    DigestSummary,
+    Project,
+    ProjectSummary,
+)
+from app.render import RENDERER_CONFIG, parse_digest_slug
+from app.search import PackedSearchIndex, SearchIndex, pack_search_index
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+# Worker processes, as uvicorn's --workers reads it
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Path of the snapshot file; empty means every worker loads content itself. A
+# single worker gains nothing from it, so it's only on by default with several.
+CONTENT_SNAPSHOT = os.getenv(
+    "CONTENT_SNAPSHOT",
+    str(BASE_DIR / ".cache" / "content.snapshot") if WEB_CONCURRENCY > 1 else "",
+)
+SNAPSHOT_REFRESH = float(os.getenv("SNAPSHOT_REFRESH", "30"))
+# Decoded posts kept per worker; the rest stay as bytes in the shared mapping
+SNAPSHOT_DECODED_POSTS = int(os.getenv("SNAPSHOT_DECODED_POSTS", "256"))
+
+MAGIC = b"SMRSNAP3"
+HEADER = struct.Struct("<8sQ")  # magic, length of the table of contents
+
+MODELS: dict[ContentType, type[BaseModel]] = {
+    ContentType.BLOG: Blog,
+    ContentType.PROJECT: Project,
+    ContentType.DIGEST: Digest,
+}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _newest_first(posts: list) -> list:
+    return sorted(posts, key=lambda p: p.date, reverse=True)
+
+
+def build_snapshot(
+    blogs: list[Blog],
+    projects: list[Project],
+    digests: list[Digest],
+    search_index: SearchIndex,
+    modified: dict[ContentType, dict[str, datetime]],
+) -> bytes:
+    """Serialise rendered posts, their search index and file times into the snapshot format."""
+    blobs = bytearray()
+    offsets: dict[str, dict[str, tuple[int, int]]] = {}
+    listings: dict[str, list] = {}
+    for content_type, posts in (
+        (ContentType.BLOG, blogs),
+        (ContentType.PROJECT, projects),
+        (ContentType.DIGEST, digests),
+    ):
+        posts = _newest_first(posts)
+        offsets[content_type.value] = {}
+        for post in posts:
+            data = post.model_dump_json().encode()
+            offsets[content_type.value][post.slug] = (len(blobs), len(data))
+            blobs.extend(data)
+        if content_type is ContentType.DIGEST:
+            # Digest listings are titled from their slugs, as in app.main
+            listings["digest"] = [parse_digest_slug(d.slug).model_dump(mode="json") for d in posts]
+        else:
+            listings[content_type.value] = [
+                post.model_dump(mode="json", exclude={"content"}) for post in posts
+            ]
+    search = pack_search_index(search_index)
+    search_at = (len(blobs), len(search))
+    blobs.extend(search)
+
+    # Only the writer lists content, so every worker takes post times from here
+    modified_at = {
+        content_type.value: {slug: moment.isoformat() for slug, moment in times.items()}
+        for content_type, times in modified.items()
+    }
+
+    version = hashlib.sha1(blobs, usedforsecurity=False)
+    version.update(json.dumps(offsets, sort_keys=True).encode())
+    version.update(json.dumps(modified_at, sort_keys=True).encode())
+    toc = json.dumps(
+        {
+            "version": version.hexdigest(),
+            "renderer": RENDERER_CONFIG,
+            "built_at": datetime.now(UTC).isoformat(),
+            "listings": listings,
+            "offsets": offsets,
+            "search": search_at,
+            "modified": modified_at,
+        }
+    ).encode()
+    return HEADER.pack(MAGIC, len(toc)) + toc + bytes(blobs)
+
+
+def _read_toc(data) -> tuple[dict, int]:
+    if len(data) < HEADER.size:
+        raise SnapshotError("truncated header")
+    magic, toc_length = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("not a content snapshot")
+    start = HEADER.size + toc_length
+    toc = json.loads(bytes(data[HEADER.size : start]))
+    if toc.get("renderer") != RENDERER_CONFIG:
+        raise SnapshotError("built by a different renderer")
+    return toc, start
+
+
+def snapshot_version(path: Path) -> str | None:
+    """Version of the snapshot at `path`, or None if there's no usable one."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            _, toc_length = HEADER.unpack(header)
+            toc, _ = _read_toc(header + f.read(toc_length))
+    except (OSError, struct.error, ValueError, SnapshotError):
+        return None
+    return toc["version"]
+
+
+def write_snapshot(path: Path, data: bytes) -> bool:
+    """Replace the snapshot at `path` with `data`, unless it already holds the same content."""
+    toc, _ = _read_toc(data)
+    if snapshot_version(path) == toc["version"]:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    # Readers keep their mapping of the old file until they attach to the new one
+    tmp.replace(path)
+    return True
+
+
+class Snapshot:
+    """A mapped snapshot file, read like a ContentIndex."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.file_id = os.fstat(f.fileno()).st_ino
+        self.size = len(self._map)
+        toc, self._start = _read_toc(self._map)
+        self.version: str = toc["version"]
+        self.built_at = datetime.fromisoformat(toc["built_at"])
+        self._offsets: dict[str, dict[str, tuple[int, int]]] = toc["offsets"]
+        self._search_at: tuple[int, int] = toc["search"]
+        self.modified: dict[ContentType, dict[str, datetime]] = {
+            content_type: {
+                slug: datetime.fromisoformat(moment)
+                for slug, moment in toc["modified"].get(content_type.value, {}).items()
+            }
+            for content_type in ContentType
+        }
+        listings = toc["listings"]
+        self.blogs = [BlogSummary.model_validate(b) for b in listings["blog"]]
+        self.projects = [ProjectSummary.model_validate(p) for p in listings["project"]]
+        self.digest_summaries = [DigestSummary.model_validate(d) for d in listings["digest"]]
+        self._decoded: OrderedDict[tuple[ContentType, str], Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, content_type: ContentType, slug: str) -> Any:
+        key = (content_type, slug)
+        with self._lock:
+            post = self._decoded.get(key)
+            if post is not None:
+                self._decoded.move_to_end(key)
+                return post
+        try:
+            offset, length = self._offsets[content_type.value][slug]
+        except KeyError:
+            raise ContentNotFoundError(f"{content_type.value}/{slug}") from None
+        start = self._start + offset
+        post = MODELS[content_type].model_validate_json(self._map[start : start + length])
+        with self._lock:
+            # Another thread may have decoded it meanwhile; keep one object per post
+            post = self._decoded.setdefault(key, post)
+            self._decoded.move_to_end(key)
+            while len(self._decoded) > SNAPSHOT_DECODED_POSTS:
+                self._decoded.popitem(last=False)
+        return post
+
+    def get_blog(self, slug: str) -> Blog:
+        return self.get(ContentType.BLOG, slug)
+
+    def get_project(self, slug: str) -> Project:
+        return self.get(ContentType.PROJECT, slug)
+
+    def get_digest(self, slug: str) -> Digest:
+        return self.get(ContentType.DIGEST, slug)
+
+    @cached_property
+    def search_index(self) -> PackedSearchIndex:
+        """The search index over every post, read from the mapping without copying it."""
+        offset, length = self._search_at
+        start = self._start + offset
+        return PackedSearchIndex(memoryview(self._map)[start : start + length])
+
+
+class SharedSnapshot:
+    """This worker's view of the shared snapshot, and its claim to be the one writing it."""
+
+    def __init__(self, path: str = CONTENT_SNAPSHOT):
+        self.path = Path(path) if path else None
+        self.current: Snapshot | None = None
+        self._lock_file = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @property
+    def leading(self) -> bool:
+        return self._lock_file is not None
+
+    def lead(self) -> bool:
+        """Take the writer's lock if no other worker holds it; True if this worker has it."""
+        with self._lock:
+            if self._lock_file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                lock_file = open(self.path.with_name(self.path.name + ".lock"), "w")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    lock_file.close()
+                    return False
+                self._lock_file = lock_file
+                logger.info(f"Worker {os.getpid()} is writing the content snapshot")
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            if self._lock_file is not None:
+                self._lock_file.close()  # closing drops the lock
+                self._lock_file = None
+
+    def attach(self) -> Snapshot | None:
+        """Map the newest snapshot file, if it changed since the last call."""
+        current = self.current
+        try:
+            file_id = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return current
+        if current is not None and current.file_id == file_id:
+            return current
+        try:
+            snapshot = Snapshot(self.path)
+        except (OSError, ValueError, ValidationError, SnapshotError) as e:
+            logger.warning(f"Ignoring content snapshot {self.path}: {e}")
+            return current
+        # The old mapping is unmapped once requests still using it are done with it
+        self.current = snapshot
+        logger.info(f"Attached content snapshot {snapshot.version[:12]} ({snapshot.size} bytes)")
+        return snapshot
+
+
+shared_snapshot = SharedSnapshot()
+report_size(
+    "snapshot", "bytes", lambda: shared_snapshot.current.size if shared_snapshot.current else 0
+)
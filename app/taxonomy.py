@@ -0,0 +1,79 @@
+"""Tag index and related-posts lookups over the blog listing.
+
+Built once per version of the listing (see `memo_latest`), so filtering by tag
+and finding related posts don't rescan or resort the whole blog per request.
+"""
+
+import heapq
+from collections import Counter
+
+from app.archive import Archive
+from app.cache import memo_latest
+from app.models import BlogSummary
+
+RELATED_POSTS = 5
+
+
+class TagIndex:
+    def __init__(self, blogs: list[BlogSummary], related_limit: int = RELATED_POSTS):
+        """`blogs` must already be sorted newest first, as the listings are."""
+        self.blogs = blogs
+        self.related_limit = related_limit
+        self._position = {b.slug: i for i, b in enumerate(blogs)}
+        self._by_tag: dict[str, list[BlogSummary]] = {}
+        for blog in blogs:
+            for tag in dict.fromkeys(blog.tags):
+                self._by_tag.setdefault(tag, []).append(blog)
+        self.tags = sorted(self._by_tag)
+        # Filled in lazily: computing every post's neighbours up front is quadratic
+        # in the size of popular tags, and most posts are rarely viewed.
+        self._related: dict[str, list[BlogSummary]] = {}
+        self._archives: dict[str, Archive] = {}
+
+    def posts_for(self, tag: str) -> list[BlogSummary]:
+        return self._by_tag.get(tag, [])
+
+    def archive_for(self, tag: str) -> Archive:
+        """The tag's posts indexed for pagination, built the first time it's paged."""
+        archive = self._archives.get(tag)
+        if archive is None:
+            archive = Archive(self.posts_for(tag))
+            if tag in self._by_tag:
+                self._archives[tag] = archive
+        return archive
+
+    def related(self, current: BlogSummary) -> list[BlogSummary]:
+        """Posts sharing the most tags with `current`, newest first among equals."""
+        related = self._related.get(current.slug)
+        if related is None:
+            related = self._compute_related(current)
+            if current.slug in self._position:
+                self._related[current.slug] = related
+        return related
+
+    def _compute_related(self, current: BlogSummary) -> list[BlogSummary]:
+        matches = Counter()
+        for tag in dict.fromkeys(current.tags):
+            for blog in self._by_tag.get(tag, []):
+                matches[blog.slug] += 1
+        del matches[current.slug]
+
+        def rank(slug: str) -> tuple:
+            position = self._position[slug]
+            return (-matches[slug], -self.blogs[position].date.toordinal(), position)
+
+        # Same order as sorting everything by (-shared tags, -date), but only over posts
+        # that share a tag; the rest keep listing order, which is already newest first.
+        best = heapq.nsmallest(self.related_limit, matches, key=rank)
+        related = [self.blogs[self._position[slug]] for slug in best]
+        for blog in self.blogs:
+            if len(related) >= self.related_limit:
+                break
+            if blog.slug != current.slug and blog.slug not in matches:
+                related.append(blog)
+        return related
+
+
+@memo_latest
+def get_tag_index(blogs: list[BlogSummary]) -> TagIndex:
+    return TagIndex(blogs)
@@ -0,0 +1,68 @@
+"""Watch local content and report which posts changed.
+
+Only used with CONTENT_SOURCE=local, where content is usually a bind mount or
+a working copy being edited. Instead of re-reading everything on a timer, the
+app invalidates and re-renders just the files the watcher reports.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from pathlib import Path
+
+from watchfiles import Change, awatch
+
+from app import content
+from app.content import CONTENT_CONFIG, ContentType
+
+logger = logging.getLogger(__name__)
+
+# (content type, slug) of a changed post, or None when the content index changed
+ChangedContent = tuple[ContentType, str] | None
+
+
+def _is_content_file(change: Change, path: str) -> bool:
+    return path.endswith(".md") or Path(path) == content.INDEX_PATH
+
+
+def classify_changes(changes: set[tuple[Change, str]]) -> set[ChangedContent]:
+    dirs = {Path(config["local_dir"]): ct for ct, config in CONTENT_CONFIG.items()}
+    changed: set[ChangedContent] = set()
+    for _, raw_path in changes:
+        path = Path(raw_path)
+        if path == content.INDEX_PATH:
+            changed.add(None)
+        elif path.suffix == ".md" and path.parent in dirs:
+            changed.add((dirs[path.parent], path.stem))
+    return changed
+
+
+def watched_paths() -> list[Path]:
+    paths = [Path(config["local_dir"]) for config in CONTENT_CONFIG.values()]
+    paths.append(content.INDEX_PATH.parent)
+    existing = {p for p in paths if p.exists()}
+    # Watches are recursive, so drop directories already covered by a parent
+    return sorted(p for p in existing if not any(o in p.parents for o in existing))
+
+
+async def watch_content(
+    on_change: Callable[[set[ChangedContent]], None],
+    stop_event=None,
+    on_start: Callable[[], None] | None = None,
+) -> None:
+    """Call `on_change` with what changed until `stop_event` is set.
+
+    `on_start` is called once there is something to watch, just before watching.
+    """
+    paths = watched_paths()
+    if not paths:
+        logger.warning("No local content directories to watch")
+        return
+    logger.info(f"Watching {', '.join(str(p) for p in paths)} for content changes")
+    if on_start is not None:
+        on_start()
+    async for changes in awatch(*paths, watch_filter=_is_content_file, stop_event=stop_event):
+        changed = classify_changes(changes)
+        if changed:
+            logger.info(f"Content changed: {len(changed)} file(s)")
+            await asyncio.to_thread(on_change, changed)
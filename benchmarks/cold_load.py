@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Measure how cold-loading every blog post scales with the size of the corpus.
+
+Compares the old one-post-at-a-time path against app.bulk.load_many with
+threads only and with a process pool, on a synthetic local corpus. Use
+--latency-ms to add a per-read delay that stands in for an S3 GET.
+
+    python -m benchmarks.cold_load --sizes 10 100 1000 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from app import content, render
+from app.bulk import RENDER_WORKERS, _render_pool, load_many
+from app.content import CONTENT_CONFIG, ContentType
+from app.render import parse_blog
+from app.render_cache import RenderCache
+from benchmarks.corpus import write_blog_posts
+
+logger = logging.getLogger(__name__)
+
+
+def reset() -> None:
+    # Including the on-disk render cache, or every run after the first only reads it back
+    render.render_cache.clear()
+    content._file_cache.clear()
+    render._parsed.clear()
+
+
+def serial() -> int:
+    slugs = content.list_content_files(ContentType.BLOG)
+    return len([parse_blog(s, content.fetch_content_file(ContentType.BLOG, s).body) for s in slugs])
+
+
+def bulk(workers: int) -> int:
+    slugs = content.list_content_files(ContentType.BLOG)
+    return len(asyncio.run(load_many(ContentType.BLOG, slugs, parse_blog, workers=workers)))
+
+
+def timed(fn, *args) -> float:
+    reset()
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+    parser = argparse.ArgumentParser(description="Benchmark cold loading of the blog")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--paragraphs", type=int, default=20, help="Paragraphs per post")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated delay per read")
+    parser.add_argument("--workers", type=int, default=RENDER_WORKERS)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    args = parser.parse_args()
+
+    if args.latency_ms:
+        fetch = content.fetch_content_file
+
+        def slow_fetch(content_type, slug):
+            time.sleep(args.latency_ms / 1000)
+            return fetch(content_type, slug)
+
+        content.fetch_content_file = slow_fetch
+
+    # Start every process of the pool up front, with app.render imported, so the
+    # spawn cost isn't charged to the first size only
+    if args.workers > 1:
+        pool = _render_pool(args.workers)
+        warm = [pool.submit(render.extract_first_paragraph, "") for _ in range(args.workers)]
+        for future in warm:
+            future.result()
+
+    if not args.json:
+        print(f"{'posts':>6} {'serial':>9} {'threads':>9} {'processes':>9} {'speedup':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            CONTENT_CONFIG[ContentType.BLOG]["local_dir"] = Path(tmp)
+            # Never the app's own cache file, which reset() empties
+            render.render_cache = RenderCache(str(Path(tmp) / "render.sqlite3"))
+            write_blog_posts(Path(tmp), size, args.paragraphs)
+            result = {
+                "posts": size,
+                "latency_ms": args.latency_ms,
+                "workers": args.workers,
+                "serial_s": timed(serial),
+                "threads_s": timed(bulk, 1),
+                "processes_s": timed(bulk, args.workers),
+            }
+        if args.json:
+            print(json.dumps(result))
+        else:
+            speedup = result["serial_s"] / min(result["threads_s"], result["processes_s"])
+            print(
+                f"{size:>6} {result['serial_s']:>8.3f}s {result['threads_s']:>8.3f}s "
+                f"{result['processes_s']:>8.3f}s {speedup:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Synthetic content for the benchmarks, written locally or uploaded to S3."""
+
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from app import content
+from app.content import CONTENT_CONFIG, ContentType
+
+PARAGRAPH = (
+    "Lorem ipsum dolor sit amet, *consectetur* adipiscing elit, sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud "
+    "exercitation ullamco laboris nisi ut aliquip ex ea commodo `consequat`.\n\n"
+)
+WORDS = "python aws fastapi htmx caching kubernetes terraform models agents latency".split()
+
+
+def _body(paragraphs: int, rng: random.Random) -> str:
+    return "".join(
+        f"## Section {p}\n\n{' '.join(rng.choices(WORDS, k=8))}. {PARAGRAPH}"
+        for p in range(paragraphs)
+    )
+
+
+def write_blog_posts(directory: Path, posts: int, paragraphs: int, tags: int = 11, seed=0):
+    rng = random.Random(seed)
+    for i in range(posts):
+        post_tags = ", ".join(f"tag-{t}" for t in {i % tags, (3 * i + 1) % tags})
+        (directory / f"post-{i:05d}.md").write_text(
+            f"---\ntitle: Post {i}\ndate: 2026-01-{i % 28 + 1:02d}\nauthor: Sean-Michael\n"
+            f"tags: [{post_tags}]\n---\n\n{_body(paragraphs, rng)}"
+        )
+
+
+def write_projects(directory: Path, projects: int, paragraphs: int, seed=0):
+    rng = random.Random(seed)
+    for i in range(projects):
+        (directory / f"project-{i:04d}.md").write_text(
+            f"---\ntitle: Project {i}\ndate: 2026-02-{i % 28 + 1:02d}\n"
+            f"github_url: https://github.com/example/project-{i}\n"
+            f"tech_stack: [{', '.join(rng.sample(WORDS, 3))}]\n---\n\n"
+            f"Project {i} does {' '.join(rng.choices(WORDS, k=6))}.\n\n{_body(paragraphs, rng)}"
+        )
+
+
+def write_digests(directory: Path, digests: int, paragraphs: int, seed=0):
+    rng = random.Random(seed)
+    for i in range(digests):
+        # One a day, like the real ones, going back from the start of 2026
+        day = date(2026, 1, 1) - timedelta(days=i)
+        title = f"AI News {day.isoformat()}"
+        (directory / f"ai-news-{day.isoformat()}.md").write_text(
+            f"---\ntitle: {title}\ndate: {day.isoformat()}\n---\n\n"
+            f"# {title}\n\n{_body(paragraphs, rng)}"
+        )
+
+
+def write_corpus(
+    root: Path, posts: int, projects: int, digests: int, tags: int, paragraphs: int
+) -> dict[ContentType, Path]:
+    """Write a whole site's worth of content under `root`, one directory per type."""
+    dirs = {content_type: root / content_type.value for content_type in ContentType}
+    for directory in dirs.values():
+        directory.mkdir(parents=True, exist_ok=True)
+    write_blog_posts(dirs[ContentType.BLOG], posts, paragraphs, tags)
+    write_projects(dirs[ContentType.PROJECT], projects, paragraphs)
+    write_digests(dirs[ContentType.DIGEST], digests, paragraphs)
+    return dirs
+
+
+def use_local_corpus(dirs: dict[ContentType, Path]) -> None:
+    content.CONTENT_SOURCE = "local"
+    for content_type, directory in dirs.items():
+        CONTENT_CONFIG[content_type]["local_dir"] = directory
+    content.INDEX_PATH = directory.parent / content.INDEX_KEY
+
+
+def upload_corpus(s3, bucket: str, dirs: dict[ContentType, Path]) -> int:
+    """Upload a corpus under each type's S3 prefix; returns the number of objects."""
+    count = 0
+    for content_type, directory in dirs.items():
+        prefix = CONTENT_CONFIG[content_type]["s3_prefix"]
+        for path in directory.glob("*.md"):
+            s3.put_object(Bucket=bucket, Key=f"{prefix}{path.name}", Body=path.read_bytes())
+            count += 1
+    return count
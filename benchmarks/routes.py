@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Benchmark every route of the app against a synthetic corpus.
+
+For each content source (local files, and S3 through moto's in-process
+stand-in) it measures, per route: the latency of a request with every cache
+empty (cold), the latency distribution once cached (warm), throughput with
+concurrent warm requests, and how much memory its cold request leaves in the
+caches. The same throughput and memory figures are also taken over a mixed
+pass of every route, as a busy server would see. Results are JSON so runs
+can be compared between commits:
+
+    python -m benchmarks.routes --posts 500 --digests 2000 --output new.json
+    python -m benchmarks.routes --posts 500 --digests 2000 --compare old.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from functools import partial
+from pathlib import Path
+
+import httpx
+from fastapi.routing import APIRoute
+
+from app import content, render
+from app import main as app_main
+from app.cache import content_cache
+from app.content import ContentType
+from app.export import DETAIL_PREFIXES
+from app.main import app
+from app.page_cache import page_cache
+from app.render_cache import RenderCache
+from app.search import SearchIndex
+from benchmarks.corpus import upload_corpus, use_local_corpus, write_corpus
+
+logger = logging.getLogger(__name__)
+
+# Routes that only exist in some configurations or aren't pages
+SKIPPED_ROUTES = {"/metrics", "/readyz", "/sitemaps/{name}.xml"}
+# Extra URLs for routes whose output depends on the query
+QUERY_URLS = {
+    "/blog": ["/blog?tag=tag-1"],
+    "/search": ["/search?q=python+caching"],
+    "/partials/search-results": ["/partials/search-results?q=kubernetes"],
+}
+
+
+def reset_caches(keep_rendered: bool = False) -> None:
+    """Forget everything loaded so far, as if the app had just started.
+
+    With `keep_rendered` the on-disk render cache survives, like a restart would.
+    """
+    if not keep_rendered:
+        render.render_cache.clear()
+    content_cache.clear()
+    page_cache.clear()
+    content._file_cache.clear()
+    render._parsed.clear()
+    app_main._listings.clear()
+    app_main._search_index = SearchIndex()
+
+
+def route_urls(slugs: dict[ContentType, list[str]]) -> dict[str, str]:
+    """One URL per GET route (plus query variants), keyed by a readable name."""
+    urls = {}
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods:
+            continue
+        if route.path in SKIPPED_ROUTES:
+            continue
+        if "{slug}" in route.path:
+            content_type = next(
+                ct for ct, prefix in DETAIL_PREFIXES.items() if route.path == f"{prefix}/{{slug}}"
+            )
+            if not slugs[content_type]:
+                continue
+            # A post from the middle of the listing, not the newest or oldest
+            slug = sorted(slugs[content_type])[len(slugs[content_type]) // 2]
+            urls[route.path] = route.path.replace("{slug}", slug)
+            continue
+        if "{" in route.path:
+            logger.warning(f"Don't know how to fill in {route.path}, skipping it")
+            continue
+        urls[route.path] = route.path
+        for url in QUERY_URLS.get(route.path, []):
+            urls[url] = url
+    return urls
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        "p50": at(0.5),
+        "p95": at(0.95),
+        "p99": at(0.99),
+        "mean": statistics.fmean(ordered),
+        "max": ordered[-1],
+    }
+
+
+async def _request(client: httpx.AsyncClient, url: str) -> float:
+    started = time.perf_counter()
+    response = await client.get(url)
+    elapsed = (time.perf_counter() - started) * 1000
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} returned HTTP {response.status_code}")
+    return elapsed
+
+
+async def _throughput(client: httpx.AsyncClient, urls: list[str], total: int, concurrency: int):
+    """Requests per second for `total` concurrent requests cycling through `urls`."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(url: str) -> float:
+        async with semaphore:
+            return await _request(client, url)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(urls[i % len(urls)]) for i in range(total)))
+    return total / (time.perf_counter() - started)
+
+
+async def _memory(client: httpx.AsyncClient, urls: list[str], keep_rendered: bool) -> dict:
+    """What requesting `urls` with empty caches leaves behind in them."""
+    reset_caches(keep_rendered)
+    tracemalloc.start()
+    for url in urls:
+        await _request(client, url)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"cached_mb": current / 2**20, "peak_mb": peak / 2**20}
+
+
+async def _measure(
+    urls: dict[str, str], requests: int, concurrency: int, total: int, keep_rendered: bool
+) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        routes = []
+        for name, url in urls.items():
+            reset_caches(keep_rendered)
+            cold = await _request(client, url)
+            warm = [await _request(client, url) for _ in range(requests)]
+            throughput = await _throughput(client, [url], total, concurrency)
+            routes.append(
+                {
+                    "route": name,
+                    "url": url,
+                    "cold_ms": cold,
+                    "warm_ms": percentiles(warm),
+                    "throughput_rps": throughput,
+                    "memory": await _memory(client, [url], keep_rendered),
+                }
+            )
+
+        # The same over all routes at once, as a busy server would see
+        reset_caches(keep_rendered)
+        for url in urls.values():
+            await _request(client, url)
+        throughput = await _throughput(client, list(urls.values()), total, concurrency)
+        memory = await _memory(client, list(urls.values()), keep_rendered)
+
+    return {
+        "routes": routes,
+        "throughput_rps": throughput,
+        "memory": {
+            **memory,
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        },
+    }
+
+
+@contextmanager
+def s3_stand_in(dirs: dict[ContentType, Path], latency_ms: float):
+    """Serve the corpus from moto's in-process S3 instead of the local files."""
+    try:
+        from moto import mock_aws
+    except ImportError:
+        raise SystemExit("The S3 benchmark needs moto: uv sync --extra dev") from None
+
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        os.environ.setdefault(name, "benchmark")
+    with mock_aws():
+        content.get_s3_client.cache_clear()
+        s3 = content.get_s3_client()
+        region = content.AWS_REGION
+        location = {} if region == "us-east-1" else {"LocationConstraint": region}
+        s3.create_bucket(Bucket=content.S3_CONTENT_BUCKET, CreateBucketConfiguration=location)
+        upload_corpus(s3, content.S3_CONTENT_BUCKET, dirs)
+        if latency_ms:
+            # moto answers in microseconds; a real bucket takes tens of milliseconds
+            s3.meta.events.register_first(
+                "before-send.s3", lambda **kwargs: time.sleep(latency_ms / 1000)
+            )
+        content.CONTENT_SOURCE = "s3"
+        try:
+            yield
+        finally:
+            content.CONTENT_SOURCE = "local"
+            content.get_s3_client.cache_clear()
+
+
+def run(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        dirs = write_corpus(
+            Path(tmp), args.posts, args.projects, args.digests, args.tags, args.paragraphs
+        )
+        use_local_corpus(dirs)
+        render.render_cache = RenderCache(str(Path(tmp) / "render.sqlite3"))
+        slugs = {ct: [p.stem for p in d.glob("*.md")] for ct, d in dirs.items()}
+        urls = route_urls(slugs)
+        measure = partial(
+            _measure,
+            urls,
+            args.requests,
+            args.concurrency,
+            args.throughput_requests,
+            args.keep_render_cache,
+        )
+
+        runs = []
+        for source in args.sources:
+            logger.info(f"Benchmarking {len(urls)} URLs with CONTENT_SOURCE={source}")
+            if source == "s3":
+                with s3_stand_in(dirs, args.latency_ms):
+                    result = asyncio.run(measure())
+            else:
+                result = asyncio.run(measure())
+            runs.append({"source": source, **result})
+        reset_caches()
+
+    return {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "corpus": {
+                "posts": args.posts,
+                "projects": args.projects,
+                "digests": args.digests,
+                "tags": args.tags,
+                "paragraphs": args.paragraphs,
+            },
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "s3_latency_ms": args.latency_ms,
+            "keep_render_cache": args.keep_render_cache,
+        },
+        "runs": runs,
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline: dict, results: dict, threshold: float) -> list[str]:
+    """Routes whose cold or warm p50 latency grew by more than `threshold` times."""
+    before = {
+        (run["source"], route["route"]): route
+        for run in baseline["runs"]
+        for route in run["routes"]
+    }
+    regressions = []
+    for run in results["runs"]:
+        for route in run["routes"]:
+            old = before.get((run["source"], route["route"]))
+            if old is None:
+                continue
+            for metric, new_ms, old_ms in (
+                ("cold", route["cold_ms"], old["cold_ms"]),
+                ("warm p50", route["warm_ms"]["p50"], old["warm_ms"]["p50"]),
+            ):
+                ratio = new_ms / old_ms if old_ms else 1.0
+                if ratio > threshold:
+                    regressions.append(
+                        f"{run['source']} {route['route']} {metric}: "
+                        f"{old_ms:.2f}ms -> {new_ms:.2f}ms ({ratio:.2f}x)"
+                    )
+    return regressions
+
+
+def print_table(results: dict) -> None:
+    for run in results["runs"]:
+        print(
+            f"\n{run['source']}: {run['throughput_rps']:.0f} req/s, "
+            f"{run['memory']['cached_mb']:.1f} MB cached, "
+            f"{run['memory']['max_rss_mb']:.0f} MB max RSS"
+        )
+        print(
+            f"{'route':<40} {'cold':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'cached':>9}"
+        )
+        for route in run["routes"]:
+            warm = route["warm_ms"]
+            print(
+                f"{route['route']:<40} {route['cold_ms']:>7.2f}ms {warm['p50']:>6.2f}ms "
+                f"{warm['p95']:>6.2f}ms {warm['p99']:>6.2f}ms "
+                f"{route['throughput_rps']:>8.0f} {route['memory']['cached_mb']:>6.2f} MB"
+            )
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+    parser = argparse.ArgumentParser(description="Benchmark every route of the app")
+    parser.add_argument("--posts", type=int, default=200, help="Blog posts in the corpus")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--digests", type=int, default=365)
+    parser.add_argument("--tags", type=int, default=11, help="Distinct blog tags")
+    parser.add_argument("--paragraphs", type=int, default=10, help="Paragraphs per post body")
+    parser.add_argument("--sources", nargs="+", choices=["local", "s3"], default=["local", "s3"])
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added delay per S3 call")
+    parser.add_argument("--requests", type=int, default=50, help="Warm requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--throughput-requests", type=int, default=1000)
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="Baseline results to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25, help="Slowdown that counts as a regression"
+    )
+    parser.add_argument(
+        "--keep-render-cache",
+        action="store_true",
+        help="Keep the on-disk render cache between cold requests, like a restart would",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), results, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
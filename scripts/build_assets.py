@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Write the content-hashed copies of app/static that templates link to (see app.assets).
+
+Run before starting the app, e.g. in the image build: the app only loads the
+manifest this writes, and links the unhashed files under /static/ without it.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from app.assets import ASSETS_DIR, AssetManifest
+
+STATIC_DIR = Path(__file__).parent.parent / "app" / "static"
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    parser = argparse.ArgumentParser(description="Build fingerprinted static assets")
+    parser.add_argument(
+        "output",
+        nargs="?",
+        type=Path,
+        default=ASSETS_DIR,
+        help=f"Directory to write to (default: {ASSETS_DIR})",
+    )
+    args = parser.parse_args()
+
+    AssetManifest(STATIC_DIR, args.output).build()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Build the precompiled content index and store it next to the content."""
+
+import argparse
+import logging
+
+from app.content import CONTENT_SOURCE
+from app.index import build_index, save_index
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    parser = argparse.ArgumentParser(description="Build the content index")
+    parser.add_argument(
+        "--dry-run",
+        "-n",
+        action="store_true",
+        help="Build and report the index without writing it",
+    )
+    args = parser.parse_args()
+
+    logger.info(f"Building content index from {CONTENT_SOURCE} content")
+    index = build_index()
+
+    if args.dry_run:
+        logger.info(
+            f"[DRY RUN] Would write index v{index.version}: {len(index.blogs)} blogs, "
+            f"{len(index.projects)} projects, {len(index.digests)} digests"
+        )
+        return
+
+    save_index(index)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""Build .br/.gz variants of the static text assets for PrecompressedStaticFiles."""
+
+import argparse
+import logging
+from pathlib import Path
+
+from app.compression import precompress_directory
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).parent.parent / "app" / "static"
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    parser = argparse.ArgumentParser(description="Pre-compress static assets")
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        type=Path,
+        default=STATIC_DIR,
+        help=f"Directory to compress (default: {STATIC_DIR})",
+    )
+    args = parser.parse_args()
+
+    written = precompress_directory(args.directory)
+    for path in written:
+        logger.info(f"Wrote {path.relative_to(args.directory)} ({path.stat().st_size} bytes)")
+    logger.info(f"{len(written)} compressed file(s) written, the rest were up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,20 @@
 #!/usr/bin/env python3
 """Content CLI for managing blog posts and projects in S3."""
 
+import hashlib
+import html
+import json
 import logging
 import os
 import re
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from functools import wraps
 from pathlib import Path
+from tempfile import TemporaryDirectory
 
 import click
 import frontmatter
@@ -28,6 +33,19 @@ PROJECT_PUBLISHED_DIR = MOUNT_POINT / "projects" / "published"
 PROJECT_DRAFTS_DIR = MOUNT_POINT / "projects" / "drafts"
 IMAGES_DIR = MOUNT_POINT / "images"
 
+# Widths of the resized copies of each image; never wider than the original
+IMAGE_WIDTHS = (480, 960, 1600)
+# Encoder settings per format, best compression first in <picture>
+IMAGE_FORMATS = {
+    "avif": {"format": "AVIF", "quality": 55},
+    "webp": {"format": "WEBP", "quality": 78, "method": 6},
+    "jpg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+IMAGE_MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpg": "image/jpeg"}
+IMAGE_SIZES = "(max-width: 800px) 100vw, 800px"
+IMAGE_MANIFEST = ".images.json"
+UPLOAD_WORKERS = 8
+
 
 def slugify(title: str) -> str:
     slug = title.lower()
@@ -116,6 +134,93 @@ def unpublish_content(slug: str, published_dir: Path, drafts_dir: Path):
     logger.info(f"Unpublished: {dst.name}")
 
 
+def load_image(src: Path):
+    """Open `src` upright, as RGB, without its metadata (EXIF, GPS, ICC, ...)."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        logger.error("Image processing needs Pillow: uv sync --extra images")
+        sys.exit(1)
+
+    with Image.open(src) as original:
+        # Apply the EXIF rotation before the EXIF is dropped
+        upright = ImageOps.exif_transpose(original).convert("RGB")
+    upright.info.clear()
+    return upright
+
+
+def image_widths(width: int) -> list[int]:
+    widths = [w for w in IMAGE_WIDTHS if w < width]
+    largest = min(width, IMAGE_WIDTHS[-1])
+    return widths if largest in widths else [*widths, largest]
+
+
+def supported_formats() -> dict[str, dict]:
+    from PIL import features
+
+    formats = dict(IMAGE_FORMATS)
+    if not features.check("avif"):
+        logger.warning("This Pillow can't write AVIF, skipping it")
+        del formats["avif"]
+    return formats
+
+
+def write_derivatives(src: Path, name: str, out_dir: Path) -> tuple[dict, tuple[int, int]]:
+    """Write each width in each format to `out_dir`; returns {ext: [(file, width)]} and size."""
+    img = load_image(src)  # exits with install instructions if Pillow is missing
+    from PIL import Image
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    formats = supported_formats()
+    variants: dict[str, list[tuple[Path, int]]] = {}
+    for width in image_widths(img.width):
+        height = round(img.height * width / img.width)
+        resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+        for ext, options in formats.items():
+            path = out_dir / f"{name}-{width}.{ext}"
+            resized.save(path, **options)
+            variants.setdefault(ext, []).append((path, width))
+    return variants, (width, height)
+
+
+def picture_snippet(variants: dict, size: tuple[int, int], url_prefix: str, alt: str) -> str:
+    def srcset(ext: str) -> str:
+        return ", ".join(f"{url_prefix}/{path.name} {width}w" for path, width in variants[ext])
+
+    width, height = size
+    fallback = variants["jpg"][len(variants["jpg"]) // 2][0].name
+    sources = [
+        f'  <source type="{IMAGE_MIME_TYPES[ext]}" srcset="{srcset(ext)}" sizes="{IMAGE_SIZES}">'
+        for ext in variants
+        if ext != "jpg"
+    ]
+    img = (
+        f'  <img src="{url_prefix}/{fallback}" srcset="{srcset("jpg")}" sizes="{IMAGE_SIZES}" '
+        f'width="{width}" height="{height}" alt="{html.escape(alt, quote=True)}" '
+        'loading="lazy" decoding="async">'
+    )
+    return "\n".join(["<picture>", *sources, img, "</picture>"])
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_image_manifest(directory: Path) -> dict:
+    try:
+        return json.loads((directory / IMAGE_MANIFEST).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_image_manifest(directory: Path, manifest: dict):
+    (directory / IMAGE_MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+
 @click.group()
 @click.option("-v", "--verbose", is_flag=True, help="Enable debug logging")
 def cli(verbose):
@@ -375,25 +480,57 @@ def image():
 @click.argument("filepath", type=click.Path(exists=True))
 @click.option("--for", "content_type", required=True, type=click.Choice(["blog", "projects"]))
 @click.option("--as", "name", default=None, help="Custom filename (without extension)")
+@click.option("--alt", default=None, help="Alt text for the snippet")
 @require_mount
-def image_add(filepath, content_type, name):
-    """Upload an image to S3."""
+def image_add(filepath, content_type, name, alt):
+    """Upload resized WebP/AVIF/JPEG copies of an image to S3."""
     src = Path(filepath)
     dest_dir = IMAGES_DIR / content_type
     dest_dir.mkdir(parents=True, exist_ok=True)
+    name = name or slugify(src.stem)
+    url_prefix = f"https://{BUCKET}.s3.{REGION}.amazonaws.com/images/{content_type}"
+
+    manifest = load_image_manifest(dest_dir)
+    digest = file_digest(src)
+    if digest in manifest:
+        logger.info(f"Already added as {manifest[digest]['name']}, skipping")
+        click.echo(manifest[digest]["snippet"])
+        return
+    if any(entry["name"] == name for entry in manifest.values()):
+        logger.error(f"Image already exists: {name}")
+        sys.exit(1)
 
-    filename = f"{name}{src.suffix}" if name else src.name
-    dest = dest_dir / filename
+    with TemporaryDirectory() as tmp:
+        variants, size = write_derivatives(src, name, Path(tmp))
+        files = [path for paths in variants.values() for path, _ in paths]
+        # Every copy into the mount is an upload, so run them side by side
+        with ThreadPoolExecutor(UPLOAD_WORKERS) as pool:
+            list(pool.map(lambda path: shutil.copyfile(path, dest_dir / path.name), files))
+        total = sum(path.stat().st_size for path in files)
+
+    snippet = picture_snippet(variants, size, url_prefix, alt or src.stem)
+    manifest[digest] = {"name": name, "files": sorted(f.name for f in files), "snippet": snippet}
+    save_image_manifest(dest_dir, manifest)
+
+    logger.info(
+        f"Uploaded {len(files)} files ({total / 1024:.0f} KiB, original "
+        f"{src.stat().st_size / 1024:.0f} KiB) to {dest_dir}"
+    )
+    click.echo(snippet)
 
-    if dest.exists():
-        logger.error(f"Image already exists: {dest}")
-        sys.exit(1)
 
-    shutil.copy2(src, dest)
-    url = f"https://{BUCKET}.s3.{REGION}.amazonaws.com/images/{content_type}/{filename}"
-    logger.info(f"Uploaded: {dest}")
-    click.echo(f"URL: {url}")
-    click.echo(f"Markdown: ![{src.stem}]({url})")
+@image.command("derive")
+@click.argument("filepath", type=click.Path(exists=True))
+@click.option("--out", "out_dir", default="app/static/images", type=click.Path(path_type=Path))
+@click.option("--url-prefix", default="/static/images", help="URL the files are served under")
+@click.option("--as", "name", default=None, help="Custom filename (without extension)")
+@click.option("--alt", default=None, help="Alt text for the snippet")
+def image_derive(filepath, out_dir, url_prefix, name, alt):
+    """Write resized copies of an image locally, e.g. for app/static/images."""
+    src = Path(filepath)
+    name = name or slugify(src.stem)
+    variants, size = write_derivatives(src, name, out_dir)
+    click.echo(picture_snippet(variants, size, url_prefix.rstrip("/"), alt or src.stem))
 
 
 @image.command("list")
@@ -416,7 +553,7 @@ def image_list(show_blog, show_projects):
         if not img_dir.exists():
             continue
         images = list(img_dir.glob("*"))
-        images = [i for i in images if i.is_file()]
+        images = [i for i in images if i.is_file() and not i.name.startswith(".")]
         if images:
             click.echo(f"{label.capitalize()} images:")
             for img in sorted(images):
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Prerender the site into a directory of static files."""
+
+import argparse
+import logging
+from pathlib import Path
+
+from app.content import CONTENT_SOURCE
+from app.export import EXPORT_CONCURRENCY, export_site
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    parser = argparse.ArgumentParser(description="Export the site as static files")
+    parser.add_argument(
+        "output",
+        nargs="?",
+        type=Path,
+        default=Path("dist"),
+        help="Output directory (default: dist)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-j",
+        type=int,
+        default=EXPORT_CONCURRENCY,
+        help=f"Pages rendered at once (default: {EXPORT_CONCURRENCY})",
+    )
+    args = parser.parse_args()
+
+    logger.info(f"Exporting {CONTENT_SOURCE} content to {args.output}")
+    result = export_site(args.output, args.concurrency)
+    if result.failed:
+        raise SystemExit(f"Failed to export: {', '.join(result.failed)}")
+
+
+if __name__ == "__main__":
+    main()
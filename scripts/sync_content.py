@@ -1,68 +1,239 @@
 #!/usr/bin/env python3
-"""Sync local content/ directory to S3 bucket."""
+"""Sync local content/ directory to S3 bucket.
+
+Only files whose contents differ from the bucket are uploaded. Each local file's
+ETag (the MD5, or for multipart uploads the MD5 of the part MD5s) is compared
+with the ETag from one listing of the bucket, so a sync with nothing to do costs
+a listing round trip. Worked-out ETags are kept in a manifest next to the
+content, keyed by size and mtime, so unchanged files aren't re-hashed either.
+
+`--prune` only deletes objects that an earlier sync uploaded from this tree and
+whose local file is gone. Anything else in the bucket is left alone: posts and
+images added with the `content` CLI, the content index and the image manifests.
+"""
 
 import argparse
+import hashlib
+import json
 import logging
 import mimetypes
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 
 logger = logging.getLogger(__name__)
 
 # Configuration
 S3_CONTENT_BUCKET = os.getenv("S3_CONTENT_BUCKET", "smr-webdev-content")
 AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
+SYNC_WORKERS = int(os.getenv("SYNC_WORKERS", "16"))
+# Files this size or larger (mostly images) are uploaded in parts of this size
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
 
 BASE_DIR = Path(__file__).parent.parent
 CONTENT_DIR = BASE_DIR / "content"
+MANIFEST_NAME = ".sync-manifest.json"
+# delete_objects takes at most this many keys per call
+DELETE_BATCH = 1000
+# Written to the bucket by the app's tools, never synced from content/
+GENERATED_KEYS = {"index.json"}
+
 
+@dataclass
+class SyncSummary:
+    uploaded: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    bytes_uploaded: int = 0
 
-def get_s3_client():
+
+def get_s3_client(max_connections: int = SYNC_WORKERS):
     try:
-        return boto3.client("s3", region_name=AWS_REGION)
+        return boto3.client(
+            "s3", region_name=AWS_REGION, config=Config(max_pool_connections=max_connections)
+        )
     except Exception as e:
         logger.error(f"Failed to create S3 client: {e}")
         raise
 
 
-def sync_to_s3(dry_run: bool = False):
-    s3 = get_s3_client()
+def local_etag(path: Path, chunk_size: int = MULTIPART_CHUNK_SIZE) -> str:
+    """The ETag S3 gives `path` when uploaded with `chunk_size` multipart parts."""
+    md5s = []
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            md5s.append(hashlib.md5(chunk))
+    if len(md5s) <= 1 and path.stat().st_size < chunk_size:
+        return (md5s[0] if md5s else hashlib.md5()).hexdigest()
+    combined = hashlib.md5(b"".join(m.digest() for m in md5s))
+    return f"{combined.hexdigest()}-{len(md5s)}"
 
-    if not CONTENT_DIR.exists():
-        logger.error(f"Content directory not found: {CONTENT_DIR}")
-        return
 
-    files_synced = 0
+def is_synced_key(key: str) -> bool:
+    """Whether `key` is one sync manages: no dotfiles (manifests) and nothing generated."""
+    return key not in GENERATED_KEYS and not any(part.startswith(".") for part in key.split("/"))
+
 
-    for file_path in CONTENT_DIR.rglob("*"):
+def local_files(content_dir: Path) -> dict[str, Path]:
+    files = {}
+    for file_path in content_dir.rglob("*"):
         if file_path.is_dir():
             continue
+        key = file_path.relative_to(content_dir).as_posix()
+        if is_synced_key(key):
+            files[key] = file_path
+    return files
 
-        if any(part.startswith(".") for part in file_path.parts):
-            continue
 
-        s3_key = str(file_path.relative_to(CONTENT_DIR))
+def remote_etags(s3, bucket: str) -> dict[str, str]:
+    etags = {}
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket):
+        for obj in page.get("Contents", []):
+            etags[obj["Key"]] = obj["ETag"].strip('"')
+    return etags
 
-        content_type, _ = mimetypes.guess_type(str(file_path))
-        content_type = content_type or "application/octet-stream"
 
-        if dry_run:
-            logger.info(f"[DRY RUN] Would upload: {file_path} -> s3://{S3_CONTENT_BUCKET}/{s3_key}")
+def load_manifest(content_dir: Path, bucket: str) -> dict[str, dict]:
+    try:
+        manifest = json.loads((content_dir / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+    # ETags recorded against another bucket say nothing about this one
+    return manifest.get("files", {}) if manifest.get("bucket") == bucket else {}
+
+
+def save_manifest(content_dir: Path, bucket: str, files: dict[str, dict]) -> None:
+    path = content_dir / MANIFEST_NAME
+    path.write_text(json.dumps({"bucket": bucket, "files": files}, indent=2, sort_keys=True))
+
+
+def _is_unchanged(entry: dict | None, path: Path) -> bool:
+    if entry is None:
+        return False
+    stat = path.stat()
+    return entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+
+def _upload(s3, bucket: str, key: str, path: Path, transfer: TransferConfig) -> str:
+    content_type, _ = mimetypes.guess_type(path.name)
+    s3.upload_file(
+        str(path),
+        bucket,
+        key,
+        ExtraArgs={"ContentType": content_type or "application/octet-stream"},
+        Config=transfer,
+    )
+    # What S3 actually recorded, which differs from the MD5 on encrypted buckets
+    return s3.head_object(Bucket=bucket, Key=key)["ETag"].strip('"')
+
+
+def sync_to_s3(
+    s3,
+    bucket: str,
+    content_dir: Path = CONTENT_DIR,
+    workers: int = SYNC_WORKERS,
+    prune: bool = False,
+    dry_run: bool = False,
+    chunk_size: int = MULTIPART_CHUNK_SIZE,
+) -> SyncSummary:
+    summary = SyncSummary()
+    files = local_files(content_dir)
+    remote = remote_etags(s3, bucket)
+    manifest = load_manifest(content_dir, bucket)
+    new_manifest: dict[str, dict] = {}
+
+    to_upload = []
+    for key, path in sorted(files.items()):
+        entry = manifest.get(key)
+        if not _is_unchanged(entry, path):
+            stat = path.stat()
+            entry = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "etag": local_etag(path, chunk_size),
+            }
+        remote_etag = remote.get(key)
+        # Either S3 computed the same ETag, or it's what it said after our last upload
+        if remote_etag is not None and remote_etag in (entry["etag"], entry.get("remote_etag")):
+            summary.unchanged.append(key)
         else:
-            logger.info(f"Uploading: {file_path} -> s3://{S3_CONTENT_BUCKET}/{s3_key}")
-            s3.upload_file(
-                str(file_path),
-                S3_CONTENT_BUCKET,
-                s3_key,
-                ExtraArgs={"ContentType": content_type},
-            )
+            entry.pop("remote_etag", None)
+            to_upload.append((key, path))
+        new_manifest[key] = entry
 
-        files_synced += 1
+    if dry_run:
+        for key, path in to_upload:
+            logger.info(f"[DRY RUN] Would upload: {path} -> s3://{bucket}/{key}")
+            summary.uploaded.append(key)
+            summary.bytes_uploaded += path.stat().st_size
+    elif to_upload:
+        transfer = TransferConfig(
+            multipart_threshold=chunk_size, multipart_chunksize=chunk_size, use_threads=False
+        )
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_upload, s3, bucket, key, path, transfer): (key, path)
+                for key, path in to_upload
+            }
+            for future in as_completed(futures):
+                key, path = futures[future]
+                try:
+                    new_manifest[key]["remote_etag"] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to upload {path}: {e}")
+                    summary.failed.append(key)
+                    del new_manifest[key]
+                    continue
+                logger.info(f"Uploaded: {path} -> s3://{bucket}/{key}")
+                summary.uploaded.append(key)
+                summary.bytes_uploaded += path.stat().st_size
 
-    action = "Would sync" if dry_run else "Synced"
-    logger.info(f"{action} {files_synced} files to s3://{S3_CONTENT_BUCKET}/")
+    # Only what an earlier sync put there; other keys under the same prefixes
+    # may have been added without going through content/
+    owned = {key.partition("/")[0] for key in files if "/" in key}
+    stale = sorted(
+        key
+        for key in remote.keys() - files.keys()
+        if key in manifest and is_synced_key(key) and key.partition("/")[0] in owned
+    )
+    if prune and stale:
+        if dry_run:
+            for key in stale:
+                logger.info(f"[DRY RUN] Would delete: s3://{bucket}/{key}")
+            summary.deleted.extend(stale)
+        else:
+            for start in range(0, len(stale), DELETE_BATCH):
+                batch = stale[start : start + DELETE_BATCH]
+                response = s3.delete_objects(
+                    Bucket=bucket,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                )
+                errors = {error["Key"] for error in response.get("Errors", [])}
+                for key in batch:
+                    if key in errors:
+                        logger.error(f"Failed to delete s3://{bucket}/{key}")
+                        summary.failed.append(key)
+                    else:
+                        logger.info(f"Deleted: s3://{bucket}/{key}")
+                        summary.deleted.append(key)
+    elif stale:
+        logger.info(f"{len(stale)} objects in the bucket have no local file (use --prune)")
+    # Remember the ones left in place, so a later --prune still knows they were ours
+    for key in stale:
+        if key not in summary.deleted:
+            new_manifest[key] = manifest[key]
+
+    if not dry_run:
+        save_manifest(content_dir, bucket, new_manifest)
+    return summary
 
 
 def main():
@@ -70,13 +241,46 @@ def main():
 
     parser = argparse.ArgumentParser(description="Sync content to S3")
     parser.add_argument(
-        "--dry-run", "-n",
+        "--dry-run",
+        "-n",
         action="store_true",
         help="Show what would be uploaded without actually uploading",
     )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete objects an earlier sync uploaded whose local file no longer exists",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=SYNC_WORKERS,
+        help=f"Concurrent uploads (default {SYNC_WORKERS})",
+    )
     args = parser.parse_args()
 
-    sync_to_s3(dry_run=args.dry_run)
+    if not CONTENT_DIR.exists():
+        logger.error(f"Content directory not found: {CONTENT_DIR}")
+        return
+
+    started = time.perf_counter()
+    summary = sync_to_s3(
+        get_s3_client(args.workers),
+        S3_CONTENT_BUCKET,
+        workers=args.workers,
+        prune=args.prune,
+        dry_run=args.dry_run,
+    )
+
+    action = "Would sync" if args.dry_run else "Synced"
+    logger.info(
+        f"{action} s3://{S3_CONTENT_BUCKET}/ in {time.perf_counter() - started:.1f}s: "
+        f"{len(summary.uploaded)} uploaded ({summary.bytes_uploaded / 1024:.1f} KiB), "
+        f"{len(summary.unchanged)} unchanged, {len(summary.deleted)} deleted, "
+        f"{len(summary.failed)} failed"
+    )
+    if summary.failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+import pytest
+
+from app import content, main, render
+from app.cache import content_cache
+from app.content import CONTENT_CONFIG, ContentType
+from app.page_cache import page_cache
+from app.render_cache import RenderCache
+
+BLOG_POST = """---
+title: {title}
+date: {date}
+author: Sean-Michael
+tags: [{tags}]
+---
+
+Body of {title}.
+"""
+
+PROJECT_POST = """---
+title: {title}
+date: {date}
+github_url: https://github.com/sean-michael/{slug}
+---
+
+First paragraph of {title}.
+"""
+
+DIGEST_POST = """---
+title: {title}
+date: {date}
+---
+
+# {title}
+
+Today's news.
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_content_cache():
+    content_cache.clear()
+    page_cache.clear()
+    main._listings.clear()
+    yield
+    content_cache.clear()
+    page_cache.clear()
+    main._listings.clear()
+
+
+@pytest.fixture(autouse=True)
+def render_cache(tmp_path, monkeypatch):
+    """A render cache of the test's own, so nothing is shared through the disk."""
+    cache = RenderCache(str(tmp_path / "render.sqlite3"))
+    monkeypatch.setattr(render, "render_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def content_dir(tmp_path, monkeypatch):
+    """Point the local content source at a small sample corpus in tmp_path."""
+    dirs = {}
+    for content_type in ContentType:
+        local_dir = tmp_path / content_type.value
+        local_dir.mkdir()
+        monkeypatch.setitem(CONTENT_CONFIG[content_type], "local_dir", local_dir)
+        dirs[content_type] = local_dir
+    monkeypatch.setattr(content, "INDEX_PATH", tmp_path / content.INDEX_KEY)
+
+    blogs = dirs[ContentType.BLOG]
+    (blogs / "first-post.md").write_text(
+        BLOG_POST.format(title="First Post", date="2026-01-01", tags="python")
+    )
+    (blogs / "second-post.md").write_text(
+        BLOG_POST.format(title="Second Post", date="2026-02-01", tags="python, aws")
+    )
+    (dirs[ContentType.PROJECT] / "website.md").write_text(
+        PROJECT_POST.format(title="Website", date="2026-01-15", slug="website")
+    )
+    (dirs[ContentType.DIGEST] / "ai-news-2026-03-01.md").write_text(
+        DIGEST_POST.format(title="AI News", date="2026-03-01")
+    )
+    return tmp_path
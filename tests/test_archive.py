@@ -0,0 +1,119 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.archive import Archive, cursor_for
+from app.content import ContentNotFoundError, ContentType
+from app.main import app
+from app.models import DigestSummary
+from tests.conftest import DIGEST_POST
+
+client = TestClient(app)
+
+
+def make_digests(count: int, seed: int = 0) -> list[DigestSummary]:
+    rng = random.Random(seed)
+    return [
+        DigestSummary(
+            title=f"Digest {i}",
+            date=date(2025, 11, 1) + timedelta(days=rng.randrange(120)),
+            slug=f"digest-{i:03d}",
+        )
+        for i in range(count)
+    ]
+
+
+def newest_first(posts):
+    return sorted(posts, key=lambda p: (-p.date.toordinal(), p.slug))
+
+
+def test_paging_forward_and_back_covers_everything():
+    digests = make_digests(95)
+    archive = Archive(digests)
+    pages, page = [], archive.page(size=10)
+    while True:
+        pages.append(page.posts)
+        if page.older is None:
+            break
+        page = archive.page(after=page.older, size=10)
+    assert [p for posts in pages for p in posts] == newest_first(digests)
+    assert len(pages) == 10
+
+    back = archive.page(before=page.newer, size=10)
+    assert back.posts == pages[-2]
+
+
+def test_range_matches_filter():
+    digests = make_digests(200)
+    archive = Archive(digests)
+    start, end = date(2025, 12, 1), date(2026, 1, 1)
+    page = archive.page(size=1000, start=start, end=end)
+    assert page.posts == newest_first([d for d in digests if start <= d.date < end])
+    assert page.newer is None and page.older is None
+    assert sum(month.count for month in archive.months) == 200
+    assert (archive.months[0].year, archive.months[-1].month) == (2026, 11)
+
+
+def test_cursor_survives_deleted_post():
+    digests = newest_first(make_digests(30))
+    gone = digests[9]
+    archive = Archive([d for d in digests if d is not gone])
+    assert archive.page(after=cursor_for(gone), size=5).posts == digests[10:15]
+    with pytest.raises(ContentNotFoundError):
+        archive.page(after="not-a-cursor")
+
+
+def test_pages_are_reused():
+    archive = Archive(make_digests(50))
+    first = archive.page(size=10)
+    assert archive.page(size=10) is first
+    assert (
+        archive.page(after=first.older, size=10).posts
+        is archive.page(after=first.older, size=10).posts
+    )
+
+
+def test_page_cursors_cover_every_linked_page():
+    digests = make_digests(95)
+    archive = Archive(digests)
+    start, end = date(2025, 12, 1), date(2026, 2, 1)
+    cursors = set(archive.page_cursors(10, start, end))
+    seen, pending = set(), [archive.page(size=10, start=start, end=end)]
+    while pending:
+        page = pending.pop()
+        for way, cursor in (("after", page.older), ("before", page.newer)):
+            if cursor is not None and (way, cursor) not in seen:
+                seen.add((way, cursor))
+                pending.append(archive.page(**{way: cursor}, size=10, start=start, end=end))
+    assert seen == cursors
+    assert len(archive.page_cursors(10)) == 2 * 9
+
+
+def test_digest_archive_routes(content_dir):
+    digests = content_dir / ContentType.DIGEST.value
+    (digests / "ai-news-2026-04-02.md").write_text(
+        DIGEST_POST.format(title="April News", date="2026-04-02")
+    )
+    march = client.get("/digest/2026/03")
+    assert march.status_code == 200
+    assert "ai-news-2026-03-01" in march.text
+    assert "ai-news-2026-04-02" not in march.text
+    assert "Apr 2026 (1)" in march.text
+    assert client.get("/digest/2026").status_code == 200
+    assert client.get("/digest/2024/01").status_code == 404
+    for path in ("/digest/0", "/digest/9999", "/digest/9999/12", "/digest/123456789"):
+        assert client.get(path).status_code == 404, path
+    assert client.get("/digest/ai-news-2026-03-01").status_code == 200
+
+
+def test_blog_pages(content_dir, monkeypatch):
+    monkeypatch.setattr(main, "BLOG_PAGE_SIZE", 1)
+    first = client.get("/blog?tag=python")
+    assert "Second Post" in first.text and "First Post" not in first.text
+    assert "/blog/after/2026-02-01.second-post?tag=python" in first.text
+    second = client.get("/blog/after/2026-02-01.second-post?tag=python")
+    assert "First Post" in second.text and "Second Post" not in second.text
+    assert "/blog/before/2026-01-01.first-post?tag=python" in second.text
@@ -0,0 +1,91 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import main
+from app.assets import (
+    ASSETS_URL,
+    IMMUTABLE,
+    MANIFEST_NAME,
+    AssetManifest,
+    ImmutableStaticFiles,
+    hashed_name,
+    rewrite_css,
+)
+from app.main import STATIC_DIR, app
+
+client = TestClient(app)
+
+
+def test_hashed_name():
+    assert hashed_name("images/a.jpg", b"x").startswith("images/a.")
+    assert hashed_name("images/a.jpg", b"x").endswith(".jpg")
+    assert hashed_name("images/a.jpg", b"x") != hashed_name("images/a.jpg", b"y")
+    assert hashed_name("LICENSE", b"x").startswith("LICENSE.")
+
+
+def test_rewrite_css_only_touches_known_relative_urls():
+    names = {"images/bg.jpg": "images/bg.abc.jpg"}
+    css = (
+        "@import url('https://fonts.example/css');\n"
+        "a { background: url('images/bg.jpg'); }\n"
+        "b { background: url(images/missing.png); }\n"
+        "c { background: url(data:image/png;base64,AAAA); }"
+    )
+    rewritten = rewrite_css(css, "style.css", names)
+    assert "url('images/bg.abc.jpg')" in rewritten
+    assert "url('https://fonts.example/css')" in rewritten
+    assert "url(images/missing.png)" in rewritten
+    assert "url(data:image/png;base64,AAAA)" in rewritten
+    assert rewrite_css("x { background: url(../images/bg.jpg) }", "css/site.css", names) == (
+        "x { background: url(../images/bg.abc.jpg) }"
+    )
+
+
+def test_build_renames_css_when_an_image_changes(tmp_path):
+    source, output = tmp_path / "static", tmp_path / "assets"
+    (source / "images").mkdir(parents=True)
+    (source / "images" / "bg.jpg").write_bytes(b"one")
+    (source / "style.css").write_text("body { background: url('images/bg.jpg'); }")
+
+    first = AssetManifest(source, output).build()
+    css = (output / first.names["style.css"]).read_text()
+    assert f"url('{first.names['images/bg.jpg']}')" in css
+
+    (source / "images" / "bg.jpg").write_bytes(b"two")
+    second = AssetManifest(source, output).build()
+    assert second.names["style.css"] != first.names["style.css"]
+    assert second.version != first.version
+    # Copies from the earlier build are pruned
+    assert not (output / first.names["images/bg.jpg"]).exists()
+    assert sorted(p.name for p in output.rglob("*") if p.is_file()) == sorted(
+        [MANIFEST_NAME, *(name.rpartition("/")[2] for name in second.names.values())]
+    )
+
+    loaded = AssetManifest(source, output).load()
+    assert (loaded.names, loaded.version) == (second.names, second.version)
+
+
+def test_pages_link_hashed_assets_served_immutable(tmp_path, monkeypatch):
+    assets = AssetManifest(STATIC_DIR, tmp_path).build()
+    monkeypatch.setitem(main.templates.env.globals, "asset", assets.url)
+    page = client.get("/about")
+    url = assets.url("style.css")
+    assert url != "/static/style.css"
+    assert f'href="{url}"' in page.text
+    assert assets.url("images/smr-shuksan-480.avif") in page.text
+
+    served = FastAPI()
+    served.mount(ASSETS_URL, ImmutableStaticFiles(directory=tmp_path))
+    served_client = TestClient(served)
+    response = served_client.get(url)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert "url('images/shuksan-close-1600." in response.text
+    image = assets.url("images/smr-shuksan-480.avif")
+    assert served_client.get(image).headers["cache-control"] == IMMUTABLE
+
+
+def test_unbuilt_assets_fall_back_to_static(tmp_path):
+    assets = AssetManifest(STATIC_DIR, tmp_path).load()
+    assert assets.url("style.css") == "/static/style.css"
+    assert assets.version == ""
@@ -0,0 +1,45 @@
+import asyncio
+
+from app import bulk, main
+from app.content import ContentType
+from app.render import parse_blog
+from tests.conftest import BLOG_POST
+
+
+def test_load_many_skips_missing(content_dir):
+    loaded = asyncio.run(
+        bulk.load_many(ContentType.BLOG, ["first-post", "missing"], parse_blog, workers=1)
+    )
+    assert list(loaded) == ["first-post"]
+    assert loaded["first-post"].title == "First Post"
+
+
+def test_load_many_in_processes(content_dir, monkeypatch):
+    monkeypatch.setattr(bulk, "PARALLEL_RENDER_MIN", 1)
+    loaded = asyncio.run(
+        bulk.load_many(ContentType.BLOG, ["first-post", "second-post"], parse_blog, workers=2)
+    )
+    assert {b.title for b in loaded.values()} == {"First Post", "Second Post"}
+
+
+def test_load_all_primes_summary_cache(content_dir):
+    blogs = main.load_all_blogs()
+    assert [b.slug for b in blogs] == ["second-post", "first-post"]
+    assert main._load_blog_summary("first-post") is blogs[1]
+    # Full posts are only rendered once their page is requested
+    assert not hasattr(blogs[1], "content")
+    assert not main._load_blog.contains("first-post")
+
+
+def test_listing_refresh_refetches_cached_posts(content_dir):
+    main.load_all_blogs()
+    main._load_blog("first-post")
+    (content_dir / "blog" / "first-post.md").write_text(
+        BLOG_POST.format(title="Edited Post", date="2026-01-01", tags="python")
+    )
+    # Only the listing expires; its cached summaries are still within their TTL
+    main._load_all_blogs.invalidate()
+    assert [b.title for b in main.load_all_blogs()] == ["Second Post", "Edited Post"]
+    assert main._load_blog_summary("first-post").title == "Edited Post"
+    main._load_all_blog_posts()
+    assert main._load_blog("first-post").title == "Edited Post"
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from app.cache import ContentCache
+from app.content import ContentNotFoundError
+
+
+def wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_serves_stale_while_refreshing():
+    cache = ContentCache(ttl=0, jitter=0)
+    release = threading.Event()
+    values = iter(["first", "second"])
+
+    def loader():
+        value = next(values)
+        if value == "second":
+            release.wait()
+        return value
+
+    assert cache.get("key", loader) == "first"
+    # Expired, so this schedules a refresh but still answers immediately
+    assert cache.get("key", loader) == "first"
+    release.set()
+    wait_for(lambda: cache.get("key", loader) == "second")
+
+
+def test_single_flight_miss():
+    cache = ContentCache()
+    calls = 0
+    started = threading.Event()
+
+    def loader():
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.05)
+        return calls
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", loader)))]
+    threads[0].start()
+    started.wait()
+    threads += [threading.Thread(target=lambda: results.append(cache.get("k", loader)))]
+    threads += [threading.Thread(target=lambda: results.append(cache.get("k", loader)))]
+    for t in threads[1:]:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == 1
+    assert results == [1, 1, 1]
+
+
+def test_refresh_drops_deleted_content():
+    cache = ContentCache(ttl=0, jitter=0)
+
+    def gone():
+        raise ContentNotFoundError("blog/gone")
+
+    cache.get("key", lambda: "post")
+    cache.get("key", gone)
+    wait_for(lambda: "key" not in cache._entries)
+
+
+def test_jittered_expiry():
+    cache = ContentCache(ttl=100, jitter=0.1)
+    now = time.monotonic()
+    expiries = [cache._expires_at(100) - now for _ in range(50)]
+    assert all(89 <= e <= 111 for e in expiries)
+    assert len(set(expiries)) > 1
+
+
+def test_maxsize_evicts_least_recently_used():
+    cache = ContentCache(maxsize=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: 1)
+    cache.get("c", lambda: 3)
+    assert list(cache._entries) == ["a", "c"]
@@ -0,0 +1,78 @@
+import gzip
+
+import brotli
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.compression import PrecompressedStaticFiles, negotiate_encoding, precompress_directory
+from app.main import app
+from app.page_cache import page_cache
+
+client = TestClient(app)
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("br, gzip", available=("gzip",)) == "gzip"
+
+
+def test_pages_are_compressed_once_per_version(content_dir):
+    br = client.get("/blog/first-post", headers={"Accept-Encoding": "br"})
+    assert br.headers["content-encoding"] == "br"
+    assert br.headers["vary"].startswith("Accept-Encoding")
+
+    page = next(iter(page_cache._pages.values()))
+    assert brotli.decompress(page.encoded["br"]) == page.body
+    encoded = page.encoded["br"]
+    client.get("/blog/first-post", headers={"Accept-Encoding": "br"})
+    assert page.encoded["br"] is encoded
+
+    gz = client.get("/blog/first-post", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.text == br.text
+    plain = client.get("/blog/first-post", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.text == br.text
+
+
+def test_static_serves_precompressed_variants(tmp_path):
+    css = "body { color: black; }\n" * 100
+    (tmp_path / "style.css").write_text(css)
+    (tmp_path / "photo.jpg").write_bytes(b"\xff\xd8" + bytes(2000))
+    assert {p.name for p in precompress_directory(tmp_path)} == {"style.css.br", "style.css.gz"}
+    assert precompress_directory(tmp_path) == []
+
+    static = FastAPI()
+    static.mount("/static", PrecompressedStaticFiles(directory=tmp_path))
+    static_client = TestClient(static)
+
+    br = static_client.get("/static/style.css", headers={"Accept-Encoding": "br, gzip"})
+    assert br.headers["content-encoding"] == "br"
+    assert br.headers["content-type"].startswith("text/css")
+    assert br.text == css
+    raw = (tmp_path / "style.css.gz").read_bytes()
+    assert gzip.decompress(raw).decode() == css
+
+    plain = static_client.get("/static/style.css", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert br.headers["etag"] == plain.headers["etag"][:-1] + '-br"'
+    for etag in (br.headers["etag"], plain.headers["etag"]):
+        not_modified = static_client.get(
+            "/static/style.css", headers={"Accept-Encoding": "br", "If-None-Match": etag}
+        )
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+        assert not_modified.headers["vary"] == "Accept-Encoding"
+    changed = static_client.get(
+        "/static/style.css", headers={"Accept-Encoding": "gzip", "If-None-Match": '"other-br"'}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    photo = static_client.get("/static/photo.jpg", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in photo.headers
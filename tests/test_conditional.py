@@ -0,0 +1,87 @@
+from datetime import UTC, datetime
+from email.utils import format_datetime
+
+from fastapi.testclient import TestClient
+
+from app import conditional, main
+from app.content import ContentType
+from app.main import app
+from app.models import DigestSummary
+
+client = TestClient(app)
+
+
+def test_pages_send_validators(content_dir):
+    for path in ("/", "/blog", "/blog/first-post", "/digest", "/projects", "/sitemap.xml"):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.headers["etag"]
+        assert response.headers["last-modified"]
+
+
+def test_if_none_match_returns_304(content_dir):
+    first = client.get("/blog/first-post")
+    response = client.get("/blog/first-post", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == first.headers["etag"]
+
+
+def test_each_encoding_has_its_own_etag(content_dir):
+    etags = {
+        encoding: client.get("/blog/first-post", headers={"Accept-Encoding": encoding}).headers[
+            "etag"
+        ]
+        for encoding in ("br", "gzip", "identity")
+    }
+    assert len(set(etags.values())) == 3
+    assert etags["br"] == etags["identity"][:-1] + '-br"'
+
+    # Whichever encoding the client holds, it's still current
+    for etag in etags.values():
+        response = client.get(
+            "/blog/first-post", headers={"Accept-Encoding": "br", "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_if_modified_since_is_not_trusted(content_dir):
+    # Last-Modified is per process, so only the ETag decides
+    first = client.get("/sitemap.xml")
+    since = first.headers["last-modified"]
+    assert client.get("/sitemap.xml", headers={"If-Modified-Since": since}).status_code == 200
+    both = {"If-Modified-Since": since, "If-None-Match": first.headers["etag"]}
+    assert client.get("/sitemap.xml", headers=both).status_code == 304
+    stale = format_datetime(datetime(2000, 1, 1, tzinfo=UTC), usegmt=True)
+    with_stale = {"If-Modified-Since": stale, "If-None-Match": first.headers["etag"]}
+    assert client.get("/sitemap.xml", headers=with_stale).status_code == 304
+
+
+def test_etag_changes_with_content(content_dir):
+    etag = client.get("/blog/first-post").headers["etag"]
+    path = content_dir / "blog" / "first-post.md"
+    path.write_text(path.read_text().replace("title: First Post", "title: Edited"))
+    main.refresh_changed_content({(ContentType.BLOG, "first-post")})
+
+    response = client.get("/blog/first-post", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "Edited" in response.text
+
+
+def test_etag_differs_between_pages(content_dir):
+    first = client.get("/blog/first-post").headers["etag"]
+    second = client.get("/blog/second-post").headers["etag"]
+    assert first != second
+    assert client.get("/blog/second-post", headers={"If-None-Match": first}).status_code == 200
+
+
+def test_per_request_lists_do_not_evict_models():
+    post = DigestSummary(title="A", date=datetime(2026, 1, 1).date(), slug="a")
+    version = conditional.version_of(post)
+    for _ in range(conditional.VERSIONS_MAXSIZE + 1):
+        conditional.version_of([post] * conditional.MEMO_MIN_LENGTH)
+    assert conditional._versions[id(post)] == (post, version)
+    assert len(conditional._list_versions) <= conditional.LIST_VERSIONS_MAXSIZE
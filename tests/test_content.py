@@ -0,0 +1,126 @@
+import asyncio
+import io
+import os
+from datetime import UTC, datetime
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app import content, main
+from app.content import (
+    ContentNotFoundError,
+    ContentType,
+    afetch_content_file,
+    content_modified,
+    fetch_content_file,
+    fetch_content_head,
+    list_content_files,
+)
+
+
+class FakeS3:
+    """Just enough of an S3 client to exercise conditional GETs."""
+
+    LAST_MODIFIED = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+
+    class exceptions:
+        class NoSuchKey(ClientError):
+            def __init__(self):
+                super().__init__({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+
+    def __init__(self, objects: dict[str, tuple[str, str]]):
+        self.objects = objects
+        self.calls = []
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        self.calls.append((Key, IfNoneMatch))
+        if Key not in self.objects:
+            raise self.exceptions.NoSuchKey()
+        body, etag = self.objects[Key]
+        if IfNoneMatch == etag:
+            raise ClientError({"Error": {"Code": "304"}}, "GetObject")
+        return {"Body": io.BytesIO(body.encode()), "ETag": etag}
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, Bucket, Prefix, page_size=2):
+        keys = sorted(k for k in self.objects if k.startswith(Prefix))
+        for i in range(0, len(keys), page_size):
+            page = keys[i : i + page_size]
+            yield {"Contents": [{"Key": k, "LastModified": self.LAST_MODIFIED} for k in page]}
+
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    s3 = FakeS3({"blog/posts/hello.md": ("hello", '"v1"')})
+    monkeypatch.setattr(content, "CONTENT_SOURCE", "s3")
+    monkeypatch.setattr(content, "get_s3_client", lambda: s3)
+    monkeypatch.setattr(content, "_file_cache", {})
+    return s3
+
+
+def test_s3_revalidates_with_etag(fake_s3):
+    first = fetch_content_file(ContentType.BLOG, "hello")
+    second = fetch_content_file(ContentType.BLOG, "hello")
+    assert second is first
+    assert fake_s3.calls == [("blog/posts/hello.md", None), ("blog/posts/hello.md", '"v1"')]
+
+    fake_s3.objects["blog/posts/hello.md"] = ("changed", '"v2"')
+    assert fetch_content_file(ContentType.BLOG, "hello").body == "changed"
+
+
+def test_s3_missing_object(fake_s3):
+    with pytest.raises(ContentNotFoundError):
+        fetch_content_file(ContentType.BLOG, "missing")
+
+
+def test_s3_listing_follows_pagination(fake_s3):
+    for i in range(5):
+        fake_s3.objects[f"blog/posts/post-{i}.md"] = ("", f'"{i}"')
+    fake_s3.objects["blog/posts/image.png"] = ("", '"img"')
+    assert len(list_content_files(ContentType.BLOG)) == 6
+    assert content_modified(ContentType.BLOG, "post-3") == FakeS3.LAST_MODIFIED
+
+
+def test_async_fetch(fake_s3):
+    file = asyncio.run(afetch_content_file(ContentType.BLOG, "hello"))
+    assert file.body == "hello"
+
+
+def test_local_file_only_reread_when_changed(content_dir):
+    first = fetch_content_file(ContentType.BLOG, "first-post")
+    assert fetch_content_file(ContentType.BLOG, "first-post") is first
+
+    path = content_dir / "blog" / "first-post.md"
+    path.write_text(path.read_text().replace("Body", "New body"))
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+    assert "New body" in fetch_content_file(ContentType.BLOG, "first-post").body
+
+
+def test_unchanged_post_not_rerendered(content_dir):
+    calls = []
+
+    def parse(slug, body):
+        calls.append(slug)
+        return body
+
+    main._load_content(ContentType.BLOG, "first-post", parse)
+    main._load_content(ContentType.BLOG, "first-post", parse)
+    assert calls == ["first-post"]
+
+
+def test_head_reads_only_frontmatter(content_dir, monkeypatch):
+    monkeypatch.setattr(content, "HEAD_BYTES", 128)
+    path = content_dir / "blog" / "long.md"
+    path.write_text("---\ntitle: Long\n---\n\n" + "word " * 1000)
+    head = fetch_content_head(ContentType.BLOG, "long")
+    assert head.body.startswith("---\ntitle: Long\n---")
+    assert len(head.body) <= 128
+
+
+def test_head_falls_back_when_frontmatter_is_long(content_dir, monkeypatch):
+    monkeypatch.setattr(content, "HEAD_BYTES", 64)
+    path = content_dir / "blog" / "tagged.md"
+    path.write_text("---\ntags: [" + ", ".join(["tag"] * 40) + "]\n---\n\nBody.\n")
+    assert fetch_content_head(ContentType.BLOG, "tagged").body.endswith("Body.\n")
@@ -0,0 +1,75 @@
+import pytest
+from click.testing import CliRunner
+
+from scripts import content
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture
+def photo(tmp_path):
+    path = tmp_path / "Mountain Photo.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 degrees
+    exif[0x010F] = "Camera Maker"
+    Image.new("RGB", (1200, 800), "steelblue").save(path, exif=exif)
+    return path
+
+
+def test_image_widths():
+    assert content.image_widths(300) == [300]
+    assert content.image_widths(1200) == [480, 960, 1200]
+    assert content.image_widths(4000) == [480, 960, 1600]
+
+
+def test_derivatives_are_upright_and_stripped(photo, tmp_path):
+    variants, size = content.write_derivatives(photo, "mountain", tmp_path / "out")
+    assert set(variants) <= {"avif", "webp", "jpg"} and "jpg" in variants
+    # EXIF orientation 6 turns the 1200x800 original on its side
+    assert size == (800, 1200)
+    for paths in variants.values():
+        for path, width in paths:
+            with Image.open(path) as derived:
+                assert derived.width == width
+                assert not derived.getexif()
+
+    snippet = content.picture_snippet(variants, size, "/static/images", "A mountain")
+    jpegs = "/static/images/mountain-480.jpg 480w, /static/images/mountain-800.jpg 800w"
+    assert f'srcset="{jpegs}"' in snippet
+    assert 'alt="A mountain"' in snippet
+    quoted = content.picture_snippet(variants, size, "/static/images", 'The "big" one')
+    assert 'alt="The &quot;big&quot; one"' in quoted
+
+
+def test_image_add_skips_known_images(photo, tmp_path, monkeypatch):
+    monkeypatch.setattr(content, "IMAGES_DIR", tmp_path / "images")
+    monkeypatch.setattr(content, "is_mounted", lambda: True)
+    runner = CliRunner()
+
+    first = runner.invoke(content.cli, ["image", "add", str(photo), "--for", "blog"])
+    assert first.exit_code == 0, first.output
+    assert "<picture>" in first.output
+    assert (tmp_path / "images" / "blog" / "mountain-photo-480.jpg").exists()
+
+    second = runner.invoke(content.cli, ["image", "add", str(photo), "--for", "blog"])
+    assert second.exit_code == 0
+    assert second.output == first.output
+
+
+def test_missing_pillow_is_explained(photo, tmp_path, monkeypatch, caplog):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def without_pil(name, *args, **kwargs):
+        if name == "PIL" or name.startswith("PIL."):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", without_pil)
+    result = CliRunner().invoke(
+        content.cli, ["image", "derive", str(photo), "--out", str(tmp_path)]
+    )
+    assert result.exit_code == 1
+    assert not isinstance(result.exception, ImportError)
+    assert "uv sync --extra images" in caplog.text
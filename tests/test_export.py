@@ -0,0 +1,73 @@
+from app import export, main
+from app.content import ContentType
+from app.export import MANIFEST_NAME, export_site, output_file
+from app.main import refresh_changed_content
+from tests.conftest import DIGEST_POST
+
+
+def test_output_file():
+    assert output_file("/") == "index.html"
+    assert output_file("/blog") == "blog/index.html"
+    assert output_file("/blog/first-post") == "blog/first-post/index.html"
+    assert output_file("/sitemap.xml") == "sitemap.xml"
+    assert output_file("/404") == "404.html"
+
+
+def test_export_writes_every_page(content_dir, tmp_path):
+    out = tmp_path / "dist"
+    result = export_site(out, concurrency=4)
+    assert not result.failed
+    for name in (
+        "index.html",
+        "blog/index.html",
+        "blog/first-post/index.html",
+        "projects/website/index.html",
+        "digest/ai-news-2026-03-01/index.html",
+        "about/index.html",
+        "search/index.html",
+        "sitemap.xml",
+        "robots.txt",
+        "404.html",
+        "static/style.css",
+        "static/style.css.br",
+        MANIFEST_NAME,
+    ):
+        assert (out / name).exists(), name
+    assert "First Post" in (out / "blog/first-post/index.html").read_text()
+
+
+def test_export_is_incremental(content_dir, tmp_path):
+    out = tmp_path / "dist"
+    export_site(out)
+    assert export_site(out).written == []
+
+    path = content_dir / "blog" / "first-post.md"
+    path.write_text(path.read_text().replace("title: First Post", "title: Edited"))
+    (content_dir / "blog" / "second-post.md").unlink()
+
+    refresh_changed_content({(ContentType.BLOG, "first-post"), (ContentType.BLOG, "second-post")})
+    result = export_site(out)
+    assert "/blog/first-post" in result.written
+    assert "/projects/website" in result.unchanged
+    assert result.removed == ["/blog/second-post"]
+    assert not (out / "blog/second-post/index.html").exists()
+    assert "Edited" in (out / "blog/first-post/index.html").read_text()
+
+
+def test_export_writes_every_listing_page(content_dir, tmp_path, monkeypatch):
+    for module in (main, export):
+        monkeypatch.setattr(module, "BLOG_PAGE_SIZE", 1)
+        monkeypatch.setattr(module, "DIGEST_PAGE_SIZE", 1)
+    (content_dir / "digest" / "ai-news-2026-03-02.md").write_text(
+        DIGEST_POST.format(title="Second", date="2026-03-02")
+    )
+    out = tmp_path / "dist"
+    assert not export_site(out).failed
+
+    older = out / "blog/after/2026-02-01.second-post/index.html"
+    assert "First Post" in older.read_text()
+    assert "/blog/before/2026-01-01.first-post" in older.read_text()
+    assert (out / "blog/before/2026-01-01.first-post/index.html").exists()
+    # A month with more digests than fit on one page
+    month = out / "digest/2026/03/after/2026-03-02.ai-news-2026-03-02/index.html"
+    assert "ai-news-2026-03-01" in month.read_text()
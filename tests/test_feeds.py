@@ -0,0 +1,51 @@
+from xml.etree import ElementTree
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.content import ContentType
+from app.main import app, load_blog_feed, refresh_changed_content
+from tests.conftest import BLOG_POST
+
+client = TestClient(app)
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def entries(xml: str) -> list[ElementTree.Element]:
+    return ElementTree.fromstring(xml).findall(f"{ATOM}entry")
+
+
+def test_blog_feed_has_full_content(content_dir):
+    response = client.get("/feed.xml")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/atom+xml"
+    items = entries(response.text)
+    assert [e.find(f"{ATOM}title").text for e in items] == ["Second Post", "First Post"]
+    assert "<p>Body of Second Post.</p>" in items[0].find(f"{ATOM}content").text
+    assert items[0].find(f"{ATOM}id").text == "https://sean-michael.dev/blog/second-post"
+
+
+def test_digest_feed(content_dir):
+    response = client.get("/digest/feed.xml")
+    assert response.status_code == 200
+    assert [e.find(f"{ATOM}title").text for e in entries(response.text)] == ["AI News"]
+
+
+def test_feed_is_capped_and_conditional(content_dir, monkeypatch):
+    monkeypatch.setattr(main, "FEED_ENTRIES", 1)
+    first = client.get("/feed.xml")
+    assert len(entries(first.text)) == 1
+    cached = client.get("/feed.xml", headers={"If-None-Match": first.headers["etag"]})
+    assert cached.status_code == 304
+
+    (content_dir / "blog" / "third-post.md").write_text(
+        BLOG_POST.format(title="Third Post", date="2026-03-01", tags="python")
+    )
+    refresh_changed_content({(ContentType.BLOG, "third-post")})
+    changed = client.get("/feed.xml", headers={"If-None-Match": first.headers["etag"]})
+    assert changed.status_code == 200
+    assert "Third Post" in changed.text
+
+
+def test_feed_rebuilt_only_on_change(content_dir):
+    assert load_blog_feed() is load_blog_feed()
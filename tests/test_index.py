@@ -0,0 +1,38 @@
+import pytest
+
+from app import main
+from app.content import ContentNotFoundError
+from app.index import INDEX_VERSION, IndexVersionError, build_index, load_index, save_index
+
+
+def test_build_index(content_dir):
+    index = build_index()
+    assert [b.slug for b in index.blogs] == ["second-post", "first-post"]
+    assert index.get_project("website").description == "First paragraph of Website."
+    assert "<h1>" not in index.get_digest("ai-news-2026-03-01").content
+    assert index.digest_summaries[0].title == "Ai News | 2026-03-01"
+    with pytest.raises(ContentNotFoundError):
+        index.get_blog("missing")
+
+
+def test_index_round_trip(content_dir):
+    save_index(build_index())
+    index = load_index()
+    assert index.version == INDEX_VERSION
+    assert index.get_blog("first-post").content == "<p>Body of First Post.</p>"
+
+
+def test_index_version_mismatch(content_dir):
+    (content_dir / "index.json").write_text('{"version": 0}')
+    with pytest.raises(IndexVersionError):
+        load_index()
+
+
+def test_serves_from_index(content_dir, monkeypatch):
+    save_index(build_index())
+    # Remove the source posts so any per-post read would 404
+    for post in (content_dir / "blog").iterdir():
+        post.unlink()
+    monkeypatch.setattr(main, "CONTENT_INDEX", True)
+    assert main.load_blog("first-post").title == "First Post"
+    assert [b.slug for b in main.load_all_blogs()] == ["second-post", "first-post"]
@@ -1,8 +1,13 @@
+import time
+
 from fastapi.testclient import TestClient
 
+from app import content, main, render
+from app.content import ContentType
 from app.main import app
 
 client = TestClient(app)
+BLOG_KEY = (ContentType.BLOG, "first-post", "parse_blog")
 
 
 def test_home_page():
@@ -24,3 +29,64 @@ def test_blog_index():
 def test_sidebar_blogs():
     response = client.get("/partials/sidebar-blogs")
     assert response.status_code == 200
+
+
+def test_ready_without_warm_up(content_dir, monkeypatch):
+    monkeypatch.setattr(main, "CONTENT_WATCH", False)
+    monkeypatch.setattr(main, "CONTENT_WARMUP", False)
+    with TestClient(app) as started:
+        assert started.get("/readyz").status_code == 200
+    assert client.get("/readyz").status_code == 503
+
+
+def test_warm_up_loads_everything_before_ready(content_dir, monkeypatch):
+    monkeypatch.setattr(main, "CONTENT_WATCH", False)
+    monkeypatch.setattr(main, "CONTENT_WARMUP", True)
+    with TestClient(app) as started:
+        for _ in range(100):
+            if started.get("/readyz").status_code == 200:
+                break
+            time.sleep(0.05)
+        assert started.get("/readyz").text == "ready"
+        assert main._load_all_blogs.contains()
+        assert main._list_all_digests.contains()
+        # Rendered, but left out of the bounded per-post cache
+        assert render.get_parsed(BLOG_KEY, content.fetch_content_file(*BLOG_KEY[:2]).etag)
+        assert main._load_all_digest_posts.contains()
+        assert main._load_project_summary.contains("website")
+
+
+def test_boosted_navigation_gets_only_the_content(content_dir):
+    htmx = {"HX-Request": "true", "HX-Boosted": "true"}
+    full = client.get("/blog/first-post")
+    fragment = client.get("/blog/first-post", headers=htmx)
+    assert fragment.status_code == 200
+    assert fragment.headers["hx-retarget"] == "#main-content"
+    assert "HX-Request" in fragment.headers["vary"]
+    assert "<!DOCTYPE html>" not in fragment.text
+    assert "<title>First Post | Sean-Michael</title>" in fragment.text
+    assert "Body of First Post." in fragment.text
+    assert 'id="sidebar-nav" hx-swap-oob="true"' in fragment.text
+    assert len(fragment.content) < len(full.content)
+    # Cached and validated apart from the full page
+    assert fragment.headers["etag"] != full.headers["etag"]
+    assert client.get("/blog/first-post", headers=htmx).content == fragment.content
+    assert client.get("/blog/first-post").content == full.content
+
+    restore = client.get("/blog/first-post", headers={**htmx, "HX-History-Restore-Request": "true"})
+    assert "<!DOCTYPE html>" in restore.text
+
+
+def test_htmx_partials_are_unchanged():
+    response = client.get("/partials/sidebar-blogs", headers={"HX-Request": "true"})
+    assert response.status_code == 200
+    assert "hx-retarget" not in response.headers
+
+
+def test_search_corpus_does_not_evict_listings(content_dir, monkeypatch):
+    # Room for the listings, but not also for every post
+    monkeypatch.setattr(main.content_cache, "maxsize", 6)
+    main.load_all_blogs()
+    main.load_search_index()
+    assert main._load_all_blogs.contains()
+    assert not main._load_blog.contains("first-post")
@@ -0,0 +1,88 @@
+import io
+
+import boto3
+from botocore.stub import Stubber
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app import metrics
+from app.main import app
+from app.metrics import instrument_s3_client, record_sizes, report_size
+
+client = TestClient(app)
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_reports_routes_caches_and_renders(content_dir):
+    route = {"method": "GET", "route": "/blog/{slug}", "status": "200"}
+    requests_before = sample("http_request_duration_seconds_count", **route)
+    renders_before = sample("content_render_seconds_count", parser="parse_blog")
+    hits_before = sample("cache_requests_total", cache="content", loader="_load_blog", result="hit")
+
+    client.get("/blog/first-post")
+    client.get("/blog/first-post")
+    client.get("/blog/second-post")
+
+    assert sample("http_request_duration_seconds_count", **route) == requests_before + 3
+    assert sample("content_render_seconds_count", parser="parse_blog") == renders_before + 2
+    hits = sample("cache_requests_total", cache="content", loader="_load_blog", result="hit")
+    assert hits == hits_before + 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_bucket{le="0.001",method="GET",route="/blog/{slug}"' in (
+        response.text
+    )
+    assert 'cache_size{cache="page",unit="bytes"}' in response.text
+
+
+def test_unmatched_routes_share_one_series(content_dir):
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = sample("http_request_duration_seconds_count", **labels)
+    client.get("/no/such/page")
+    client.get("/another/missing/page")
+    assert sample("http_request_duration_seconds_count", **labels) == before + 2
+
+
+def test_s3_calls_are_counted():
+    s3 = boto3.client(
+        "s3",
+        region_name="us-west-2",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    )
+    instrument_s3_client(s3)
+    before = sample("s3_requests_total", operation="GetObject", status="200")
+    with Stubber(s3) as stubber:
+        stubber.add_response(
+            "get_object",
+            {"Body": io.BytesIO(b"hello"), "ETag": '"v1"'},
+            {"Bucket": "bucket", "Key": "key"},
+        )
+        s3.get_object(Bucket="bucket", Key="key")
+        stubber.add_client_error("get_object", "NoSuchKey", http_status_code=404)
+        try:
+            s3.get_object(Bucket="bucket", Key="missing")
+        except s3.exceptions.NoSuchKey:
+            pass
+    assert sample("s3_requests_total", operation="GetObject", status="200") == before + 1
+    assert sample("s3_requests_total", operation="GetObject", status="404") >= 1
+    assert sample("s3_request_duration_seconds_count", operation="GetObject") >= 2
+
+
+def test_sizes_are_recorded_in_multiprocess_mode(monkeypatch):
+    # A scrape there reads other processes' files, so sizes can't be worked out on read
+    monkeypatch.setattr(metrics, "MULTIPROCESS", True)
+    monkeypatch.setattr(metrics, "_sizes", [])
+    size = [3]
+    report_size("test", "entries", lambda: size[0])
+    record_sizes()
+    assert sample("cache_size", cache="test", unit="entries") == 3
+    size[0] = 5
+    assert sample("cache_size", cache="test", unit="entries") == 3
+    record_sizes()
+    assert sample("cache_size", cache="test", unit="entries") == 5
@@ -0,0 +1,73 @@
+from fastapi.testclient import TestClient
+
+from app import main
+from app.content import ContentType
+from app.main import app
+from app.page_cache import PageCache
+
+client = TestClient(app)
+
+
+def count_renders(monkeypatch) -> list[str]:
+    rendered = []
+    render = main.templates.TemplateResponse
+
+    def counting(request, name, *args, **kwargs):
+        rendered.append(name)
+        return render(request, name, *args, **kwargs)
+
+    monkeypatch.setattr(main.templates, "TemplateResponse", counting)
+    return rendered
+
+
+def test_repeat_requests_skip_templates(content_dir, monkeypatch):
+    rendered = count_renders(monkeypatch)
+    first = client.get("/blog/first-post")
+    second = client.get("/blog/first-post")
+    assert rendered == ["blog_detail.html"]
+    assert second.content == first.content
+    assert second.headers["content-type"] == "text/html; charset=utf-8"
+
+
+def test_query_is_part_of_the_key(content_dir, monkeypatch):
+    rendered = count_renders(monkeypatch)
+    everything = client.get("/blog")
+    aws = client.get("/blog?tag=aws")
+    client.get("/blog?tag=aws")
+    assert rendered == ["blog_index.html", "blog_index.html"]
+    assert "First Post" in everything.text
+    assert "First Post" not in aws.text
+
+
+def test_changed_content_rerenders_dependent_pages(content_dir, monkeypatch):
+    client.get("/blog/first-post")
+    client.get("/projects")
+    rendered = count_renders(monkeypatch)
+
+    path = content_dir / "blog" / "first-post.md"
+    path.write_text(path.read_text().replace("title: First Post", "title: Edited"))
+    main.refresh_changed_content({(ContentType.BLOG, "first-post")})
+
+    assert "Edited" in client.get("/blog/first-post").text
+    client.get("/projects")
+    assert rendered == ["blog_detail.html"]
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = PageCache(max_bytes=10)
+    cache.put("a", "1", b"aaaa", "text/html")
+    cache.put("b", "1", b"bbbb", "text/html")
+    assert cache.get("a", "1") is not None
+    cache.put("c", "1", b"cccc", "text/html")
+    assert cache.get("b", "1") is None
+    assert cache.get("a", "1").body == b"aaaa"
+    assert cache.size == 8
+    cache.put("huge", "1", b"x" * 11, "text/html")
+    assert len(cache) == 2
+
+
+def test_stale_etag_is_dropped():
+    cache = PageCache()
+    cache.put("a", "old", b"page", "text/html")
+    assert cache.get("a", "new") is None
+    assert cache.size == 0
@@ -0,0 +1,67 @@
+from app import render
+from app.content import ContentFile, ContentType
+from app.models import Blog
+from app.render import parse_blog, parse_if_changed, render_key
+from app.render_cache import RenderCache
+from tests.conftest import BLOG_POST
+
+RAW = BLOG_POST.format(title="First Post", date="2026-01-01", tags="python")
+
+
+def counting_parse(calls: list):
+    def parse(body: str) -> Blog:
+        calls.append(body)
+        return parse_blog("first-post", body)
+
+    return parse
+
+
+def test_restart_reuses_rendered_posts(render_cache):
+    calls = []
+    key = (ContentType.BLOG, "first-post", "parse_blog")
+    first = parse_if_changed(key, ContentFile(RAW, "etag-1"), counting_parse(calls))
+
+    # A new process: nothing in memory, the same file on disk
+    render._parsed.clear()
+    second = parse_if_changed(key, ContentFile(RAW, "etag-1"), counting_parse(calls))
+    assert len(calls) == 1
+    assert second == first
+
+    edited = RAW.replace("First Post", "Edited")
+    third = parse_if_changed(key, ContentFile(edited, "etag-2"), counting_parse(calls))
+    assert len(calls) == 2
+    assert third.title == "Edited"
+
+
+def test_key_covers_slug_and_parser():
+    blog = (ContentType.BLOG, "first-post", "parse_blog")
+    assert render_key(blog, RAW) == render_key(blog, RAW)
+    assert render_key(blog, RAW) != render_key((ContentType.BLOG, "other", "parse_blog"), RAW)
+    assert render_key(blog, RAW) != render_key(blog[:2] + ("parse_blog_summary",), RAW)
+    assert render_key(blog, RAW) != render_key(blog, RAW + "\nMore.")
+
+
+def test_renderer_config_covers_rendering_code(monkeypatch):
+    config = render._renderer_config()
+    assert "H1 from markdown body" in config  # parse_digest's source
+    assert "def extract_first_paragraph" in config
+    monkeypatch.setattr(render, "RENDER_VERSION", render.RENDER_VERSION + 1)
+    assert render._renderer_config() != config
+    monkeypatch.undo()
+    monkeypatch.setattr(render, "MARKDOWN_EXTENSIONS", ["tables"])
+    assert render._renderer_config() != config
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path / "render.sqlite3"), max_bytes=300)
+    for i in range(5):
+        cache.put(f"key-{i}", bytes(100))
+    assert cache.size <= 300
+    assert cache.get("key-0") is None
+    assert cache.get("key-4") == bytes(100)
+
+
+def test_disabled_with_empty_path():
+    cache = RenderCache("")
+    cache.put("key", b"value")
+    assert cache.get("key") is None
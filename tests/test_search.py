@@ -0,0 +1,98 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.content import ContentType
+from app.main import app
+from app.models import Blog, Digest
+from app.search import PackedSearchIndex, SearchIndex, pack_search_index, tokenize
+
+client = TestClient(app)
+
+
+def make_blog(slug: str, title: str, content: str, tags=()) -> Blog:
+    return Blog(
+        title=title,
+        date=date(2026, 1, 1),
+        author="Sean-Michael",
+        slug=slug,
+        tags=list(tags),
+        content=f"<p>{content}</p>",
+    )
+
+
+def test_tokenize_drops_stopwords_and_markup():
+    assert tokenize("The FastAPI and S3 caching") == ["fastapi", "s3", "caching"]
+
+
+def test_bm25_ranks_title_and_frequency():
+    index = SearchIndex()
+    index.add(ContentType.BLOG, make_blog("a", "Kubernetes notes", "pods and nodes"))
+    index.add(ContentType.BLOG, make_blog("b", "Cooking", "kubernetes once in a long text " * 5))
+    index.add(ContentType.BLOG, make_blog("c", "Other", "nothing relevant"))
+    hits = index.search("kubernetes")
+    assert [h.url for h in hits] == ["/blog/a", "/blog/b"]
+    assert index.search("the") == []
+    assert index.search("missing") == []
+
+
+def test_sync_reindexes_only_changed_posts():
+    index = SearchIndex()
+    first = make_blog("a", "First", "alpha")
+    second = make_blog("b", "Second", "beta")
+    assert index.sync(ContentType.BLOG, [first, second]) == 2
+    assert index.sync(ContentType.BLOG, [first, second]) == 0
+
+    edited = make_blog("a", "First", "gamma")
+    assert index.sync(ContentType.BLOG, [edited]) == 1
+    assert index.search("alpha") == []
+    assert index.search("beta") == []
+    assert [h.url for h in index.search("gamma")] == ["/blog/a"]
+    assert len(index) == 1
+
+
+def test_content_types_are_indexed_separately():
+    index = SearchIndex()
+    index.add(ContentType.BLOG, make_blog("news", "Blog", "shared"))
+    index.add(
+        ContentType.DIGEST,
+        Digest(title="Digest", date=date(2026, 1, 2), slug="news", content="<p>shared</p>"),
+    )
+    assert {h.url for h in index.search("shared")} == {"/blog/news", "/digest/news"}
+
+
+def test_search_route(content_dir):
+    response = client.get("/search?q=second")
+    assert response.status_code == 200
+    assert "/blog/second-post" in response.text
+    assert "/blog/first-post" not in response.text
+
+    partial = client.get("/partials/search-results?q=news")
+    assert "/digest/ai-news-2026-03-01" in partial.text
+    assert "<html" not in partial.text
+    assert "No results" in client.get("/partials/search-results?q=zebra").text
+
+
+def test_search_follows_content_changes(content_dir):
+    assert "first-post" not in client.get("/search?q=edited").text
+    path = content_dir / "blog" / "first-post.md"
+    path.write_text(path.read_text().replace("title: First Post", "title: Edited"))
+    main.refresh_changed_content({(ContentType.BLOG, "first-post")})
+    assert "/blog/first-post" in client.get("/search?q=edited").text
+
+
+def test_packed_index_ranks_like_the_index():
+    index = SearchIndex()
+    index.add(ContentType.BLOG, make_blog("a", "Kubernetes notes", "pods and nodes", ["ops"]))
+    index.add(ContentType.BLOG, make_blog("b", "Cooking", "kubernetes once in a long text " * 5))
+    index.add(ContentType.BLOG, make_blog("c", "Café", "nodes, naïvely"))
+    index.add(
+        ContentType.DIGEST,
+        Digest(title="Digest", date=date(2026, 1, 2), slug="news", content="<p>ops pods</p>"),
+    )
+    packed = PackedSearchIndex(memoryview(pack_search_index(index)))
+    assert len(packed) == 4
+    for query in ("kubernetes", "pods nodes", "ops", "caf", "zzz", "the", ""):
+        assert packed.search(query) == index.search(query)
+    assert packed.search("pods", limit=1) == index.search("pods", limit=1)
@@ -0,0 +1,97 @@
+import os
+import xml.etree.ElementTree as ET
+from datetime import UTC, date, datetime
+from functools import partial
+
+from fastapi.testclient import TestClient
+
+from app import content, main
+from app.content import ContentType
+from app.main import app
+from app.sitemap import Sitemap, SitemapUrl, last_modified
+from tests.conftest import BLOG_POST
+
+client = TestClient(app)
+NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+
+def test_last_modified_prefers_later_of_date_and_file():
+    edited = datetime(2026, 2, 3, 4, 5, tzinfo=UTC)
+    assert last_modified(date(2026, 1, 1), edited) == edited
+    assert last_modified(date(2026, 3, 1), edited) == datetime(2026, 3, 1, tzinfo=UTC)
+    assert last_modified(date(2026, 3, 1), None) == datetime(2026, 3, 1, tzinfo=UTC)
+
+
+def test_sitemap_lists_every_page_with_lastmod(content_dir):
+    root = ET.fromstring(client.get("/sitemap.xml").content)
+    urls = {u.findtext("sm:loc", namespaces=NS): u for u in root.findall("sm:url", NS)}
+    assert set(urls) == {
+        main.SITE,
+        f"{main.SITE}/blog",
+        f"{main.SITE}/digest",
+        f"{main.SITE}/projects",
+        f"{main.SITE}/about",
+        f"{main.SITE}/blog/first-post",
+        f"{main.SITE}/blog/second-post",
+        f"{main.SITE}/projects/website",
+        f"{main.SITE}/digest/ai-news-2026-03-01",
+    }
+    assert urls[f"{main.SITE}/blog/first-post"].findtext("sm:lastmod", namespaces=NS)
+    assert urls[f"{main.SITE}/about"].find("sm:lastmod", NS) is None
+
+
+def test_sitemap_does_not_list_content_once_cached(content_dir, monkeypatch):
+    client.get("/sitemap.xml")
+    listed = []
+    monkeypatch.setattr(main, "list_content_files", lambda ct: listed.append(ct))
+    monkeypatch.setattr(content, "list_content_files", lambda ct: listed.append(ct))
+    assert client.get("/sitemap.xml").status_code == 200
+    assert listed == []
+
+
+def test_sitemap_follows_content_changes(content_dir):
+    first = main.load_sitemap()
+    assert main.load_sitemap() is first
+    (content_dir / "blog" / "third-post.md").write_text(
+        (content_dir / "blog" / "first-post.md").read_text()
+    )
+    main.refresh_changed_content({(ContentType.BLOG, "third-post")})
+    assert f"{main.SITE}/blog/third-post" in client.get("/sitemap.xml").text
+
+
+def test_body_edit_updates_lastmod(content_dir):
+    before = client.get("/sitemap.xml")
+    path = content_dir / "blog" / "first-post.md"
+    path.write_text(path.read_text().replace("Body of", "Edited body of"))
+    os.utime(path, (2_000_000_000, 2_000_000_000))
+    main.refresh_changed_content({(ContentType.BLOG, "first-post")})
+
+    # The summary listing is unchanged, but the file's time isn't
+    after = client.get("/sitemap.xml")
+    assert "<lastmod>2033-05-18T03:33:20Z</lastmod>" in after.text
+    assert after.headers["etag"] != before.headers["etag"]
+    assert main.load_sitemap() is main.load_sitemap()
+
+
+def test_large_sitemap_is_split_into_index():
+    urls = [SitemapUrl(f"https://example.com/d/{i}") for i in range(5)]
+    sitemap = Sitemap("https://example.com", {"pages": urls[:1], "digest": urls}, max_urls=2)
+    assert list(sitemap.parts) == ["pages-1", "digest-1", "digest-2", "digest-3"]
+    root = ET.fromstring(sitemap.root)
+    assert root.tag == f"{{{NS['sm']}}}sitemapindex"
+    assert len(root.findall("sm:sitemap", NS)) == 4
+    assert "https://example.com/d/4" in sitemap.part("digest-3")
+
+
+def test_sitemap_part_route(content_dir, monkeypatch):
+    monkeypatch.setattr(main, "Sitemap", partial(Sitemap, max_urls=3))
+    # A listing no other test builds, so the sitemap isn't reused from an earlier test
+    (content_dir / "blog" / "split-post.md").write_text(
+        BLOG_POST.format(title="Split", date="2026-04-01", tags="split")
+    )
+    root = client.get("/sitemap.xml").text
+    assert f"{main.SITE}/sitemaps/blog-1.xml" in root
+    part = client.get("/sitemaps/blog-1.xml")
+    assert part.status_code == 200
+    assert "split-post" in part.text
+    assert client.get("/sitemaps/nope-1.xml").status_code == 404
@@ -0,0 +1,106 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import content, main
+from app.content import ContentNotFoundError, ContentType, modified_times
+from app.main import app, refresh_changed_content, sync_snapshot
+from app.search import SearchIndex
+from app.snapshot import SharedSnapshot, Snapshot, build_snapshot, write_snapshot
+from tests.conftest import BLOG_POST
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def shared(content_dir, monkeypatch):
+    shared = SharedSnapshot(str(content_dir / "cache" / "content.snapshot"))
+    monkeypatch.setattr(main, "shared_snapshot", shared)
+    yield shared
+    shared.release()
+
+
+def test_snapshot_round_trip(content_dir):
+    posts = (
+        main._load_all_blog_posts(),
+        main._load_all_project_posts(),
+        main._load_all_digest_posts(),
+    )
+    index = SearchIndex()
+    for content_type, typed in zip(
+        (ContentType.BLOG, ContentType.PROJECT, ContentType.DIGEST), posts
+    ):
+        index.sync(content_type, typed)
+    modified = {content_type: modified_times(content_type) for content_type in ContentType}
+    data = build_snapshot(*posts, index, modified)
+    path = content_dir / "content.snapshot"
+    assert write_snapshot(path, data)
+    # Same content, so the file is left alone
+    assert not write_snapshot(path, data)
+
+    snapshot = Snapshot(path)
+    assert [b.slug for b in snapshot.blogs] == ["second-post", "first-post"]
+    assert not hasattr(snapshot.blogs[0], "content")
+    assert snapshot.digest_summaries[0].title == "Ai News | 2026-03-01"
+    assert snapshot.get_blog("first-post").content == "<p>Body of First Post.</p>"
+    assert snapshot.get_blog("first-post") is snapshot.get_blog("first-post")
+    assert snapshot.get_project("website").description == "First paragraph of Website."
+    assert snapshot.modified == modified
+    assert snapshot.modified[ContentType.BLOG]["first-post"]
+    with pytest.raises(ContentNotFoundError):
+        snapshot.get(ContentType.DIGEST, "missing")
+    assert snapshot.search_index.search("body") == index.search("body")
+
+
+def test_one_worker_writes_the_snapshot(shared):
+    other = SharedSnapshot(str(shared.path))
+    assert shared.lead()
+    assert not other.lead()
+    shared.release()
+    assert other.lead()
+    other.release()
+
+
+def test_serves_from_snapshot(content_dir, shared):
+    sync_snapshot()
+    assert shared.leading
+    first = shared.current
+    assert first is not None
+    # Remove the source posts so any per-post read would 404
+    for post in (content_dir / "blog").iterdir():
+        post.unlink()
+    assert client.get("/blog/first-post").status_code == 200
+    assert [b.slug for b in main.load_all_blogs()] == ["second-post", "first-post"]
+    assert "First Post" in client.get("/search", params={"q": "body"}).text
+    # Searched in the mapping, not re-indexed from decoded posts
+    assert main.load_search_index() is first.search_index
+    assert len(first._decoded) == 1
+
+    # A worker that doesn't hold the lock only attaches
+    follower = SharedSnapshot(str(shared.path))
+    assert not follower.lead()
+    assert follower.attach().version == first.version
+
+
+def test_snapshot_rewritten_on_change(content_dir, shared):
+    sync_snapshot()
+    first = shared.current
+    sync_snapshot()
+    assert shared.current is first
+
+    (content_dir / "blog" / "third-post.md").write_text(
+        BLOG_POST.format(title="Third Post", date="2026-03-01", tags="python")
+    )
+    refresh_changed_content({(ContentType.BLOG, "third-post")})
+    sync_snapshot()
+    assert shared.current is not first
+    assert shared.current.blogs[0].slug == "third-post"
+
+
+def test_workers_take_modification_times_from_snapshot(content_dir, shared, monkeypatch):
+    sync_snapshot()
+    times = modified_times(ContentType.BLOG)
+    assert times
+    # A worker that never listed content itself
+    monkeypatch.setattr(content, "_modified", {})
+    assert main.load_modified_times(ContentType.BLOG) == times
+    assert "<lastmod>" in client.get("/sitemap.xml").text
@@ -0,0 +1,93 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from scripts.sync_content import MANIFEST_NAME, local_etag, sync_to_s3
+
+BUCKET = "test-content"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def local(tmp_path):
+    (tmp_path / "blog").mkdir()
+    (tmp_path / "blog" / "first-post.md").write_text("---\ntitle: First\n---\n\nBody.\n")
+    (tmp_path / "blog" / "second-post.md").write_text("---\ntitle: Second\n---\n\nBody.\n")
+    (tmp_path / ".hidden").write_text("not synced")
+    return tmp_path
+
+
+def test_sync_uploads_only_changes(s3, local):
+    first = sync_to_s3(s3, BUCKET, local, workers=2)
+    assert sorted(first.uploaded) == ["blog/first-post.md", "blog/second-post.md"]
+    assert first.bytes_uploaded > 0
+    assert (local / MANIFEST_NAME).exists()
+
+    assert sync_to_s3(s3, BUCKET, local).uploaded == []
+
+    (local / "blog" / "first-post.md").write_text("---\ntitle: Edited\n---\n\nBody.\n")
+    second = sync_to_s3(s3, BUCKET, local)
+    assert second.uploaded == ["blog/first-post.md"]
+    assert second.unchanged == ["blog/second-post.md"]
+    body = s3.get_object(Bucket=BUCKET, Key="blog/first-post.md")["Body"].read()
+    assert b"Edited" in body
+
+
+def test_sync_without_manifest_compares_etags(s3, local):
+    sync_to_s3(s3, BUCKET, local)
+    (local / MANIFEST_NAME).unlink()
+    assert sync_to_s3(s3, BUCKET, local).uploaded == []
+
+
+def test_multipart_etag_matches_s3(s3, tmp_path):
+    chunk = 5 * 1024 * 1024  # S3's minimum part size
+    (tmp_path / "image.png").write_bytes(b"x" * (2 * chunk + 10))
+    sync_to_s3(s3, BUCKET, tmp_path, chunk_size=chunk)
+    remote = s3.head_object(Bucket=BUCKET, Key="image.png")["ETag"].strip('"')
+    assert remote == local_etag(tmp_path / "image.png", chunk)
+    assert remote.endswith("-3")
+
+
+def test_prune_deletes_stale_keys(s3, local):
+    sync_to_s3(s3, BUCKET, local)
+    (local / "blog" / "second-post.md").unlink()
+
+    assert sync_to_s3(s3, BUCKET, local).deleted == []
+    assert sync_to_s3(s3, BUCKET, local, prune=True, dry_run=True).deleted == [
+        "blog/second-post.md"
+    ]
+    assert sync_to_s3(s3, BUCKET, local, prune=True).deleted == ["blog/second-post.md"]
+    keys = [obj["Key"] for obj in s3.list_objects_v2(Bucket=BUCKET)["Contents"]]
+    assert keys == ["blog/first-post.md"]
+
+
+def test_prune_keeps_keys_it_did_not_upload(s3, local):
+    for key in ("index.json", "images/blog/.images.json", "blog/added-with-cli.md"):
+        s3.put_object(Bucket=BUCKET, Key=key, Body=b"{}")
+    sync_to_s3(s3, BUCKET, local)
+    (local / "blog" / "second-post.md").unlink()
+
+    assert sync_to_s3(s3, BUCKET, local, prune=True).deleted == ["blog/second-post.md"]
+    keys = {obj["Key"] for obj in s3.list_objects_v2(Bucket=BUCKET)["Contents"]}
+    assert keys == {
+        "blog/first-post.md",
+        "blog/added-with-cli.md",
+        "index.json",
+        "images/blog/.images.json",
+    }
+
+
+def test_prune_later_still_deletes(s3, local):
+    sync_to_s3(s3, BUCKET, local)
+    (local / "blog" / "second-post.md").unlink()
+    sync_to_s3(s3, BUCKET, local)
+    assert sync_to_s3(s3, BUCKET, local, prune=True).deleted == ["blog/second-post.md"]
@@ -0,0 +1,68 @@
+import random
+from datetime import date, timedelta
+
+from app import main
+from app.cache import memo_latest
+from app.models import BlogSummary
+from app.taxonomy import TagIndex, get_tag_index
+
+
+def make_blogs(count: int, seed: int = 0) -> list[BlogSummary]:
+    rng = random.Random(seed)
+    tags = [f"tag-{i}" for i in range(8)]
+    blogs = [
+        BlogSummary(
+            title=f"Post {i}",
+            date=date(2026, 1, 1) + timedelta(days=rng.randrange(60)),
+            author="Sean-Michael",
+            slug=f"post-{i}",
+            tags=rng.sample(tags, rng.randrange(4)),
+        )
+        for i in range(count)
+    ]
+    return sorted(blogs, key=lambda b: b.date, reverse=True)
+
+
+def brute_force_related(current: BlogSummary, blogs: list[BlogSummary], limit: int = 5):
+    others = [b for b in blogs if b.slug != current.slug]
+
+    def score(b: BlogSummary) -> tuple:
+        return (-len(set(b.tags) & set(current.tags)), -b.date.toordinal())
+
+    return sorted(others, key=score)[:limit]
+
+
+def test_related_matches_full_sort():
+    blogs = make_blogs(200)
+    index = TagIndex(blogs)
+    for blog in blogs:
+        assert index.related(blog) == brute_force_related(blog, blogs)
+
+
+def test_posts_for_tag_keeps_date_order():
+    blogs = make_blogs(50)
+    index = TagIndex(blogs)
+    assert index.tags == sorted({t for b in blogs for t in b.tags})
+    for tag in index.tags:
+        assert index.posts_for(tag) == [b for b in blogs if tag in b.tags]
+    assert index.posts_for("missing") == []
+
+
+def test_memo_latest_rebuilds_only_for_new_source():
+    calls = []
+
+    @memo_latest
+    def build(source):
+        calls.append(source)
+        return len(source)
+
+    first = [1, 2]
+    assert build(first) == build(first) == 2
+    assert build([1, 2, 3]) == 3
+    assert len(calls) == 2
+
+
+def test_unchanged_listing_keeps_tag_index(content_dir):
+    index = get_tag_index(main.load_all_blogs())
+    main._load_all_blogs.invalidate()
+    assert get_tag_index(main.load_all_blogs()) is index
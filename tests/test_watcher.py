@@ -0,0 +1,74 @@
+import time
+
+from fastapi.testclient import TestClient
+from watchfiles import Change
+
+from app import main
+from app.cache import CACHE_TTL, content_cache
+from app.content import ContentType
+from app.watcher import classify_changes, watched_paths
+
+
+def test_classify_changes(content_dir):
+    changes = {
+        (Change.modified, str(content_dir / "blog" / "first-post.md")),
+        (Change.added, str(content_dir / "digest" / "ai-news-2026-03-02.md")),
+        (Change.modified, str(content_dir / "index.json")),
+        (Change.modified, str(content_dir / "blog" / "notes.txt")),
+    }
+    assert classify_changes(changes) == {
+        (ContentType.BLOG, "first-post"),
+        (ContentType.DIGEST, "ai-news-2026-03-02"),
+        None,
+    }
+
+
+def test_watched_paths_skips_nested_dirs(content_dir):
+    assert watched_paths() == [content_dir]
+
+
+def test_refresh_rerenders_only_changed_post(content_dir):
+    assert main.load_blog("first-post").title == "First Post"
+    second = main.load_blog("second-post")
+
+    path = content_dir / "blog" / "first-post.md"
+    path.write_text(path.read_text().replace("title: First Post", "title: Edited"))
+    (content_dir / "blog" / "third-post.md").write_text(
+        path.read_text().replace("title: Edited", "title: Third")
+    )
+    main.refresh_changed_content(
+        {(ContentType.BLOG, "first-post"), (ContentType.BLOG, "third-post")}
+    )
+
+    assert main.load_blog("first-post").title == "Edited"
+    assert main.load_blog("second-post") is second
+    assert {b.title for b in main.load_all_blogs()} == {"Edited", "Second Post", "Third"}
+
+
+def test_cache_expires_again_when_the_watcher_fails(content_dir, monkeypatch):
+    started = []
+
+    async def failing_watch(on_change, stop_event=None, on_start=None):
+        on_start()
+        started.append(content_cache.ttl)
+        raise OSError("inotify watch limit reached")
+
+    main.load_blog("first-post")
+    monkeypatch.setattr(main, "CONTENT_WARMUP", False)
+    monkeypatch.setattr(main, "watch_content", failing_watch)
+    with TestClient(main.app):
+        for _ in range(100):
+            if started and content_cache.ttl == CACHE_TTL:
+                break
+            time.sleep(0.01)
+        assert started == [float("inf")]
+        assert content_cache.ttl == CACHE_TTL
+        assert all(entry.ttl == CACHE_TTL for entry in content_cache._entries.values())
+
+
+def test_cache_keeps_expiring_without_anything_to_watch(content_dir, monkeypatch):
+    monkeypatch.setattr(main, "CONTENT_WARMUP", False)
+    monkeypatch.setattr("app.watcher.watched_paths", lambda: [])
+    with TestClient(main.app) as started:
+        started.get("/readyz")
+        assert content_cache.ttl == CACHE_TTL